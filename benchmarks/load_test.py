@@ -0,0 +1,395 @@
+"""In-process load generator for the Azure Function and Chainlit entry points.
+
+Drives ``azure_function.main`` (research, data_analysis and upload routes) and
+the Chainlit ``on_message`` handler against the service stand-ins in
+benchmarks/stand_ins.py, either closed-loop at a fixed concurrency or open-loop
+at a Poisson arrival rate. Reports throughput, latency percentiles, event-loop
+lag and error rate per route as JSON.
+
+Usage:
+    python -m benchmarks.load_test --route research --concurrency 16 --duration 30
+    python -m benchmarks.load_test --rate 20 --max-in-flight 64 --duration 60 --output load.json
+"""
+import sys
+import json
+import time
+import types
+import random
+import asyncio
+import argparse
+import itertools
+import platform
+import contextlib
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List, Optional
+from unittest.mock import patch
+from benchmarks.run import QUERIES, git_commit, peak_rss_mb, summarize, synthetic_dataset
+from benchmarks.stand_ins import LatencyProfile, SyntheticCorpus, StandIns, build_pubmed_service, stand_ins
+
+ROUTES = ("research", "data_analysis", "upload", "chat")
+
+DATASET_BLOB = "load_test.parquet"
+
+# Alternates between requests the planner resolves itself and ones that need an LLM plan
+ANALYSIS_REQUESTS = [
+    "histogram of engagement_score",
+    "bar chart of salary by department",
+    "summary statistics",
+    "how does engagement differ between teams?",
+]
+
+LLM_PLAN = json.dumps({"analysis_type": "graph", "graph_type": "box", "x_col": "department",
+                       "y_col": "engagement_score", "color_col": None})
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a periodic timer; blocking calls show up as lag"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._expected = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            self._expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - self._expected, 0.0))
+
+    def start(self) -> None:
+        self._expected = time.perf_counter() + self.interval
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        # A handler that never yields starves the timer entirely; count the wake-up still owed
+        overdue = time.perf_counter() - self._expected
+        if overdue > 0:
+            self.samples.append(overdue)
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+
+class RouteStats:
+    """Outcome of every request sent to one route"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.queue_waits: List[float] = []
+        self.status_codes: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, latency: float, status: str, queue_wait: float = 0.0) -> None:
+        self.latencies.append(latency)
+        self.queue_waits.append(queue_wait)
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        if not status.startswith("2"):
+            self.errors += 1
+
+    def report(self, elapsed: float, lag: List[float]) -> Dict:
+        requests = len(self.latencies)
+        return {
+            "requests": requests,
+            "seconds": elapsed,
+            "throughput_rps": requests / elapsed if elapsed else 0.0,
+            "errors": self.errors,
+            "error_rate": self.errors / requests if requests else 0.0,
+            "status_codes": self.status_codes,
+            "latency": summarize(self.latencies) if requests else {},
+            "queue_wait": summarize(self.queue_waits) if requests else {},
+            "event_loop_lag": summarize(lag) if lag else {},
+        }
+
+
+async def _timed(call: Callable[[int], Awaitable[str]], i: int, stats: RouteStats, arrival: float,
+                 started: float) -> None:
+    try:
+        status = await call(i)
+    except Exception as e:
+        status = f"exception:{type(e).__name__}"
+    stats.record(time.perf_counter() - arrival, status, queue_wait=started - arrival)
+
+
+async def run_closed_loop(call: Callable[[int], Awaitable[str]], concurrency: int, duration: float,
+                          max_requests: Optional[int] = None) -> RouteStats:
+    """``concurrency`` clients each sending their next request as soon as the last one returns"""
+    stats = RouteStats()
+    deadline = time.perf_counter() + duration
+    counter = iter(range(max_requests)) if max_requests else itertools.count()
+
+    async def client() -> None:
+        for i in counter:
+            if time.perf_counter() >= deadline:
+                return
+            now = time.perf_counter()
+            await _timed(call, i, stats, now, now)
+
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return stats
+
+
+async def run_open_loop(call: Callable[[int], Awaitable[str]], rate: float, duration: float,
+                        max_in_flight: int, seed: int = 0) -> RouteStats:
+    """Poisson arrivals at ``rate`` per second whether or not earlier requests finished.
+
+    Latency is measured from each request's scheduled arrival, so time spent
+    waiting for one of ``max_in_flight`` slots (pool exhaustion) is included.
+    """
+    stats = RouteStats()
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks = []
+
+    async def admitted(i: int, arrival: float) -> None:
+        async with slots:
+            await _timed(call, i, stats, arrival, time.perf_counter())
+
+    start = time.perf_counter()
+    arrival, i = start, 0
+    while arrival - start < duration:
+        await asyncio.sleep(max(arrival - time.perf_counter(), 0))
+        tasks.append(asyncio.create_task(admitted(i, arrival)))
+        arrival += rng.expovariate(rate)
+        i += 1
+    await asyncio.gather(*tasks)
+    return stats
+
+
+class ResearchChainStandIn:
+    """Takes the place of ResearchChain, which cannot be constructed in this tree.
+
+    ResearchChain passes ``memory`` to ResearchAgent and builds an untyped
+    StateGraph; this forwards to the agent's process_query instead, so the
+    route still exercises the real agent, services and tools.
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    async def run(self, query: str, grounding_results=None) -> Dict:
+        return await self.agent.process_query(query)
+
+
+class ChainlitStandIn:
+    """The parts of the chainlit module app.py touches, without a UI session"""
+
+    def __init__(self):
+        self.sent: List[str] = []
+        stand_in = self
+
+        class Message:
+            def __init__(self, content: str = "", elements=None, **kwargs):
+                self.content = content
+                self.elements = elements
+
+            async def send(self):
+                stand_in.sent.append(self.content)
+                return self
+
+        class Step:
+            def __init__(self, name: str = "", **kwargs):
+                self.name = name
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        self.Message = Message
+        self.Step = Step
+        self.Text = lambda content="", **kwargs: SimpleNamespace(content=content)
+        # One session for every request, so chat load includes memory compaction
+        self.user_session = {"id": "load-test"}
+
+
+class DocumentDatabaseStandIn:
+    """Similarity search over the synthetic corpus with the vector index's latency"""
+
+    def __init__(self, env: StandIns):
+        self.env = env
+
+    def create_or_load_db(self) -> "DocumentDatabaseStandIn":
+        return self
+
+    def similarity_search(self, query: str, k: int = 3) -> List[SimpleNamespace]:
+        self.env.profile["pinecone"].sleep(0)
+        return [SimpleNamespace(page_content=self.env.corpus.article(int(pmid))["abstract"])
+                for pmid in self.env.corpus.search(f"similar {query}", k)]
+
+
+def load_azure_function(env: StandIns):
+    """Import the Azure Function app with its module-level clients replaced by stand-ins"""
+    from benchmarks.stand_ins import build_research_agent
+
+    env.patch("src.chains.research_chain.ResearchChain",
+              lambda *args, **kwargs: ResearchChainStandIn(build_research_agent(env)))
+    env.patch("src.agents.data_analysis_agent.ChatOpenAI", lambda **kwargs: env.chat_model(lambda _: LLM_PLAN))
+    env.patch("src.db.db_utils.get_popular_queries", env.database.get_popular_queries)
+    from src.api import azure_function
+    from src.agents.data_analysis_agent import DataAnalysisAgent
+    from src.jobs.cache_prewarm import build_prewarmer
+
+    # The module may have been imported by an earlier run: rebind its clients to this run's stand-ins
+    research_chain = ResearchChainStandIn(build_research_agent(env))
+    env.patch("src.api.azure_function.research_chain", research_chain)
+    env.patch("src.api.azure_function.cache_prewarmer", build_prewarmer(research_chain.agent.warm_query))
+    env.patch("src.api.azure_function.data_analysis_agent", DataAnalysisAgent())
+    env.patch("src.api.azure_function.bing_grounding_service", research_chain.agent.bing_grounding_tool.service)
+    env.patch("src.api.azure_function.blob_storage", env.blob_storage)
+    return azure_function
+
+
+def load_chat_app(env: StandIns):
+    """Import the Chainlit app with its module-level clients replaced by stand-ins"""
+    pubmed_service = build_pubmed_service(env)
+    documents = DocumentDatabaseStandIn(env)
+    database_module = types.ModuleType("database")
+    database_module.DocumentDatabase = lambda *args, **kwargs: documents
+
+    # app.py imports DocumentDatabase from a top-level module this tree does not ship
+    env.stack.enter_context(patch.dict(sys.modules, {"database": database_module}))
+    env.patch("src.services.pubmed_service.PubMedService", lambda *args, **kwargs: pubmed_service)
+    env.patch("src.database.init_db.init_db", lambda *args, **kwargs: None)
+    # Imported by app.py but not defined in init_db
+    env.patch("src.database.init_db.create_vector_extension", lambda *args, **kwargs: None, create=True)
+    env.patch("anthropic.Anthropic", lambda *args, **kwargs: env.anthropic)
+    from src.api import app
+
+    env.patch("src.api.app.cl", ChainlitStandIn())
+    env.patch("src.api.app.anthropic", env.anthropic)
+    env.patch("src.api.app.pubmed_service", pubmed_service)
+    env.patch("src.api.app.doc_db", documents)
+    env.patch("src.api.app.Session", env.database.session)
+    env.patch("src.api.app.get_conversation_session", env.database.get_conversation_session)
+    env.patch("src.api.app.save_conversation_session", env.database.save_conversation_session)
+    return app
+
+
+def http_request(method: str, url: str, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+    import azure.functions as func
+    return func.HttpRequest(method=method, url=url, body=body, headers=headers or {})
+
+
+def upload_request(filename: str, data: bytes):
+    """Multipart form upload, parsed by the Functions runtime exactly as a real one would be"""
+    boundary = "loadtestboundary"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return http_request("POST", "/api/upload", body,
+                        {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+
+
+def build_routes(env: StandIns, names: List[str], dataset_rows: int = 100_000,
+                 upload_bytes: int = 256 * 1024) -> Dict[str, Callable[[int], Awaitable[str]]]:
+    """One async callable per route: request number in, status code (as text) out"""
+    routes = {}
+
+    if set(names) & {"research", "data_analysis", "upload"}:
+        azure_function = load_azure_function(env)
+
+        async def post(body: Dict) -> str:
+            response = await azure_function.main(http_request("POST", "/api/research", json.dumps(body).encode()))
+            return str(response.status_code)
+
+        async def research(i: int) -> str:
+            return await post({"type": "research", "query": QUERIES[i % len(QUERIES)]})
+
+        async def data_analysis(i: int) -> str:
+            return await post({"type": "data_analysis", "blob_name": DATASET_BLOB,
+                               "request": ANALYSIS_REQUESTS[i % len(ANALYSIS_REQUESTS)]})
+
+        csv = b"employee_id,engagement_score\n" + b"".join(
+            f"{i},{3 + (i % 20) / 10}\n".encode() for i in range(upload_bytes // 10)
+        )[:upload_bytes]
+
+        async def upload(i: int) -> str:
+            response = await azure_function.main(upload_request(f"upload_{i}.csv", csv))
+            return str(response.status_code)
+
+        if "data_analysis" in names:
+            env.blob_storage.put(DATASET_BLOB, synthetic_dataset(dataset_rows, env.profile.seed))
+        routes.update(research=research, data_analysis=data_analysis, upload=upload)
+
+    if "chat" in names:
+        app = load_chat_app(env)
+
+        async def chat(i: int) -> str:
+            await app.main(SimpleNamespace(content=QUERIES[i % len(QUERIES)]))
+            return "200"
+
+        routes["chat"] = chat
+
+    return {name: routes[name] for name in names}
+
+
+async def run_route(call: Callable[[int], Awaitable[str]], args) -> Dict:
+    lag = LoopLagMonitor(args.lag_interval)
+    lag.start()
+    start = time.perf_counter()
+    if args.rate:
+        stats = await run_open_loop(call, args.rate, args.duration, args.max_in_flight, args.seed)
+    else:
+        stats = await run_closed_loop(call, args.concurrency, args.duration, args.requests)
+    elapsed = time.perf_counter() - start
+    await lag.stop()
+    return stats.report(elapsed, lag.samples)
+
+
+async def run_load_test(args) -> Dict:
+    profile = LatencyProfile(args.latency_scale, args.seed)
+    report = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": "open" if args.rate else "closed",
+            "concurrency": None if args.rate else args.concurrency,
+            "rate": args.rate,
+            "max_in_flight": args.max_in_flight if args.rate else None,
+            "duration": args.duration,
+            "latency_profile": profile.as_dict(),
+        },
+        "routes": {},
+    }
+    with stand_ins(profile, SyntheticCorpus(args.corpus_size, args.seed)) as env:
+        routes = build_routes(env, args.route or list(ROUTES), args.dataset_rows, args.upload_kb * 1024)
+        for name, call in routes.items():
+            report["routes"][name] = await run_route(call, args)
+        report["injected"] = env.usage()
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--route", action="append", choices=ROUTES, help="Route to load (repeatable); default all")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop clients per route")
+    parser.add_argument("--rate", type=float, help="Open-loop arrivals per second (overrides --concurrency)")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Open-loop cap on concurrent requests")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per route")
+    parser.add_argument("--requests", type=int, help="Closed-loop: stop after this many requests")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-size", type=int, default=100_000)
+    parser.add_argument("--dataset-rows", type=int, default=100_000)
+    parser.add_argument("--upload-kb", type=int, default=256)
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="Event-loop lag sampling period (s)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    output = json.dumps(asyncio.run(run_load_test(args)), indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
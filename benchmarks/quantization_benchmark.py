@@ -0,0 +1,76 @@
+"""Recall-vs-memory benchmark for QuantizedVectorStore against the float32 path.
+
+Usage:
+    python -m benchmarks.quantization_benchmark --vectors 20000 --queries 200
+"""
+import argparse
+import json
+import time
+import numpy as np
+from src.utils.quantization import QuantizedVectorStore
+
+
+def synthetic_embeddings(n: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors, roughly mimicking sentence embeddings of related abstracts"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension))
+    labels = rng.integers(0, clusters, size=n)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(n, dimension))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def run_benchmark(n_vectors: int = 20000, n_queries: int = 200, dimension: int = 768,
+                  top_k: int = 10, seed: int = 0) -> list:
+    corpus = synthetic_embeddings(n_vectors, dimension, clusters=64, seed=seed)
+    queries = synthetic_embeddings(n_queries, dimension, clusters=64, seed=seed + 1)
+    ids = [str(i) for i in range(n_vectors)]
+
+    exact = QuantizedVectorStore(dimension, dtype="float32")
+    exact.add(ids, corpus)
+    truth = [{i for i, _ in exact.search(q, top_k)} for q in queries]
+
+    configs = [
+        ("float32", {"dtype": "float32"}, False),
+        ("float16", {"dtype": "float16"}, False),
+        ("int8", {"dtype": "int8"}, False),
+        ("int8+rescore", {"dtype": "int8", "keep_full_precision": True}, True),
+    ]
+
+    results = []
+    for name, kwargs, rescore in configs:
+        store = QuantizedVectorStore(dimension, **kwargs)
+        store.add(ids, corpus)
+
+        start = time.perf_counter()
+        hits = 0
+        for query, expected in zip(queries, truth):
+            found = {i for i, _ in store.search(query, top_k, rescore=rescore)}
+            hits += len(found & expected)
+        elapsed = time.perf_counter() - start
+
+        results.append({
+            "config": name,
+            "vectors": n_vectors,
+            "dimension": dimension,
+            "bytes": store.nbytes,
+            "bytes_per_vector": store.nbytes / n_vectors,
+            f"recall@{top_k}": hits / (len(queries) * top_k),
+            "mean_query_ms": 1000 * elapsed / len(queries),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.vectors, args.queries, args.dimension, args.top_k)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Offline end-to-end benchmarks against local stand-ins for every external service.
+
+Runs the real agent, service and tool code with Entrez, the embedding model,
+Pinecone, Azure Search, Blob Storage, the database and the LLMs replaced by
+deterministic stand-ins (benchmarks/stand_ins.py) with configurable latency,
+and writes one machine-readable JSON report.
+
+Usage:
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --suite similarity_search --suite data_analysis --latency-scale 0
+    python -m benchmarks.run --compare baseline.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from benchmarks.stand_ins import LatencyProfile, SyntheticCorpus, FakeEmbeddingModel, FakePineconeIndex, stand_ins
+
+QUERIES = [
+    "employee engagement remote work", "burnout in nurses", "transformational leadership turnover",
+    "psychological safety teams", "performance appraisal fairness", "diversity climate commitment",
+    "work-life balance job satisfaction", "training transfer managers",
+]
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds"""
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        "n": len(samples),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return usage / 2**20 if sys.platform == "darwin" else usage / 2**10
+
+
+def bench_process_query(profile: LatencyProfile, iterations: int = 40, corpus_size: int = 100_000) -> Dict:
+    """End-to-end ResearchAgent.process_query latency"""
+    from benchmarks.stand_ins import build_research_agent
+
+    async def run() -> Dict:
+        with stand_ins(profile, SyntheticCorpus(corpus_size, profile.seed)) as env:
+            agent = build_research_agent(env)
+            samples, sources = [], {}
+            for i in range(iterations):
+                start = time.perf_counter()
+                result = await agent.process_query(QUERIES[i % len(QUERIES)])
+                samples.append(time.perf_counter() - start)
+                source = result.get("source", result["status"])
+                sources[source] = sources.get(source, 0) + 1
+            return {**summarize(samples), "sources": sources, "injected": env.usage()}
+
+    return asyncio.run(run())
+
+
+def bench_ingest(profile: LatencyProfile, articles: int = 2000, batch_size: int = 200) -> Dict:
+    """store_pubmed_data throughput, per batch of parsed articles"""
+    from benchmarks.stand_ins import build_pubmed_service
+
+    async def run() -> Dict:
+        corpus = SyntheticCorpus(articles, profile.seed)
+        with stand_ins(profile, corpus) as env:
+            service = build_pubmed_service(env)
+            parsed = service.parse_medline_records("\n".join(corpus.medline(pmid) for pmid in range(1, articles + 1)))
+            samples = []
+            start = time.perf_counter()
+            for offset in range(0, len(parsed), batch_size):
+                batch_start = time.perf_counter()
+                await service.store_pubmed_data(parsed[offset:offset + batch_size], env.database.session())
+                samples.append(time.perf_counter() - batch_start)
+            elapsed = time.perf_counter() - start
+            return {
+                "articles": len(parsed),
+                "batch_size": batch_size,
+                "seconds": elapsed,
+                "articles_per_second": len(parsed) / elapsed,
+                "batch": summarize(samples),
+                "injected": env.usage(),
+            }
+
+    return asyncio.run(run())
+
+
+def bench_similarity_search(profile: LatencyProfile, corpus_sizes=(1_000, 10_000, 100_000),
+                            queries: int = 100, top_k: int = 5) -> List[Dict]:
+    """Pinecone-style query latency as the index grows"""
+    model = FakeEmbeddingModel()
+    query_vectors = model.encode([QUERIES[i % len(QUERIES)] + f" {i}" for i in range(queries)])
+    results = []
+    for size in corpus_sizes:
+        corpus = SyntheticCorpus(size, profile.seed)
+        # Loading the corpus is not what is being measured: no injected latency until it is in
+        index = FakePineconeIndex()
+        for offset in range(1, size + 1, 10_000):
+            pmids = range(offset, min(offset + 10_000, size + 1))
+            texts = [f"{a['title']} {a['abstract']}" for a in map(corpus.article, pmids)]
+            index.upsert([{"id": str(p), "values": v, "metadata": {"pmid": str(p)}}
+                          for p, v in zip(pmids, model.encode(texts))])
+        index.latency = profile["pinecone"]
+
+        samples = []
+        for vector in query_vectors:
+            start = time.perf_counter()
+            index.query(vector, top_k=top_k, include_metadata=True)
+            samples.append(time.perf_counter() - start)
+        results.append({"corpus_size": size, "top_k": top_k, **summarize(samples),
+                        "index_bytes": index.store.nbytes})
+    return results
+
+
+def synthetic_dataset(rows: int, seed: int) -> bytes:
+    """Workforce-style table as Parquet: numeric, categorical and date columns"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    rng = np.random.default_rng(seed)
+    departments = np.array(["Sales", "Engineering", "HR", "Finance", "Operations", "Support"])
+    table = pa.table({
+        "employee_id": np.arange(rows, dtype=np.int64),
+        "department": departments[rng.integers(0, len(departments), rows)],
+        "tenure_years": rng.gamma(2.0, 2.5, rows),
+        "engagement_score": rng.normal(3.6, 0.7, rows),
+        "salary": rng.lognormal(11, 0.35, rows),
+        "absences": rng.poisson(4, rows).astype(np.int64),
+        "hired": (np.datetime64("2005-01-01") + rng.integers(0, 7000, rows).astype("timedelta64[D]")).astype("datetime64[s]"),
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+DATA_ANALYSIS_CASES = [
+    ("analysis", "analysis", None),
+    ("histogram", "graph", {"graph_type": "histogram", "x_col": "engagement_score"}),
+    ("scatter", "graph", {"graph_type": "scatter", "x_col": "tenure_years", "y_col": "salary"}),
+    ("bar", "graph", {"graph_type": "bar", "x_col": "department", "y_col": "salary"}),
+    ("box", "graph", {"graph_type": "box", "x_col": "department", "y_col": "engagement_score"}),
+    ("line", "graph", {"graph_type": "line", "x_col": "hired", "y_col": "absences"}),
+]
+
+
+def bench_data_analysis(profile: LatencyProfile, row_counts=(10_000, 100_000, 1_000_000)) -> List[Dict]:
+    """DataAnalysisTool.run on synthetic datasets: cold load, then each analysis warm"""
+    from benchmarks.stand_ins import build_data_analysis_tool
+
+    async def run(rows: int, cache_dir: str) -> Dict:
+        with stand_ins(profile, services=("blob",)) as env:
+            tool = build_data_analysis_tool(env, cache_dir)
+            blob_name = f"bench_{rows}.parquet"
+            env.blob_storage.put(blob_name, synthetic_dataset(rows, profile.seed))
+
+            start = time.perf_counter()
+            await tool.load_table(blob_name)
+            report = {"rows": rows, "blob_bytes": len(env.blob_storage.blobs[blob_name]),
+                      "engine": "duckdb" if tool.query_engine is not None else "pandas",
+                      "cold_load_seconds": time.perf_counter() - start, "cases": {}}
+            for name, analysis_type, graph_params in DATA_ANALYSIS_CASES:
+                start = time.perf_counter()
+                try:
+                    await tool.run(blob_name, analysis_type, graph_params)
+                    report["cases"][name] = {"seconds": time.perf_counter() - start}
+                except Exception as e:
+                    report["cases"][name] = {"error": f"{type(e).__name__}: {e}"}
+            report["peak_rss_mb"] = peak_rss_mb()
+            return report
+
+    results = []
+    for rows in row_counts:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            results.append(asyncio.run(run(rows, cache_dir)))
+    return results
+
+
+SUITES: Dict[str, Callable] = {
+    "process_query": bench_process_query,
+    "ingest": bench_ingest,
+    "similarity_search": bench_similarity_search,
+    "data_analysis": bench_data_analysis,
+}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suites(names: List[str], profile: LatencyProfile, options: Dict[str, Dict]) -> Dict:
+    report = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "latency_profile": profile.as_dict(),
+        },
+        "suites": {},
+    }
+    for name in names:
+        start = time.perf_counter()
+        try:
+            result = SUITES[name](LatencyProfile(profile.scale, profile.seed), **options.get(name, {}))
+            report["suites"][name] = {"status": "ok", "seconds": time.perf_counter() - start, "results": result}
+        except ImportError as e:
+            # A dependency of the code under test is missing in this environment
+            report["suites"][name] = {"status": "skipped", "reason": str(e)}
+    return report
+
+
+def compare(report: Dict, baseline: Dict) -> Dict[str, Dict[str, float]]:
+    """Relative change of every shared numeric *_ms / *_seconds / *_per_second figure"""
+    def flatten(value, prefix=""):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                yield from flatten(item, f"{prefix}.{key}" if prefix else key)
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                yield from flatten(item, f"{prefix}[{i}]")
+        elif isinstance(value, (int, float)) and prefix.endswith(("_ms", "seconds", "_per_second")):
+            yield prefix, float(value)
+
+    before = dict(flatten(baseline.get("suites", {})))
+    changes = {}
+    for key, value in flatten(report["suites"]):
+        if before.get(key):
+            changes[key] = {"baseline": before[key], "current": value, "change": value / before[key] - 1}
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="Suite to run (repeatable); default all")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiplier on every injected service latency; 0 disables it")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=40, help="process_query calls")
+    parser.add_argument("--ingest-articles", type=int, default=2000)
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Dataset sizes for data_analysis, e.g. --rows 10000 10000000")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to diff against")
+    args = parser.parse_args()
+
+    options = {
+        "process_query": {"iterations": args.iterations},
+        "ingest": {"articles": args.ingest_articles},
+        "similarity_search": {"corpus_sizes": args.corpus_sizes},
+        "data_analysis": {"row_counts": args.rows},
+    }
+    report = run_suites(args.suite or list(SUITES), LatencyProfile(args.latency_scale, args.seed), options)
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,715 @@
+"""Deterministic local stand-ins for every external service, with injectable latency.
+
+Each stand-in mimics the client surface our services call (Bio.Entrez,
+SentenceTransformer, the pinecone module, the async Azure Search clients,
+BlobStorageService, chat models and the Anthropic SDK), so benchmarks and
+load tests run the real service and agent code with only the network
+boundary replaced. The same seed always produces the same corpus, results
+and delays.
+
+Usage:
+    with stand_ins(LatencyProfile(scale=1.0)) as env:
+        agent = build_research_agent(env)
+        await agent.process_query("burnout in nurses")
+"""
+import io
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import contextlib
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from unittest.mock import patch
+import numpy as np
+from src.utils.quantization import QuantizedVectorStore
+from src.services.article_hydrator import DISPLAY_FIELDS
+
+EMBEDDING_DIMENSION = 768
+
+TOPICS = [
+    "employee engagement", "burnout", "turnover intention", "transformational leadership",
+    "psychological safety", "remote work", "performance appraisal", "diversity climate",
+    "job satisfaction", "organizational commitment", "work-life balance", "training transfer",
+]
+JOURNALS = [
+    "Journal of Applied Psychology", "Journal of Occupational Health Psychology",
+    "Personnel Psychology", "Journal of Organizational Behavior", "Human Resource Management",
+]
+MESH_TERMS = ["Personnel Management", "Organizational Culture", "Industrial Psychology", "Job Satisfaction",
+              "Burnout, Professional", "Leadership", "Workplace"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def _seed(*parts: Any) -> int:
+    return int.from_bytes(hashlib.sha256("\0".join(map(str, parts)).encode("utf-8")).digest()[:8], "big")
+
+
+class Latency:
+    """Per-call delay: a mean plus seeded uniform jitter, plus a per-item cost, all scaled"""
+
+    def __init__(self, mean_ms: float = 0.0, jitter_ms: float = 0.0, per_item_ms: float = 0.0,
+                 scale: float = 1.0, seed: int = 0):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self.per_item_ms = per_item_ms
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.total_seconds = 0.0
+
+    def seconds(self, items: float = 1) -> float:
+        if not self.scale:
+            return 0.0
+        jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        delay = max(self.mean_ms + jitter + self.per_item_ms * items, 0.0) * self.scale / 1000
+        self.calls += 1
+        self.total_seconds += delay
+        return delay
+
+    def sleep(self, items: float = 1) -> None:
+        """Blocking delay, for stand-ins of synchronous SDKs"""
+        delay = self.seconds(items)
+        if delay:
+            time.sleep(delay)
+
+    async def asleep(self, items: float = 1) -> None:
+        delay = self.seconds(items)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class LatencyProfile:
+    """Latency for each external service; ``scale=0`` removes all injected delay"""
+
+    # (mean ms, jitter ms, ms per item)
+    DEFAULTS = {
+        "entrez": (350.0, 150.0, 2.0),        # per PMID fetched
+        "embedding": (8.0, 2.0, 4.0),         # per text encoded
+        "pinecone": (45.0, 20.0, 0.5),        # per vector upserted
+        "search": (90.0, 40.0, 0.0),
+        "blob": (25.0, 10.0, 8.0),            # per MiB transferred
+        "llm": (1500.0, 600.0, 0.0),
+        "database": (4.0, 2.0, 0.0),
+    }
+
+    def __init__(self, scale: float = 1.0, seed: int = 0, **overrides):
+        self.scale = scale
+        self.seed = seed
+        self.config = {**self.DEFAULTS, **overrides}
+        self.latencies = {
+            name: Latency(*config, scale=scale, seed=_seed(seed, name))
+            for name, config in self.config.items()
+        }
+
+    def __getitem__(self, name: str) -> Latency:
+        return self.latencies[name]
+
+    def as_dict(self) -> Dict:
+        return {
+            "scale": self.scale,
+            "seed": self.seed,
+            "services": {
+                name: {"mean_ms": mean, "jitter_ms": jitter, "per_item_ms": per_item}
+                for name, (mean, jitter, per_item) in self.config.items()
+            },
+        }
+
+    def usage(self) -> Dict[str, Dict[str, float]]:
+        """Calls and total injected seconds per service so far"""
+        return {name: {"calls": latency.calls, "seconds": latency.total_seconds}
+                for name, latency in self.latencies.items()}
+
+
+class SyntheticCorpus:
+    """PubMed-like articles generated from their PMID: the same PMID always yields the same record"""
+
+    def __init__(self, size: int = 100_000, seed: int = 0):
+        self.size = size
+        self.seed = seed
+
+    def article(self, pmid: int) -> Dict:
+        rng = random.Random(_seed(self.seed, "article", pmid))
+        topic, other = rng.sample(TOPICS, 2)
+        year = rng.randint(1995, 2025)
+        return {
+            "pmid": str(pmid),
+            "title": f"Effects of {topic} on {other} among {rng.choice(['nurses', 'teachers', 'engineers', 'managers'])}",
+            "abstract": " ".join(
+                f"{rng.choice(['We examined', 'Results show', 'This study links', 'Findings suggest'])} "
+                f"{topic} and {rng.choice(TOPICS)} in {rng.randint(80, 4000)} employees."
+                for _ in range(rng.randint(4, 9))
+            ),
+            "authors": [f"{rng.choice(['Smith', 'Garcia', 'Chen', 'Okafor', 'Novak'])} {chr(65 + rng.randrange(26))}"
+                        for _ in range(rng.randint(1, 6))],
+            "publication_date": f"{year} {rng.choice(MONTHS)}",
+            "journal": rng.choice(JOURNALS),
+            "keywords": rng.sample(MESH_TERMS, 3),
+        }
+
+    def medline(self, pmid: int) -> str:
+        article = self.article(pmid)
+        lines = [f"PMID- {article['pmid']}", f"TI  - {article['title']}", f"AB  - {article['abstract']}"]
+        lines += [f"AU  - {author}" for author in article["authors"]]
+        lines += [f"DP  - {article['publication_date']}", f"JT  - {article['journal']}"]
+        lines += [f"MH  - {term}" for term in article["keywords"]]
+        return "\n".join(lines) + "\n"
+
+    def search(self, term: str, retmax: int) -> List[str]:
+        """Deterministic result list for a search term"""
+        rng = random.Random(_seed(self.seed, "search", " ".join(term.split())))
+        count = min(retmax, self.size)
+        return [str(pmid) for pmid in rng.sample(range(1, self.size + 1), count)]
+
+
+class FakeEntrez:
+    """Stand-in for the Bio.Entrez module: esearch (with history server), efetch and read"""
+
+    def __init__(self, corpus: SyntheticCorpus, latency: Latency):
+        self.corpus = corpus
+        self.latency = latency
+        self.email = None
+        self.api_key = None
+        self.history: Dict[str, List[str]] = {}
+        self.calls = {"esearch": 0, "efetch": 0}
+
+    def esearch(self, db: str, term: str, retmax: int = 20, usehistory: Optional[str] = None,
+                webenv: Optional[str] = None, **kwargs):
+        self.calls["esearch"] += 1
+        self.latency.sleep()
+        if term.startswith("#"):
+            ids = sorted({pmid for key in term.replace("OR", " ").split() for pmid in self.history[key.lstrip("#")]})
+        else:
+            ids = self.corpus.search(term, retmax if not usehistory else self.corpus.size // 10)
+        result = {"Count": str(len(ids)), "IdList": ids[:retmax]}
+        if usehistory:
+            query_key = str(len(self.history) + 1)
+            self.history[query_key] = ids
+            result.update(WebEnv="STANDIN", QueryKey=query_key)
+        return io.StringIO(json.dumps(result))
+
+    def efetch(self, db: str, id: Optional[str] = None, query_key: Optional[str] = None, retstart: int = 0,
+               retmax: int = 20, rettype: str = "medline", retmode: str = "text", **kwargs):
+        self.calls["efetch"] += 1
+        pmids = id.split(",") if id else self.history[query_key][retstart:retstart + retmax]
+        self.latency.sleep(len(pmids))
+        return io.StringIO("\n".join(self.corpus.medline(int(pmid)) for pmid in pmids))
+
+    def read(self, handle) -> Dict:
+        return json.loads(handle.read())
+
+
+class FakeEmbeddingModel:
+    """Stand-in for SentenceTransformer: hashing-trick embeddings, so shared words give nearby vectors"""
+
+    def __init__(self, model_name_or_path: Optional[str] = None, latency: Optional[Latency] = None,
+                 dimension: int = EMBEDDING_DIMENSION):
+        self.model_name = model_name_or_path
+        self.latency = latency or Latency()
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in text.lower().split():
+            h = _seed("word", word)
+            vector[h % self.dimension] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        self.latency.sleep(len(texts))
+        vectors = np.stack([self._embed(text) for text in texts]) if texts else np.zeros((0, self.dimension))
+        return vectors[0] if single else vectors
+
+
+class FakePineconeError(Exception):
+    """What the Pinecone client raises for a failed request; ``status`` is the HTTP status"""
+
+    def __init__(self, status: int, reason: str = "injected failure"):
+        super().__init__(f"({status}) {reason}")
+        self.status = status
+
+
+class FakePineconeIndex:
+    """In-process vector index with the upsert/query/delete surface of pinecone.Index.
+
+    Each namespace is a separate partition, as in Pinecone. ``fail_next``
+    makes the next write requests raise, to exercise retries; requests may
+    arrive from several threads at once and the peak is kept in ``max_in_flight``.
+    """
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION, latency: Optional[Latency] = None):
+        self.dimension = dimension
+        self.namespaces: Dict[str, Tuple[QuantizedVectorStore, Dict[str, Dict]]] = {}
+        self.latency = latency or Latency()
+        self.lock = threading.Lock()
+        self.failures: List[int] = []
+        self.requests: List[Tuple[str, str, int]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def store(self) -> QuantizedVectorStore:
+        return self._partition("")[0]
+
+    @property
+    def metadata(self) -> Dict[str, Dict]:
+        return self._partition("")[1]
+
+    def _partition(self, namespace: Optional[str]):
+        if (namespace or "") not in self.namespaces:
+            self.namespaces[namespace or ""] = (QuantizedVectorStore(self.dimension, dtype="float32"), {})
+        return self.namespaces[namespace or ""]
+
+    def fail_next(self, requests: int = 1, status: int = 503) -> None:
+        """Make the next ``requests`` upsert/delete calls raise with ``status``"""
+        with self.lock:
+            self.failures.extend([status] * requests)
+
+    @contextlib.contextmanager
+    def _write(self, operation: str, namespace: Optional[str], size: int):
+        with self.lock:
+            self.requests.append((operation, namespace or "", size))
+            status = self.failures.pop(0) if self.failures else None
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            self.latency.sleep(size)
+            if status is not None:
+                raise FakePineconeError(status)
+            with self.lock:
+                yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def upsert(self, vectors: List[Dict], namespace: Optional[str] = None, **kwargs) -> Dict:
+        with self._write("upsert", namespace, len(vectors)):
+            store, metadata = self._partition(namespace)
+            ids = [v["id"] for v in vectors]
+            existing = [i for i in ids if i in metadata]
+            if existing:
+                store.remove(existing)
+            store.add(ids, np.array([v["values"] for v in vectors], dtype=np.float32))
+            metadata.update({v["id"]: v.get("metadata", {}) for v in vectors})
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector, top_k: int = 10, include_metadata: bool = False, filter: Optional[Dict] = None,
+              namespace: Optional[str] = None, **kwargs):
+        self.latency.sleep(0)
+        store, metadata = self._partition(namespace)
+        # A server-side filter sees every candidate, so rank them all when filtering
+        hits = store.search(vector, len(store) if filter else top_k) if len(store) else []
+        matches = []
+        for pmid, score in hits:
+            if filter and any(metadata[pmid].get(k) != v for k, v in filter.items()):
+                continue
+            matches.append(SimpleNamespace(id=pmid, score=score, metadata=metadata[pmid] if include_metadata else None))
+            if len(matches) == top_k:
+                break
+        return SimpleNamespace(matches=matches)
+
+    def delete(self, ids: Sequence[str], namespace: Optional[str] = None, **kwargs) -> Dict:
+        with self._write("delete", namespace, 0):
+            store, metadata = self._partition(namespace)
+            present = [i for i in ids if i in metadata]
+            store.remove(present)
+            for i in present:
+                del metadata[i]
+        return {}
+
+    def describe_index_stats(self) -> Dict:
+        namespaces = {name: {"vector_count": len(store)} for name, (store, _) in self.namespaces.items()}
+        return {
+            "namespaces": namespaces,
+            "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values()),
+            "dimension": self.dimension
+        }
+
+
+class FakePinecone:
+    """Stand-in for the pinecone module: init, list_indexes, create_index, Index"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.indexes: Dict[str, FakePineconeIndex] = {}
+
+    def init(self, api_key: str = None, environment: str = None) -> None:
+        pass
+
+    def list_indexes(self) -> List[str]:
+        return list(self.indexes)
+
+    def create_index(self, name: str, dimension: int = EMBEDDING_DIMENSION, metric: str = "cosine", **kwargs) -> None:
+        self.indexes[name] = FakePineconeIndex(dimension, self.latency)
+
+    def Index(self, name: str) -> FakePineconeIndex:
+        if name not in self.indexes:
+            self.create_index(name)
+        return self.indexes[name]
+
+
+class _AsyncResults:
+    def __init__(self, documents: List[Dict]):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class FakeSearchClient:
+    """Stand-in for azure.search.documents.aio.SearchClient"""
+
+    def __init__(self, corpus: SyntheticCorpus, latency: Latency, endpoint: str = None, index_name: str = None,
+                 credential: Any = None, **kwargs):
+        self.corpus = corpus
+        self.latency = latency
+        self.documents: Dict[str, Dict] = {}
+        self.calls = 0
+
+    async def search(self, search_text: str, top: int = 5, **kwargs) -> _AsyncResults:
+        self.calls += 1
+        await self.latency.asleep()
+        documents = []
+        for pmid in self.corpus.search(f"grounding {search_text}", top):
+            article = self.corpus.article(int(pmid))
+            documents.append({"id": pmid, "title": article["title"], "content": article["abstract"],
+                              "@search.score": 1.0 / (len(documents) + 1)})
+        return _AsyncResults(documents)
+
+    async def upload_documents(self, documents: List[Dict], **kwargs) -> List[SimpleNamespace]:
+        await self.latency.asleep(len(documents))
+        self.documents.update({d["id"]: d for d in documents})
+        return [SimpleNamespace(key=d["id"], succeeded=True, status_code=201, error_message=None)
+                for d in documents]
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeSearchIndexClient:
+    """Stand-in for azure.search.documents.indexes.SearchIndexClient"""
+
+    def __init__(self, endpoint: str = None, credential: Any = None, **kwargs):
+        self.indexes = []
+
+    def list_indexes(self):
+        return list(self.indexes)
+
+    def create_index(self, index):
+        self.indexes.append(index)
+        return index
+
+
+class FakeBlobStorage:
+    """In-memory stand-in for BlobStorageService with per-call and per-MiB latency"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.blobs: Dict[str, bytes] = {}
+        self.etags: Dict[str, str] = {}
+
+    def put(self, blob_name: str, data: bytes) -> str:
+        """Seed a blob directly, without injected latency"""
+        self.blobs[blob_name] = data
+        self.etags[blob_name] = f'"0x{_seed(blob_name, len(data)) & 0xFFFFFFFF:08X}"'
+        return self.etags[blob_name]
+
+    async def upload_stream(self, blob_name: str, stream, length: Optional[int] = None) -> str:
+        data = stream.read()
+        await self.latency.asleep(len(data) / 2**20)
+        return self.put(blob_name, data)
+
+    async def get_etag(self, blob_name: str) -> str:
+        await self.latency.asleep(0)
+        return self.etags[blob_name]
+
+    async def download_to_file(self, blob_name: str, stream, etag: Optional[str] = None) -> int:
+        data = self.blobs[blob_name]
+        await self.latency.asleep(len(data) / 2**20)
+        return stream.write(data)
+
+    async def close(self) -> None:
+        pass
+
+
+def _default_reply(messages) -> str:
+    return "Based on the retrieved studies, engagement rises when managers provide regular feedback [1]."
+
+
+def fake_chat_model(latency: Latency, respond: Callable[[List[Any]], str] = _default_reply):
+    """LangChain chat model stand-in; ``respond`` maps the prompt messages to the reply text"""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+    class FakeChatModel(BaseChatModel):
+        @property
+        def _llm_type(self) -> str:
+            return "stand-in"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            latency.sleep()
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=respond(messages)))])
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await latency.asleep()
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=respond(messages)))])
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            await latency.asleep()
+            # Word by word, like a token stream
+            for word in re.findall(r"\S+\s*", respond(messages)):
+                yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+    return FakeChatModel()
+
+
+class FakeAnthropic:
+    """Stand-in for the synchronous anthropic.Anthropic client; like the SDK, it blocks its caller"""
+
+    def __init__(self, latency: Latency, respond: Callable[[List[Dict]], str] = _default_reply):
+        self.latency = latency
+        self.respond = respond
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, model: str, max_tokens: int, messages: List[Dict], **kwargs):
+        self.latency.sleep()
+        text = self.respond(messages)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(input_tokens=sum(len(str(m.get("content", ""))) // 4 for m in messages),
+                                  output_tokens=len(text) // 4),
+        )
+
+
+class InMemoryArticleStore:
+    """Stand-in for the db_utils functions ResearchAgent calls, with blocking per-call latency like psycopg2"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.articles: Dict[str, SimpleNamespace] = {}
+        self.cached: Dict[int, Dict] = {}
+        self.history: List[Dict] = []
+        self.conversations: Dict[str, Dict] = {}
+
+    def save_article(self, article_data: Dict):
+        self.latency.sleep()
+        existing = self.articles.get(article_data["pmid"])
+        if existing is not None:
+            return existing
+        article = SimpleNamespace(id=len(self.articles) + 1, **article_data)
+        self.articles[article_data["pmid"]] = article
+        return article
+
+    def get_article_by_pmid(self, pmid: str):
+        self.latency.sleep()
+        return self.articles.get(pmid)
+
+    def get_articles_by_pmids(self, pmids: List[str]) -> Dict[str, Dict]:
+        self.latency.sleep(len(pmids) / 100)
+        rows = {}
+        for pmid in pmids:
+            if pmid in self.articles:
+                row = {field: getattr(self.articles[pmid], field, None) for field in DISPLAY_FIELDS}
+                # Postgres returns a DateTime, which get_articles_by_pmids renders as an ISO date
+                if hasattr(row["publication_date"], "date"):
+                    row["publication_date"] = row["publication_date"].date().isoformat()
+                rows[pmid] = row
+        return rows
+
+    def get_dedup_signatures(self) -> List[Tuple[str, bytes]]:
+        self.latency.sleep(len(self.articles) / 1000)
+        return [(pmid, a.dedup_signature) for pmid, a in self.articles.items()
+                if getattr(a, "dedup_signature", None) and not getattr(a, "duplicate_of", None)]
+
+    def save_search_history(self, query: str, article_ids: List[int], user_id: Optional[str] = None):
+        self.latency.sleep()
+        entry = {"id": len(self.history) + 1, "query": query, "article_ids": article_ids, "user_id": user_id}
+        self.history.append(entry)
+        return SimpleNamespace(**entry)
+
+    def update_cache_entry(self, article_id: int, relevance_score: float = 1.0) -> None:
+        self.latency.sleep()
+        entry = self.cached.setdefault(article_id, {"access_count": 0})
+        entry["access_count"] += 1
+
+    def get_cached_articles(self, limit: int = 100) -> List:
+        self.latency.sleep()
+        by_id = {a.id: a for a in self.articles.values()}
+        return [by_id[i] for i in list(self.cached)[-limit:]]
+
+    def get_popular_queries(self, limit: int = 50, days: int = 30, recent: int = 10) -> List[Dict]:
+        self.latency.sleep()
+        counts = Counter(" ".join(entry["query"].split()).lower() for entry in self.history)
+        latest = [" ".join(entry["query"].split()).lower() for entry in reversed(self.history)]
+        keys = [key for key, _ in counts.most_common(limit)] + latest[:recent]
+        return [{"query": key, "count": counts[key], "last_searched": None} for key in dict.fromkeys(keys)]
+
+    def get_conversation_session(self, session_id: str) -> Optional[Dict]:
+        self.latency.sleep()
+        state = self.conversations.get(session_id)
+        return json.loads(json.dumps(state)) if state else None
+
+    def save_conversation_session(self, session_id: str, state: Dict) -> None:
+        self.latency.sleep()
+        # Round-tripped through JSON like the JSONB column, so no state is shared between loads
+        self.conversations[session_id] = json.loads(json.dumps(state))
+
+    def session(self) -> "FakeSession":
+        return FakeSession(self)
+
+
+class FakeSession:
+    """Stand-in for a SQLAlchemy session: add() buffers, commit() pays one round trip"""
+
+    def __init__(self, store: InMemoryArticleStore):
+        self.store = store
+        self.pending = []
+
+    def add(self, obj) -> None:
+        self.pending.append(obj)
+
+    def commit(self) -> None:
+        self.store.latency.sleep(len(self.pending) / 100)
+        for obj in self.pending:
+            pmid = getattr(obj, "pmid", None)
+            if pmid is not None:
+                fields = {field: getattr(obj, field, None) for field in DISPLAY_FIELDS + ("dedup_signature", "duplicate_of")}
+                self.store.articles.setdefault(pmid, SimpleNamespace(id=len(self.store.articles) + 1, pmid=pmid, **fields))
+        self.pending = []
+
+    def rollback(self) -> None:
+        self.pending = []
+
+    def close(self) -> None:
+        pass
+
+
+class StandIns:
+    """Every stand-in for one benchmark run, sharing a corpus and a latency profile"""
+
+    def __init__(self, profile: LatencyProfile, corpus: SyntheticCorpus, stack: contextlib.ExitStack):
+        self.profile = profile
+        self.corpus = corpus
+        self.stack = stack
+        self.entrez = FakeEntrez(corpus, profile["entrez"])
+        self.pinecone = FakePinecone(profile["pinecone"])
+        self.blob_storage = FakeBlobStorage(profile["blob"])
+        self.database = InMemoryArticleStore(profile["database"])
+        self.anthropic = FakeAnthropic(profile["llm"])
+        self.search_clients: List[FakeSearchClient] = []
+
+    def embedding_model(self, model_name_or_path: Optional[str] = None, **kwargs) -> FakeEmbeddingModel:
+        return FakeEmbeddingModel(model_name_or_path, self.profile["embedding"])
+
+    def search_client(self, *args, **kwargs) -> FakeSearchClient:
+        client = FakeSearchClient(self.corpus, self.profile["search"], *args, **kwargs)
+        self.search_clients.append(client)
+        return client
+
+    def chat_model(self, respond: Callable[[List[Any]], str] = _default_reply):
+        return fake_chat_model(self.profile["llm"], respond)
+
+    def patch(self, target: str, value: Any, **kwargs) -> None:
+        """Patch ``target`` for the rest of the run"""
+        self.stack.enter_context(patch(target, value, **kwargs))
+
+    def usage(self) -> Dict[str, Dict[str, float]]:
+        return self.profile.usage()
+
+
+SERVICES = ("pubmed", "pinecone", "search", "blob")
+
+
+@contextlib.contextmanager
+def stand_ins(profile: Optional[LatencyProfile] = None, corpus: Optional[SyntheticCorpus] = None,
+              services: Iterable[str] = SERVICES):
+    """Patch the client libraries behind ``services`` with stand-ins for the duration of the block"""
+    profile = profile or LatencyProfile()
+    with contextlib.ExitStack() as stack:
+        env = StandIns(profile, corpus or SyntheticCorpus(seed=profile.seed), stack)
+        services = set(services)
+        if "pubmed" in services:
+            env.patch("src.services.pubmed_service.Entrez", env.entrez)
+            env.patch("src.services.pubmed_service.SentenceTransformer", env.embedding_model)
+        if "pinecone" in services:
+            env.patch("src.services.pinecone_service.pinecone", env.pinecone)
+        if "search" in services:
+            env.patch("src.services.bing_service.SearchClient", env.search_client)
+            env.patch("src.services.bing_service.SearchIndexClient", FakeSearchIndexClient)
+        if "blob" in services:
+            env.patch("src.services.blob_service.BlobStorageService", lambda *a, **k: env.blob_storage)
+            env.patch("src.tools.data_analysis_tool.BlobStorageService", lambda *a, **k: env.blob_storage)
+        yield env
+
+
+def build_pinecone_service(env: StandIns):
+    from src.config.settings import settings
+    from src.services.pinecone_service import PineconeService
+    return PineconeService(api_key="stand-in", environment="local", index_name=settings.PINECONE_INDEX_NAME)
+
+
+def build_pubmed_service(env: StandIns, response_cache=None):
+    """Real PubMedService over the Entrez, embedding, Pinecone and database stand-ins; no persistent cache unless given"""
+    from src.config.settings import settings
+    from src.services.pubmed_service import PubMedService
+    from src.services.article_hydrator import ArticleHydrator
+    from src.utils.dedup import Deduplicator
+    from src.utils.rate_limit import RateLimiter
+    with patch.object(settings, "PUBMED_CACHE_PATH", ""):
+        return PubMedService(
+            email="bench@example.com",
+            api_key="stand-in",
+            pinecone_service=build_pinecone_service(env),
+            embedding_model=settings.EMBEDDING_MODEL,
+            response_cache=response_cache,
+            article_hydrator=ArticleHydrator(env.database.get_articles_by_pmids, maxsize=settings.ARTICLE_ROW_CACHE_SIZE,
+                                             ttl=settings.ARTICLE_ROW_CACHE_TTL),
+            deduplicator=Deduplicator(env.database.get_dedup_signatures),
+            # The Entrez stand-in has no NCBI quota, so measure our own latency rather than the throttle's
+            entrez_limiter=RateLimiter(0)
+        )
+
+
+def build_research_agent(env: StandIns, pubmed_service=None):
+    """ResearchAgent whose tools, database and LLM are stand-ins over the real services"""
+    from src.agents import research_agent
+    from src.services.bing_service import BingGroundingService
+    from src.tools.bing_grounding_tool import BingGroundingTool
+    from src.tools.pinecone_tool import PineconeTool
+    from src.tools.pubmed_tool import PubMedTool
+
+    for name in ("save_article", "get_article_by_pmid", "save_search_history", "update_cache_entry",
+                 "get_cached_articles"):
+        env.patch(f"src.agents.research_agent.{name}", getattr(env.database, name))
+
+    pubmed_service = pubmed_service or build_pubmed_service(env)
+    # Bypass __init__: it wires LangChain tool wrappers to live clients
+    agent = research_agent.ResearchAgent.__new__(research_agent.ResearchAgent)
+    agent.llm = env.chat_model()
+    agent.pubmed_tool = PubMedTool(service=pubmed_service)
+    agent.pinecone_tool = PineconeTool(pubmed_service=pubmed_service)
+    agent.bing_grounding_tool = BingGroundingTool(BingGroundingService())
+    agent.research_chain = agent._create_research_chain()
+    return agent
+
+
+def build_data_analysis_tool(env: StandIns, cache_dir: str):
+    """DataAnalysisTool reading from the blob stand-in, with its dataset cache in ``cache_dir``"""
+    from src.config.settings import settings
+    from src.tools.data_analysis_tool import DataAnalysisTool
+    from src.utils.dataset_cache import DatasetCache
+    tool = DataAnalysisTool()
+    tool.dataset_cache = DatasetCache(cache_dir, settings.DATASET_CACHE_MAX_BYTES)
+    return tool
@@ -0,0 +1,156 @@
+import re
+import json
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+GRAPH_TYPES = ("line", "bar", "scatter", "histogram", "box")
+
+# Phrases that unambiguously name a graph type, checked longest first
+GRAPH_TYPE_PHRASES = {
+    "line": ["line graph", "line chart", "line plot", "trend", "over time", "line"],
+    "bar": ["bar chart", "bar graph", "bar plot", "column chart", "bar"],
+    "scatter": ["scatter plot", "scatterplot", "scatter"],
+    "histogram": ["histogram", "distribution of", "frequency of"],
+    "box": ["box plot", "boxplot", "box and whisker", "box"],
+}
+
+ANALYSIS_PHRASES = ["summary statistics", "statistics", "summarize", "summary", "describe",
+                    "correlation", "missing values", "analyze", "analyse", "analysis"]
+
+COLOR_MARKERS = ["colored by", "coloured by", "color by", "colour by", "split by", "broken down by"]
+GROUP_MARKERS = ["grouped by", "for each", "across", "per", "by"]
+X_MARKERS = ["versus", "vs", "against", "over"]
+
+
+def normalize_request(request: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so equivalent requests share a cache key"""
+    text = re.sub(r"[^\w\s]", " ", request.lower()).replace("_", " ")
+    return " ".join(text.split())
+
+
+def schema_fingerprint(schema: Dict[str, str]) -> str:
+    """Stable hash of column names and types"""
+    return hashlib.sha256(json.dumps(sorted(schema.items())).encode("utf-8")).hexdigest()[:16]
+
+
+def _find_phrase(text: str, phrase: str) -> int:
+    match = re.search(rf"\b{re.escape(phrase)}\b", text)
+    return match.start() if match else -1
+
+
+def _column_mentions(text: str, schema: Dict[str, str]) -> List[Tuple[int, int, str]]:
+    """(start, end, column) for every column named in the request, longest names first, non-overlapping"""
+    mentions = []
+    taken = set()
+    for column in sorted(schema, key=len, reverse=True):
+        phrase = normalize_request(column)
+        if not phrase:
+            continue
+        for match in re.finditer(rf"\b{re.escape(phrase)}s?\b", text):
+            span = set(range(match.start(), match.end()))
+            if span & taken:
+                continue
+            taken |= span
+            mentions.append((match.start(), match.end(), column))
+            break
+    return sorted(mentions)
+
+
+def _column_after(text: str, markers: List[str], mentions) -> Optional[str]:
+    """Column mentioned immediately after one of ``markers``"""
+    for marker in markers:
+        for match in re.finditer(rf"\b{re.escape(marker)}\s+(?:the\s+)?", text):
+            for start, _, column in mentions:
+                if start == match.end():
+                    return column
+    return None
+
+
+def detect_graph_type(text: str) -> Optional[str]:
+    best = None
+    for graph_type, phrases in GRAPH_TYPE_PHRASES.items():
+        for phrase in phrases:
+            position = _find_phrase(text, phrase)
+            if position >= 0 and (best is None or position < best[0]):
+                best = (position, graph_type)
+    return best[1] if best else None
+
+
+def parse_request(request: str, schema: Dict[str, str]) -> Optional[Dict]:
+    """Resolve an explicit request into a plan without an LLM.
+
+    Returns None when the graph type or the columns it needs cannot be
+    determined unambiguously from the request and dataset schema.
+    """
+    text = normalize_request(request)
+    graph_type = detect_graph_type(text)
+    mentions = _column_mentions(text, schema)
+
+    if graph_type is None:
+        if any(_find_phrase(text, phrase) >= 0 for phrase in ANALYSIS_PHRASES) and "graph" not in text \
+                and "plot" not in text and "chart" not in text:
+            return {"analysis_type": "analysis"}
+        return None
+
+    columns = [column for _, _, column in mentions]
+    color_col = _column_after(text, COLOR_MARKERS, mentions)
+    remaining = [c for c in columns if c != color_col]
+
+    if graph_type == "histogram":
+        if not remaining:
+            return None
+        x_col, y_col = remaining[0], None
+    else:
+        group_col = _column_after(text, GROUP_MARKERS, mentions)
+        x_after = _column_after(text, X_MARKERS, mentions)
+        x_col = x_after or group_col
+        others = [c for c in remaining if c != x_col]
+        if x_col is None:
+            if len(remaining) < 2:
+                return None
+            x_col, others = remaining[0], remaining[1:]
+        if not others:
+            if graph_type != "bar":
+                return None
+            y_col = None
+        else:
+            y_col = others[0]
+        if color_col is None and group_col not in (None, x_col) and group_col != y_col:
+            color_col = group_col
+
+    return validate_plan({
+        "analysis_type": "graph",
+        "graph_type": graph_type,
+        "x_col": x_col,
+        "y_col": y_col,
+        "color_col": color_col,
+    }, schema)
+
+
+def validate_plan(plan: Dict, schema: Dict[str, str]) -> Optional[Dict]:
+    """Check a plan against the schema; returns the cleaned plan or None if unusable"""
+    if not isinstance(plan, dict):
+        return None
+    if plan.get("analysis_type") == "analysis":
+        return {"analysis_type": "analysis"}
+    if plan.get("graph_type") not in GRAPH_TYPES:
+        return None
+
+    cleaned = {"analysis_type": "graph", "graph_type": plan["graph_type"]}
+    for key in ("x_col", "y_col", "color_col"):
+        column = plan.get(key) or None
+        if column is not None and column not in schema:
+            return None
+        cleaned[key] = column
+    if cleaned["x_col"] is None:
+        return None
+    if cleaned["graph_type"] in ("line", "scatter") and cleaned["y_col"] is None:
+        return None
+    return cleaned
+
+
+def graph_params(plan: Dict) -> Optional[Dict]:
+    """Keyword arguments for DataAnalysisTool.generate_graph"""
+    if plan.get("analysis_type") != "graph":
+        return None
+    return {key: plan[key] for key in ("graph_type", "x_col", "y_col", "color_col")}
@@ -1,69 +1,103 @@
 from .base_agent import BaseAgent
 from src.tools.data_analysis_tool import DataAnalysisTool
+from src.agents.analysis_planner import (
+    graph_params,
+    normalize_request,
+    parse_request,
+    schema_fingerprint,
+    validate_plan
+)
+from src.config.settings import settings
+from src.utils.memory import cache_registry
+from src.utils.llm_cache import llm_cache
+from cachetools import TTLCache
+from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.exceptions import OutputParserException
 
 class DataAnalysisAgent(BaseAgent):
     def __init__(self, memory=None):
         tools = [DataAnalysisTool()]
         super().__init__(tools, memory)
-        
+        self.llm = ChatOpenAI(
+            model=settings.OPENAI_MODEL,
+            temperature=0,
+            api_key=settings.OPENAI_API_KEY,
+            cache=llm_cache.langchain_cache("data_analysis", settings.OPENAI_MODEL, 0)
+        )
+
         # Create a prompt template for data analysis
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a data analysis expert. Your task is to:
             1. Understand the user's request for data analysis or visualization
             2. Determine the appropriate graph type and parameters
-            3. Generate the requested analysis or visualization
-            4. Provide insights about the results
-            
+            3. Choose the dataset columns to plot
+
             Available graph types: line, bar, scatter, histogram, box
+            Dataset columns (name: type): {columns}
+
+            Respond with only a JSON object of the form
+            {{"analysis_type": "graph" or "analysis", "graph_type": ..., "x_col": ..., "y_col": ..., "color_col": ...}}
+            using exact column names, and null for unused fields.
             """),
             ("user", "{input}")
         ])
-        
+
         # Create the chain
-        self.chain = (
-            {"input": RunnablePassthrough()}
-            | self.prompt
-            | StrOutputParser()
-        )
+        self.chain = self.prompt | self.llm | JsonOutputParser()
+
+        # Structured plans produced by the LLM, keyed by (normalized request, schema fingerprint)
+        self.plan_cache = TTLCache(maxsize=settings.PLAN_CACHE_SIZE, ttl=settings.PLAN_CACHE_TTL)
+        # Plans cost an LLM call to rebuild, so they are shed last
+        cache_registry.register_mapping("analysis_plans", self.plan_cache, priority=30)
+
+    async def plan_request(self, request: str, schema: dict) -> tuple:
+        """Return (plan, source): deterministic parse, cached LLM plan, a fresh LLM plan, or the fallback"""
+        plan = parse_request(request, schema)
+        if plan is not None:
+            return plan, "deterministic"
+
+        key = (normalize_request(request), schema_fingerprint(schema))
+        plan = self.plan_cache.get(key)
+        if plan is not None:
+            return plan, "cache"
+
+        try:
+            llm_plan = await self.chain.ainvoke({
+                "input": request,
+                "columns": ", ".join(f"{name}: {dtype}" for name, dtype in schema.items())
+            })
+        except OutputParserException:
+            llm_plan = None
+        plan = validate_plan(llm_plan, schema)
+        if plan is None:
+            # No usable plan: summary statistics, flagged so the caller can tell the user
+            return {"analysis_type": "analysis"}, "fallback"
+        self.plan_cache[key] = plan
+        return plan, "llm"
 
     async def analyze_request(self, request: str, blob_name: str) -> dict:
         """Process a data analysis request"""
-        # First, use the LLM to understand the request
-        analysis_plan = await self.chain.ainvoke(request)
-        
+        tool = self.tools[0]
+        schema = await tool.get_schema(blob_name)
+        analysis_plan, plan_source = await self.plan_request(request, schema)
+
         # Then, use the data analysis tool to execute the plan
-        result = await self.tools[0].run(
+        result = await tool.run(
             blob_name=blob_name,
-            analysis_type="graph" if "graph" in request.lower() else "analysis",
-            graph_params=self._parse_graph_params(analysis_plan)
+            analysis_type=analysis_plan["analysis_type"],
+            graph_params=graph_params(analysis_plan)
         )
-        
-        return {
+
+        response = {
             "analysis_plan": analysis_plan,
+            "plan_source": plan_source,
             "result": result
         }
-
-    def _parse_graph_params(self, analysis_plan: str) -> dict:
-        """Parse the analysis plan to extract graph parameters"""
-        # This is a simplified version - you might want to make this more sophisticated
-        params = {}
-        if "line" in analysis_plan.lower():
-            params["graph_type"] = "line"
-        elif "bar" in analysis_plan.lower():
-            params["graph_type"] = "bar"
-        elif "scatter" in analysis_plan.lower():
-            params["graph_type"] = "scatter"
-        elif "histogram" in analysis_plan.lower():
-            params["graph_type"] = "histogram"
-        elif "box" in analysis_plan.lower():
-            params["graph_type"] = "box"
-            
-        # You would need to extract x_col, y_col, and color_col from the analysis plan
-        # This is a placeholder - implement proper parsing based on your needs
-        params["x_col"] = "default_x_column"
-        params["y_col"] = "default_y_column"
-        
-        return params 
\ No newline at end of file
+        if plan_source == "fallback":
+            response["warning"] = (
+                "Could not turn the request into a graph or analysis of this dataset's columns; "
+                "returning summary statistics instead."
+            )
+        return response
@@ -1,4 +1,5 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import AsyncIterator, List, Dict, Any, Optional, Set
 from langchain.agents import AgentExecutor
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, AIMessage
@@ -7,6 +8,10 @@ from langchain_core.runnables import RunnablePassthrough
 from langchain_openai import ChatOpenAI
 from src.config.settings import settings
 from src.tools.pubmed_tool import PubMedTool
+from src.services.pubmed_service import HR_MESH_FILTER
+from src.utils.tracing import span, traced
+from src.utils.llm_cache import llm_cache
+from src.utils.dedup import collapse_duplicates
 from src.tools.pinecone_tool import PineconeTool
 from src.tools.bing_grounding_tool import BingGroundingTool
 from src.db.db_utils import (
@@ -17,15 +22,19 @@ from src.db.db_utils import (
     get_cached_articles
 )
 
+# Saves started by streamed queries; referenced here so they finish after the stream is closed
+_background_tasks: Set[asyncio.Task] = set()
+
 class ResearchAgent:
     def __init__(self):
         self.llm = ChatOpenAI(
             model=settings.OPENAI_MODEL,
             temperature=0.7,
-            api_key=settings.OPENAI_API_KEY
+            api_key=settings.OPENAI_API_KEY,
+            cache=llm_cache.langchain_cache("research", settings.OPENAI_MODEL, 0.7, opt_in=settings.LLM_CACHE_SAMPLED)
         )
-        self.pubmed_tool = PubMedTool()
         self.pinecone_tool = PineconeTool()
+        self.pubmed_tool = PubMedTool(service=self.pinecone_tool.pubmed_service)
         self.bing_grounding_tool = BingGroundingTool()
         
         # Initialize the research chain
@@ -64,63 +73,80 @@ class ResearchAgent:
         
         return chain
     
+    @traced("research.process_query")
     async def process_query(self, query: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Process a research query and return results."""
         try:
             # Check cache first
-            cached_articles = get_cached_articles(limit=10)
+            with span("postgres.cached_articles") as stage:
+                cached_articles = get_cached_articles(limit=10)
+                stage.set_size(len(cached_articles))
             if cached_articles:
                 # Use Pinecone to find most relevant cached articles
-                cached_results = await self.pinecone_tool.similarity_search(
-                    query,
-                    filter={"is_cached": True},
-                    k=5
-                )
+                with span("pinecone.cached_search") as stage:
+                    cached_results = await self.pinecone_tool.similarity_search(
+                        query,
+                        filter={"is_cached": True},
+                        k=5
+                    )
+                    stage.set_size(len(cached_results or []))
                 if cached_results:
                     return {
                         "status": "success",
                         "source": "cache",
-                        "articles": [self._format_article(article) for article in cached_results],
+                        "articles": [self._format_article(article) for article in collapse_duplicates(cached_results)],
                         "message": "Results retrieved from cache"
                     }
             
             # If no cached results, perform new search with HR/I-O focus
-            search_results = await self.pubmed_tool.search(
-                f"{query} AND (industrial psychology[MeSH] OR organizational behavior[MeSH] OR personnel management[MeSH])"
-            )
+            with span("pubmed.search") as stage:
+                search_results = await self.pubmed_tool.run(
+                    f"{query} AND {HR_MESH_FILTER}"
+                )
+                stage.set_size(len(search_results or []))
             if not search_results:
                 return {
                     "status": "error",
                     "message": "No results found"
                 }
+            # Reprints and re-posted abstracts would otherwise be saved and shown twice
+            search_results = collapse_duplicates(search_results)
             
             # Add Bing grounding
-            grounding_results = await self.bing_grounding_tool.run(query)
+            with span("bing.search"):
+                grounding_results = await self.bing_grounding_tool.run(query)
             
             # Save articles to database
             article_ids = []
-            for article in search_results:
-                db_article = save_article(article)
-                if db_article:
-                    article_ids.append(db_article.id)
-                    # Update cache entry
-                    update_cache_entry(db_article.id)
+            with span("postgres.save_articles", size=len(search_results)):
+                for article in search_results:
+                    db_article = save_article(article)
+                    if db_article:
+                        article_ids.append(db_article.id)
+                        # Update cache entry
+                        update_cache_entry(db_article.id)
             
             # Save search history
             if article_ids:
-                save_search_history(query, article_ids, user_id)
+                with span("postgres.save_history"):
+                    save_search_history(query, article_ids, user_id)
             
             # Get similar articles from Pinecone
-            similar_articles = await self.pinecone_tool.similarity_search(
-                query,
-                k=5
-            )
+            with span("pinecone.search") as stage:
+                similar_articles = await self.pinecone_tool.similarity_search(
+                    query,
+                    k=5
+                )
+                stage.set_size(len(similar_articles or []))
             
             return {
                 "status": "success",
                 "source": "new_search",
                 "articles": [self._format_article(article) for article in search_results],
-                "similar_articles": [self._format_article(article) for article in similar_articles],
+                "similar_articles": [
+                    self._format_article(article)
+                    for article in collapse_duplicates(similar_articles or [], exclude=search_results)
+                ],
                 "grounding_results": grounding_results,
                 "message": "New search completed successfully"
             }
@@ -131,6 +157,178 @@ class ResearchAgent:
                 "message": f"Error processing query: {str(e)}"
             }
     
+    async def stream_query(self, query: str, user_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Process a research query, yielding each stage's results as soon as they are ready.
+
+        Events arrive in a fixed order: ``articles``, ``similar_articles``,
+        ``grounding``, ``answer`` chunks of the model's reply, then ``done``.
+        An ``error`` event ends the stream early. The work runs in its own
+        task, so it is cancelled if the consumer stops reading; saving the
+        articles and search history still completes.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.ensure_future(self._produce_events(query, user_id, events))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            producer.cancel()
+
+    async def _produce_events(self, query: str, user_id: Optional[str], events: asyncio.Queue) -> None:
+        # Retrieval stages start together; each result is sent once the ones before it are
+        pubmed = asyncio.ensure_future(self.pubmed_tool.run(f"{query} AND {HR_MESH_FILTER}"))
+        similar = asyncio.ensure_future(self.pinecone_tool.similarity_search(query, k=5))
+        grounding = asyncio.ensure_future(self.bing_grounding_tool.run(query))
+        try:
+            with span("pubmed.search") as stage:
+                search_results = collapse_duplicates(await pubmed or [])
+                stage.set_size(len(search_results))
+            if not search_results:
+                events.put_nowait({"event": "error", "status": "error", "message": "No results found"})
+                return
+            events.put_nowait({"event": "articles", "articles": [self._format_article(a) for a in search_results]})
+            # Held in _background_tasks so it outlives this producer if the client goes away
+            saving = asyncio.ensure_future(self._save_search(query, search_results, user_id))
+            _background_tasks.add(saving)
+            saving.add_done_callback(_background_tasks.discard)
+
+            with span("pinecone.search") as stage:
+                similar_articles = collapse_duplicates(await similar or [], exclude=search_results)
+                stage.set_size(len(similar_articles))
+            events.put_nowait({
+                "event": "similar_articles",
+                "similar_articles": [self._format_article(article) for article in similar_articles]
+            })
+
+            with span("bing.search"):
+                grounding_results = await grounding
+            events.put_nowait({"event": "grounding", "grounding_results": grounding_results})
+
+            with span("llm.research") as stage:
+                answer_chars = 0
+                async for chunk in self.research_chain.astream(query):
+                    if chunk:
+                        answer_chars += len(chunk)
+                        events.put_nowait({"event": "answer", "text": chunk})
+                stage.set_size(answer_chars)
+
+            # Shielded: cancelling the producer must not cancel the save
+            await asyncio.shield(saving)
+            events.put_nowait({"event": "done", "status": "success"})
+
+        except Exception as e:
+            events.put_nowait({"event": "error", "status": "error", "message": f"Error processing query: {str(e)}"})
+        finally:
+            for task in (pubmed, similar, grounding):
+                task.cancel()
+            events.put_nowait(None)
+
+    async def _save_search(self, query: str, articles: List[Dict[str, Any]], user_id: Optional[str]) -> None:
+        with span("postgres.save_articles", size=len(articles)):
+            article_ids = await asyncio.to_thread(self._save_articles, articles)
+        if article_ids:
+            with span("postgres.save_history"):
+                await asyncio.to_thread(save_search_history, query, list(article_ids.values()), user_id)
+
+    @traced("research.process_batch")
+    async def process_batch(self, queries: List[str], user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Process many research queries at once and return per-query results.
+
+        PubMed searches, grounding and vector searches for all queries run
+        concurrently, and the query embeddings go to the model together. Each
+        article is fetched, saved and returned once however many queries found
+        it; per-query results list PMIDs into the shared ``articles`` map. The
+        cached-article shortcut of ``process_query`` is skipped so every query
+        gets fresh results.
+        """
+        try:
+            queries = list(dict.fromkeys(query for query in queries if query))
+            grounding_slots = asyncio.Semaphore(settings.RESEARCH_BATCH_CONCURRENCY)
+
+            async def ground(query: str):
+                async with grounding_slots:
+                    return await self.bing_grounding_tool.run(query)
+
+            with span("research.batch_retrieval", size=len(queries)):
+                search_results, grounding, similar = await asyncio.gather(
+                    self.pubmed_tool.search_batch([f"{query} AND {HR_MESH_FILTER}" for query in queries]),
+                    asyncio.gather(*(ground(query) for query in queries), return_exceptions=True),
+                    asyncio.gather(*(self.pinecone_tool.similarity_search(query, k=5) for query in queries),
+                                   return_exceptions=True)
+                )
+
+            articles: Dict[str, Dict[str, Any]] = {}
+            results = []
+            for query, grounding_results, similar_articles in zip(queries, grounding, similar):
+                found = collapse_duplicates(search_results.get(f"{query} AND {HR_MESH_FILTER}") or [])
+                if not found:
+                    results.append({"query": query, "status": "error", "message": "No results found"})
+                    continue
+                if isinstance(similar_articles, Exception):
+                    similar_articles = []
+                similar_articles = collapse_duplicates(similar_articles or [], exclude=found)
+                for article in found + similar_articles:
+                    articles.setdefault(article.get("pmid"), article)
+                results.append({
+                    "query": query,
+                    "status": "success",
+                    "articles": [article.get("pmid") for article in found],
+                    "similar_articles": [article.get("pmid") for article in similar_articles],
+                    "grounding_results": None if isinstance(grounding_results, Exception) else grounding_results
+                })
+
+            # Save each new article once, then every query's search history
+            found_pmids = list(dict.fromkeys(pmid for result in results for pmid in result.get("articles", [])))
+            with span("postgres.save_articles", size=len(found_pmids)):
+                article_ids = await asyncio.to_thread(
+                    self._save_articles, [articles[pmid] for pmid in found_pmids]
+                )
+            with span("postgres.save_history", size=len(results)):
+                for result in results:
+                    ids = [article_ids[pmid] for pmid in result.get("articles", []) if pmid in article_ids]
+                    if ids:
+                        await asyncio.to_thread(save_search_history, result["query"], ids, user_id)
+
+            return {
+                "status": "success",
+                "source": "new_search",
+                "results": results,
+                "articles": {pmid: self._format_article(article) for pmid, article in articles.items()},
+                "message": f"Batch of {len(queries)} queries completed"
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Error processing batch: {str(e)}"
+            }
+
+    def _save_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Save articles and refresh their cache entries; returns database IDs by PMID"""
+        article_ids = {}
+        for article in articles:
+            db_article = save_article(article)
+            if db_article:
+                article_ids[article.get("pmid")] = db_article.id
+                update_cache_entry(db_article.id)
+        return article_ids
+
+    @traced("research.warm_query")
+    async def warm_query(self, query: str) -> None:
+        """Run the retrieval steps of ``process_query`` to fill their caches.
+
+        Nothing is written to the database, so prewarming doesn't feed back
+        into the search history it was mined from.
+        """
+        await asyncio.gather(
+            self.pubmed_tool.run(f"{query} AND {HR_MESH_FILTER}"),
+            self.bing_grounding_tool.run(query),
+            self.pinecone_tool.similarity_search(query, k=5)
+        )
+
     def _format_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
         """Format article data for response with HR focus."""
         return {
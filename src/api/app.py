@@ -3,14 +3,23 @@ import chainlit as cl
 from anthropic import Anthropic
 import json
 import torch
+import asyncio
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
 from src.config.settings import settings
 from src.database.init_db import init_db, create_vector_extension
 from src.services.pubmed_service import PubMedService
-from src.utils.memory import clear_memory
+from src.utils.memory import clear_memory, memory_monitor
+from src.utils.tracing import span, trace_request
+from src.utils.llm_cache import llm_cache
+from src.utils.dedup import collapse_duplicates
+from src.utils.conversation_memory import ConversationMemory
+from src.db.db_utils import get_conversation_session, save_conversation_session
 from database import DocumentDatabase
 
+CHAT_MODEL = "claude-3-sonnet-20240229"
+
 # Initialize services
 anthropic = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
 pubmed_service = PubMedService(
@@ -39,60 +48,133 @@ async def start():
 
     cl.user_session.set("anthropic", anthropic)
 
+    if settings.MEMORY_MONITOR_ENABLED:
+        memory_monitor.start(asyncio.get_running_loop())
+
+def summarize_turns(summary: str, turns: List[Dict]) -> str:
+    """Fold chat turns that left the memory window into the session's rolling summary"""
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    messages = [
+        {
+            "role": "user",
+            "content": f"""Update the summary of this research conversation with the new turns.
+            Keep the questions asked, the papers cited and the conclusions reached. Reply with the summary only.
+            
+            Current summary: {summary or "(none)"}
+            
+            New turns:
+            {transcript}"""
+        }
+    ]
+    # Deterministic, so repeated folds of the same turns are served from the LLM cache
+    return llm_cache.call(
+        "chat_summary",
+        CHAT_MODEL,
+        0.0,
+        messages,
+        lambda: anthropic.messages.create(
+            model=CHAT_MODEL,
+            max_tokens=settings.CONVERSATION_SUMMARY_TOKENS,
+            temperature=0.0,
+            messages=messages
+        ).content[0].text,
+        max_tokens=settings.CONVERSATION_SUMMARY_TOKENS
+    )
+
 @cl.on_message
 async def main(message: cl.Message):
     """Handle incoming messages"""
     query = message.content
     session = Session()
     
-    try:
-        async with cl.Step(name="Searching PubMed..."):
+    with trace_request("chat", query_chars=len(query)):
+        try:
+            memory = None
+            session_id = cl.user_session.get("id")
+            if settings.CONVERSATION_MEMORY_ENABLED and session_id:
+                # Loaded from Postgres on every message, so any worker can serve the session
+                memory = ConversationMemory(session_id, summarize_turns, get_conversation_session,
+                                            save_conversation_session)
+                with span("postgres.load_conversation"):
+                    await memory.load()
+            await answer(query, session, memory)
+        finally:
+            session.close()
+
+async def answer(query: str, session: Session, memory: Optional[ConversationMemory] = None):
+    """Search, store and answer one chat message"""
+    async with cl.Step(name="Searching PubMed..."):
+        with span("pubmed.fetch") as stage:
             pubmed_results = await pubmed_service.fetch_pubmed_data(query)
-            if pubmed_results:
-                # Store in database
+            stage.set_size(len(pubmed_results))
+        if pubmed_results:
+            # Store in database
+            with span("postgres.store", size=len(pubmed_results)):
                 stored_articles = await pubmed_service.store_pubmed_data(pubmed_results, session)
-                await cl.Message(
-                    content=f"📚 Found and stored {len(stored_articles)} relevant papers from PubMed"
-                ).send()
+            await cl.Message(
+                content=f"📚 Found and stored {len(stored_articles)} relevant papers from PubMed"
+            ).send()
 
+    # Near-duplicates are stored (marked duplicate_of) but sent to the model once
+    pubmed_results = collapse_duplicates(pubmed_results)
+    
+    with span("vector.similarity_search"):
         similar_docs = doc_db.similarity_search(query, k=3)
         
-        # Create citations for each paper
-        citations = [pubmed_service.create_citation(paper) for paper in pubmed_results]
-        
-        context = f"""
-        User Query: {query}
-        
-        Relevant PubMed Papers:
-        {json.dumps(pubmed_results, indent=2)}
-        
-        Citations:
-        {json.dumps(citations, indent=2)}
-        
-        Similar Documents from Database:
-        {json.dumps([doc.page_content for doc in similar_docs], indent=2)}
-        """
+    # Create citations for each paper
+    citations = [pubmed_service.create_citation(paper) for paper in pubmed_results]
+    
+    context = f"""
+    User Query: {query}
+    
+    Earlier in this conversation:
+    {memory.summary if memory and memory.summary else "(nothing summarized yet)"}
+    
+    Relevant PubMed Papers:
+    {json.dumps(pubmed_results, indent=2)}
+    
+    Citations:
+    {json.dumps(citations, indent=2)}
+    
+    Similar Documents from Database:
+    {json.dumps([doc.page_content for doc in similar_docs], indent=2)}
+    """
+    
+    # Recent turns verbatim, within CONVERSATION_MAX_TOKENS together with the summary
+    history = memory.messages() if memory else []
+    messages = history + [
+        {
+            "role": "user",
+            "content": f"""Based on the following context, please provide a comprehensive answer to the user's query. 
+            Include relevant citations using the provided citation format when referencing specific papers.
         
-        async with cl.Step(name="Generating response..."):
-            response = anthropic.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=settings.MAX_TOKENS,
-                temperature=settings.TEMPERATURE,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"""Based on the following context, please provide a comprehensive answer to the user's query. 
-                        Include relevant citations using the provided citation format when referencing specific papers.
-                        
-                        Context: {context}"""
-                    }
-                ]
+            Context: {context}"""
+        }
+    ]
+
+    async with cl.Step(name="Generating response..."):
+        with span("llm.anthropic", size=len(context)):
+            text = llm_cache.call(
+                "chat",
+                CHAT_MODEL,
+                settings.TEMPERATURE,
+                messages,
+                lambda: anthropic.messages.create(
+                    model=CHAT_MODEL,
+                    max_tokens=settings.MAX_TOKENS,
+                    temperature=settings.TEMPERATURE,
+                    messages=messages
+                ).content[0].text,
+                opt_in=settings.LLM_CACHE_SAMPLED,
+                max_tokens=settings.MAX_TOKENS
             )
-            
-            await cl.Message(content=response.content[0].text).send()
+        
+        await cl.Message(content=text).send()
     
-    finally:
-        session.close()
+    # After the reply is sent, so a summarization pass does not delay it
+    if memory:
+        with span("conversation.update"):
+            await memory.add_turn(query, text)
 
 @cl.on_stop
 def on_stop():
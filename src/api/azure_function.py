@@ -1,26 +1,56 @@
 import azure.functions as func
 import json
+import asyncio
 from src.chains.research_chain import ResearchChain
 from src.agents.data_analysis_agent import DataAnalysisAgent
-from src.services.bing_service import BingGroundingService
-from azure.storage.blob import BlobServiceClient
+from src.services.blob_service import BlobStorageService
 from src.config.settings import settings
+from src.utils.tracing import payload_bytes, span, trace_request, tracer
+from src.utils.memory import memory_monitor
+from src.utils.llm_cache import llm_cache
+from src.jobs.cache_prewarm import build_prewarmer
 import uuid
 
 # Initialize agents
 research_chain = ResearchChain()
 data_analysis_agent = DataAnalysisAgent()
-bing_grounding_service = BingGroundingService()
+# The agent's grounding service, so prewarmed grounding results serve this route too
+bing_grounding_service = research_chain.agent.bing_grounding_tool.service
+cache_prewarmer = build_prewarmer(research_chain.agent.warm_query)
 
 # Initialize Azure Storage
-blob_service_client = BlobServiceClient.from_connection_string(
-    settings.AZURE_STORAGE_CONNECTION_STRING
-)
-container_client = blob_service_client.get_container_client(
-    settings.AZURE_STORAGE_CONTAINER
-)
+blob_storage = BlobStorageService()
 
 async def main(req: func.HttpRequest) -> func.HttpResponse:
+    if settings.MEMORY_MONITOR_ENABLED:
+        memory_monitor.start(asyncio.get_running_loop())
+    # Replay popular searches in the background so they hit warm caches after a deploy
+    if settings.PREWARM_ON_STARTUP:
+        cache_prewarmer.start()
+
+    # Per-stage latency histograms, memory gauges and LLM cache counters for Prometheus
+    if req.method == "GET" and req.url.rstrip("/").endswith("/metrics"):
+        return func.HttpResponse(
+            tracer.render_prometheus() + memory_monitor.render_prometheus() + llm_cache.render_prometheus(),
+            status_code=200,
+            mimetype="text/plain; version=0.0.4"
+        )
+
+    # Memory usage time series, per cache
+    if req.method == "GET" and req.url.rstrip("/").endswith("/memory"):
+        return func.HttpResponse(
+            json.dumps({"limit_bytes": memory_monitor.limit_bytes, "samples": memory_monitor.history()}),
+            status_code=200,
+            mimetype="application/json"
+        )
+
+    with trace_request("http", method=req.method, url=req.url) as request_span:
+        response = await handle_request(req, request_span)
+        request_span.set_attribute("status", response.status_code)
+        request_span.set_size(len(response.get_body() or b""))
+        return response
+
+async def handle_request(req: func.HttpRequest, request_span) -> func.HttpResponse:
     try:
         # Handle file upload
         if req.method == "POST" and req.files:
@@ -28,9 +58,11 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
             if file:
                 # Generate unique blob name
                 blob_name = f"{uuid.uuid4()}_{file.filename}"
-                # Upload to Azure Blob Storage
-                blob_client = container_client.get_blob_client(blob_name)
-                blob_client.upload_blob(file.read())
+                # Upload to Azure Blob Storage in parallel blocks. The v1 worker has already
+                # buffered the whole request body, so this bounds transfer size, not memory.
+                request_span.set_attribute("type", "upload")
+                with span("blob.upload"):
+                    await blob_storage.upload_stream(blob_name, file.stream)
                 return func.HttpResponse(
                     json.dumps({"blob_name": blob_name}),
                     status_code=200
@@ -40,16 +72,19 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
         if req.method == "POST":
             req_body = req.get_json()
             request_type = req_body.get('type')
+            request_span.set_attribute("type", request_type)
             
             if request_type == "data_analysis":
                 blob_name = req_body.get('blob_name')
                 analysis_request = req_body.get('request')
-                result = await data_analysis_agent.analyze_request(
-                    analysis_request,
-                    blob_name
-                )
+                with span("analysis.request"):
+                    result = await data_analysis_agent.analyze_request(
+                        analysis_request,
+                        blob_name
+                    )
+                # Summaries of date columns carry pandas Timestamps
                 return func.HttpResponse(
-                    json.dumps(result),
+                    json.dumps(result, default=str),
                     status_code=200
                 )
             
@@ -57,13 +92,35 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
             elif request_type == "research":
                 user_input = req_body.get('query')
                 # Add grounding results to the research chain
-                grounding_results = await bing_grounding_service.search(user_input)
-                result = await research_chain.run(user_input, grounding_results)
+                with span("bing.search") as stage:
+                    grounding_results = await bing_grounding_service.search(user_input)
+                    stage.set_size(len(grounding_results))
+                with span("research.chain") as stage:
+                    result = await research_chain.run(user_input, grounding_results)
+                    stage.set_size(payload_bytes(result))
                 return func.HttpResponse(
                     json.dumps({'result': result}),
                     status_code=200
                 )
             
+            # Handle many research queries in one request
+            elif request_type == "research_batch":
+                queries = req_body.get('queries')
+                if not isinstance(queries, list) or not queries or len(queries) > settings.RESEARCH_BATCH_MAX_QUERIES:
+                    return func.HttpResponse(
+                        f"queries must be a list of 1 to {settings.RESEARCH_BATCH_MAX_QUERIES} strings",
+                        status_code=400
+                    )
+                with span("research.batch", size=len(queries)):
+                    result = await research_chain.agent.process_batch(
+                        [str(query) for query in queries],
+                        req_body.get('user_id')
+                    )
+                return func.HttpResponse(
+                    json.dumps(result, default=str),
+                    status_code=200
+                )
+            
         return func.HttpResponse(
             "Invalid request",
             status_code=400
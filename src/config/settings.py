@@ -4,11 +4,27 @@ from typing import Optional
 class Settings(BaseSettings):
     # API Keys
     ANTHROPIC_API_KEY: str
+    OPENAI_API_KEY: Optional[str] = None
     NCBI_API_KEY: str
     PINECONE_API_KEY: str
     
     # Email Configuration
     ENTREZ_EMAIL: str
+    NCBI_REQUESTS_PER_SECOND: float = 10.0  # NCBI allows 10/s with an API key, 3/s without
+    PUBMED_CACHE_PATH: str = ".cache/pubmed.sqlite3"  # Empty disables the response cache
+    PUBMED_SEARCH_CACHE_TTL: int = 6 * 3600
+    PUBMED_RECORD_CACHE_TTL: int = 30 * 24 * 3600
+    
+    # PubMed Backfill Configuration
+    BACKFILL_CHECKPOINT_PATH: str = ".cache/pubmed_backfill.json"
+    BACKFILL_BATCH_SIZE: int = 500
+    BACKFILL_QUEUE_SIZE: int = 4
+    BACKFILL_FETCH_CONCURRENCY: int = 3
+    BACKFILL_PARSE_CONCURRENCY: int = 2
+    BACKFILL_EMBED_CONCURRENCY: int = 1
+    BACKFILL_STORE_CONCURRENCY: int = 2
+    BACKFILL_UPSERT_CONCURRENCY: int = 2
+    BACKFILL_NAMESPACE: str = ""  # Vector namespace the ingest jobs write to; empty is the default namespace
     
     # Database Configuration
     DATABASE_URL: str = "postgresql://localhost/research_chat"
@@ -16,22 +32,104 @@ class Settings(BaseSettings):
     # Pinecone Configuration
     PINECONE_ENVIRONMENT: str
     PINECONE_INDEX_NAME: str = "research-chat"
+    PINECONE_UPSERT_BATCH_SIZE: int = 100
+    PINECONE_WRITE_CONCURRENCY: int = 4
+    PINECONE_MAX_RETRIES: int = 3
     
     # Azure Storage Configuration
     AZURE_STORAGE_CONNECTION_STRING: str
     AZURE_STORAGE_CONTAINER: str = "datasets"
+    BLOB_CHUNK_SIZE: int = 4 * 1024 * 1024
+    BLOB_MAX_CONCURRENCY: int = 4
+    
+    # Dataset Cache Configuration
+    DATASET_CACHE_DIR: str = ".cache/datasets"
+    DATASET_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    
+    # Data Analysis Configuration
+    STREAMING_ANALYSIS_THRESHOLD_BYTES: int = 512 * 1024 * 1024
+    STREAMING_CHUNK_ROWS: int = 100_000
+    GRAPH_MAX_POINTS: int = 5000
+    GRAPH_BINS: int = 200
+    DATA_ANALYSIS_ENGINE: str = "pandas"  # "pandas" or "duckdb"
+    DUCKDB_THREADS: int = 0  # 0 uses every core
     
     # Azure Search Configuration
     AZURE_SEARCH_SERVICE_NAME: str
     AZURE_SEARCH_API_KEY: str
     AZURE_BING_SEARCH_KEY: str
     AZURE_KEY_VAULT_NAME: str
+    SEARCH_CACHE_TTL: int = 1800
+    SEARCH_CACHE_SIZE: int = 1024
+    SIMILAR_CACHE_TTL: int = 1800
+    SIMILAR_CACHE_SIZE: int = 1024
+    ARTICLE_ROW_CACHE_SIZE: int = 4096
+    ARTICLE_ROW_CACHE_TTL: int = 3600
+    SEARCH_INDEX_BATCH_DOCUMENTS: int = 1000
+    SEARCH_INDEX_BATCH_BYTES: int = 8 * 1024 * 1024
+    SEARCH_INDEX_CONCURRENCY: int = 4
+    SEARCH_INDEX_MAX_RETRIES: int = 3
     
     # Model Configuration
+    OPENAI_MODEL: str = "gpt-4-turbo-preview"
     EMBEDDING_MODEL: str = "sentence-transformers/all-mpnet-base-v2"
+    EMBEDDING_BATCH_SIZE: int = 64
     TEMPERATURE: float = 0.7
     MAX_TOKENS: int = 2000
     
+    # LLM Completion Cache
+    LLM_CACHE_BACKEND: str = "memory"  # "memory", "sqlite" or "none"
+    LLM_CACHE_PATH: str = ".cache/llm.sqlite3"
+    LLM_CACHE_TTL: int = 24 * 3600
+    LLM_CACHE_SIZE: int = 2048
+    LLM_CACHE_SAMPLED: bool = False  # Also cache call sites that sample (temperature > 0)
+    
+    # Data Analysis Planning
+    PLAN_CACHE_SIZE: int = 1024
+    PLAN_CACHE_TTL: int = 3600
+    
+    # Near-Duplicate Detection
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.85  # Estimated Jaccard similarity of title + abstract shingles
+    DEDUP_NUM_PERM: int = 128  # MinHash signature length; changing it invalidates stored signatures
+    DEDUP_LSH_BANDS: int = 16
+    
+    # Cache Prewarming
+    PREWARM_ON_STARTUP: bool = True
+    PREWARM_INTERVAL: int = 0  # Seconds between in-process re-warms; 0 warms once at startup
+    PREWARM_QUERY_LIMIT: int = 50  # Most frequent queries replayed
+    PREWARM_RECENT_QUERIES: int = 10  # Most recent queries replayed on top of those
+    PREWARM_LOOKBACK_DAYS: int = 30
+    PREWARM_TIME_BUDGET: float = 120.0
+    PREWARM_RATE: float = 1.0  # Queries started per second
+    PREWARM_CONCURRENCY: int = 2
+    
+    # Batch Research
+    RESEARCH_BATCH_MAX_QUERIES: int = 500
+    RESEARCH_BATCH_CONCURRENCY: int = 8  # Grounding searches in flight per batch
+    
+    # Search History Partitions
+    HISTORY_PARTITION_PREMAKE_MONTHS: int = 3  # Monthly partitions created ahead of the current one
+    HISTORY_RETENTION_MONTHS: int = 24  # Whole months of history kept; 0 keeps everything
+    
+    # Conversation Memory
+    CONVERSATION_MEMORY_ENABLED: bool = True
+    CONVERSATION_MAX_TOKENS: int = 2000  # Ceiling for summary + recent turns in each chat prompt
+    CONVERSATION_SUMMARY_TOKENS: int = 400  # Part of that ceiling kept for the rolling summary
+    CONVERSATION_TOKEN_ENCODING: str = "cl100k_base"  # tiktoken encoding used to count tokens
+    
+    # Memory Monitor
+    MEMORY_MONITOR_ENABLED: bool = True
+    MEMORY_MONITOR_INTERVAL: float = 5.0
+    MEMORY_LIMIT_BYTES: int = 0  # 0 uses the container (cgroup) limit, else physical memory
+    MEMORY_HIGH_WATERMARK: float = 0.85  # Shed caches above this fraction of the limit
+    MEMORY_LOW_WATERMARK: float = 0.70  # ...down to this fraction
+    MEMORY_HISTORY_SIZE: int = 720
+    
+    # Tracing
+    TRACING_ENABLED: bool = True
+    TRACING_LOG_REQUESTS: bool = True  # One structured log line per traced request
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
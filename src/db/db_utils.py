@@ -1,11 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from src.config.settings import settings
-from src.models.pubmed import PubMedArticle, SearchHistory, CachedArticle, SearchHistoryArticle
+from src.db.partitions import ensure_partitions, is_missing_partition
+from src.models.pubmed import (
+    PubMedArticle, SearchHistory, CachedArticle, SearchHistoryArticle, PubMedSyncWatermark, ConversationSession
+)
 
 # Create engine and session factory
 engine = create_engine(settings.DATABASE_URL)
@@ -34,29 +38,104 @@ def save_article(article_data: dict) -> Optional[PubMedArticle]:
             print(f"Error saving article: {str(e)}")
             return None
 
+def bulk_upsert_articles(records: List[dict]) -> int:
+    """Insert or update many PubMed articles, keyed by PMID, in one statement."""
+    if not records:
+        return 0
+    with get_db() as db:
+        try:
+            statement = insert(PubMedArticle).values(records)
+            statement = statement.on_conflict_do_update(
+                index_elements=[PubMedArticle.pmid],
+                set_={
+                    column: statement.excluded[column]
+                    for column in records[0]
+                    if column != 'pmid'
+                }
+            )
+            result = db.execute(statement)
+            db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Error upserting articles: {str(e)}")
+            raise
+
 def get_article_by_pmid(pmid: str) -> Optional[PubMedArticle]:
     """Retrieve an article by its PMID."""
     with get_db() as db:
         return db.query(PubMedArticle).filter(PubMedArticle.pmid == pmid).first()
 
-def save_search_history(query: str, article_ids: List[int], user_id: Optional[str] = None) -> Optional[SearchHistory]:
-    """Save a search history entry."""
+def get_articles_by_pmids(pmids: List[str]) -> Dict[str, dict]:
+    """Display fields of many articles, keyed by PMID, in one query."""
+    if not pmids:
+        return {}
     with get_db() as db:
         try:
-            history = SearchHistory(
-                query=query,
-                article_ids=article_ids,
-                result_count=len(article_ids),
-                user_id=user_id
-            )
-            db.add(history)
-            db.commit()
-            db.refresh(history)
-            return history
+            rows = db.query(
+                PubMedArticle.pmid,
+                PubMedArticle.title,
+                PubMedArticle.abstract,
+                PubMedArticle.authors,
+                PubMedArticle.journal,
+                PubMedArticle.publication_date,
+                PubMedArticle.keywords
+            ).filter(PubMedArticle.pmid.in_(list(pmids))).all()
         except SQLAlchemyError as e:
-            db.rollback()
-            print(f"Error saving search history: {str(e)}")
-            return None
+            print(f"Error loading articles: {str(e)}")
+            return {}
+    return {
+        row.pmid: {
+            "title": row.title,
+            "abstract": row.abstract,
+            "authors": row.authors,
+            "journal": row.journal,
+            "publication_date": row.publication_date.date().isoformat() if row.publication_date else "",
+            "keywords": row.keywords or []
+        }
+        for row in rows
+    }
+
+def get_dedup_signatures() -> List[tuple]:
+    """(pmid, MinHash signature) of every canonical article that has one."""
+    with get_db() as db:
+        try:
+            return [
+                (pmid, bytes(signature))
+                for pmid, signature in db.query(PubMedArticle.pmid, PubMedArticle.dedup_signature)
+                .filter(PubMedArticle.dedup_signature.isnot(None), PubMedArticle.duplicate_of.is_(None))
+                .yield_per(10000)
+            ]
+        except SQLAlchemyError as e:
+            print(f"Error loading dedup signatures: {str(e)}")
+            return []
+
+def save_search_history(query: str, article_ids: List[int], user_id: Optional[str] = None) -> Optional[SearchHistory]:
+    """Save a search history entry."""
+    for attempt in range(2):
+        with get_db() as db:
+            try:
+                history = SearchHistory(
+                    query=query,
+                    article_ids=article_ids,
+                    result_count=len(article_ids),
+                    user_id=user_id
+                )
+                db.add(history)
+                db.commit()
+                db.refresh(history)
+                return history
+            except SQLAlchemyError as e:
+                db.rollback()
+                # First search of a month nobody created a partition for: create it and retry once
+                if attempt == 0 and is_missing_partition(e):
+                    try:
+                        ensure_partitions(engine)
+                        continue
+                    except SQLAlchemyError as partition_error:
+                        e = partition_error
+                print(f"Error saving search history: {str(e)}")
+                return None
 
 def update_cache_entry(article_id: int, relevance_score: float = 1.0) -> None:
     """Update or create a cache entry for an article."""
@@ -110,6 +189,31 @@ def get_recent_searches(limit: int = 10, user_id: Optional[str] = None) -> List[
             query = query.filter(SearchHistory.user_id == user_id)
         return query.order_by(SearchHistory.timestamp.desc()).limit(limit).all()
 
+def get_popular_queries(limit: int = 50, days: int = 30, recent: int = 10) -> List[dict]:
+    """Most frequent queries of the last ``days``, then the ``recent`` latest ones; case and spacing are ignored."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    normalized = func.lower(func.trim(SearchHistory.query))
+    with get_db() as db:
+        try:
+            grouped = db.query(
+                func.min(SearchHistory.query),
+                func.count(SearchHistory.id),
+                func.max(SearchHistory.timestamp)
+            ).filter(SearchHistory.timestamp >= cutoff).group_by(normalized)
+            frequent = grouped.order_by(func.count(SearchHistory.id).desc(),
+                                        func.max(SearchHistory.timestamp).desc()).limit(limit).all()
+            latest = grouped.order_by(func.max(SearchHistory.timestamp).desc()).limit(recent).all() if recent else []
+        except SQLAlchemyError as e:
+            print(f"Error loading popular queries: {str(e)}")
+            return []
+
+    queries = {}
+    for query, count, last_searched in frequent + latest:
+        key = " ".join(query.split()).lower()
+        if key not in queries:
+            queries[key] = {"query": query, "count": count, "last_searched": last_searched}
+    return list(queries.values())
+
 def cleanup_old_cache_entries(max_age_days: int = 30) -> int:
     """Remove cache entries older than max_age_days."""
     with get_db() as db:
@@ -124,3 +228,89 @@ def cleanup_old_cache_entries(max_age_days: int = 30) -> int:
             db.rollback()
             print(f"Error cleaning up cache entries: {str(e)}")
             return 0
+
+def _watermark_dict(watermark: PubMedSyncWatermark) -> dict:
+    return {
+        'topic': watermark.topic,
+        'query': watermark.query,
+        'synced_through': watermark.synced_through,
+        'last_run_at': watermark.last_run_at,
+        'last_run_articles': watermark.last_run_articles,
+        'total_articles': watermark.total_articles
+    }
+
+def get_sync_watermark(topic: str) -> Optional[dict]:
+    """Get the sync state of a saved PubMed topic."""
+    with get_db() as db:
+        watermark = db.query(PubMedSyncWatermark).filter(PubMedSyncWatermark.topic == topic).first()
+        return _watermark_dict(watermark) if watermark else None
+
+def get_sync_watermarks() -> List[dict]:
+    """Get the sync state of every saved PubMed topic."""
+    with get_db() as db:
+        return [_watermark_dict(w) for w in db.query(PubMedSyncWatermark).order_by(PubMedSyncWatermark.topic).all()]
+
+def advance_sync_watermark(topic: str, query: str, synced_through: datetime, articles: int) -> dict:
+    """Record a completed sync, moving the topic's watermark forward in one transaction.
+
+    The row is locked while it is updated, and the watermark never moves
+    backwards, so overlapping syncs of the same topic cannot lose progress.
+    """
+    with get_db() as db:
+        try:
+            watermark = db.query(PubMedSyncWatermark)\
+                .filter(PubMedSyncWatermark.topic == topic)\
+                .with_for_update()\
+                .first()
+            if watermark is None:
+                watermark = PubMedSyncWatermark(topic=topic, query=query, total_articles=0)
+                db.add(watermark)
+            elif watermark.query != query:
+                # A changed search invalidates the old watermark
+                watermark.query = query
+                watermark.synced_through = None
+            if watermark.synced_through is None or synced_through > watermark.synced_through:
+                watermark.synced_through = synced_through
+            watermark.last_run_at = datetime.utcnow()
+            watermark.last_run_articles = articles
+            watermark.total_articles = (watermark.total_articles or 0) + articles
+            db.commit()
+            return _watermark_dict(watermark)
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Error advancing sync watermark: {str(e)}")
+            raise
+
+def get_conversation_session(session_id: str) -> Optional[dict]:
+    """Get a chat session's rolling summary and recent turns."""
+    with get_db() as db:
+        try:
+            row = db.query(ConversationSession).filter(ConversationSession.session_id == session_id).first()
+            if row is None:
+                return None
+            return {
+                'summary': row.summary or '',
+                'turns': row.turns or [],
+                'token_count': row.token_count,
+                'user_id': row.user_id
+            }
+        except SQLAlchemyError as e:
+            print(f"Error loading conversation session: {str(e)}")
+            return None
+
+def save_conversation_session(session_id: str, state: dict) -> None:
+    """Insert or replace a chat session's rolling summary and recent turns."""
+    values = {
+        'summary': state.get('summary', ''),
+        'turns': state.get('turns', []),
+        'token_count': state.get('token_count', 0),
+        'updated_at': datetime.utcnow()
+    }
+    with get_db() as db:
+        try:
+            statement = insert(ConversationSession).values(session_id=session_id, user_id=state.get('user_id'), **values)
+            db.execute(statement.on_conflict_do_update(index_elements=[ConversationSession.session_id], set_=values))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Error saving conversation session: {str(e)}")
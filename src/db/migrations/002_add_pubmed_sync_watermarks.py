@@ -0,0 +1,36 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from src.config.settings import settings
+
+def run_migration():
+    # Create engine
+    engine = create_engine(settings.DATABASE_URL)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    
+    try:
+        # Additive: existing tables and data are left untouched
+        session.execute(text("""
+            CREATE TABLE IF NOT EXISTS pubmed_sync_watermarks (
+                id SERIAL PRIMARY KEY,
+                topic VARCHAR NOT NULL UNIQUE,
+                query TEXT NOT NULL,
+                synced_through TIMESTAMP,
+                last_run_at TIMESTAMP,
+                last_run_articles INTEGER DEFAULT 0,
+                total_articles INTEGER DEFAULT 0
+            );
+        """))
+        
+        session.commit()
+        print("Migration completed successfully!")
+        
+    except Exception as e:
+        session.rollback()
+        print(f"Migration failed: {str(e)}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,30 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from src.config.settings import settings
+
+def run_migration():
+    # Create engine
+    engine = create_engine(settings.DATABASE_URL)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    
+    try:
+        # Additive: existing rows keep NULL signatures and count as canonical articles
+        session.execute(text("""
+            ALTER TABLE pubmed_articles ADD COLUMN IF NOT EXISTS dedup_signature BYTEA;
+            ALTER TABLE pubmed_articles ADD COLUMN IF NOT EXISTS duplicate_of VARCHAR;
+            CREATE INDEX IF NOT EXISTS ix_pubmed_articles_duplicate_of ON pubmed_articles (duplicate_of);
+        """))
+        
+        session.commit()
+        print("Migration completed successfully!")
+        
+    except Exception as e:
+        session.rollback()
+        print(f"Migration failed: {str(e)}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,37 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from src.config.settings import settings
+
+def run_migration():
+    # Create engine
+    engine = create_engine(settings.DATABASE_URL)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    
+    try:
+        # Additive: existing tables and data are left untouched
+        session.execute(text("""
+            CREATE TABLE IF NOT EXISTS conversation_sessions (
+                session_id VARCHAR PRIMARY KEY,
+                user_id VARCHAR,
+                summary TEXT,
+                turns JSONB,
+                token_count INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS ix_conversation_sessions_user_id ON conversation_sessions (user_id);
+        """))
+        
+        session.commit()
+        print("Migration completed successfully!")
+        
+    except Exception as e:
+        session.rollback()
+        print(f"Migration failed: {str(e)}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,208 @@
+from datetime import datetime
+from sqlalchemy import create_engine, text
+from src.config.settings import settings
+from src.db.partitions import PARTITIONED_TABLES, add_months, ensure_partitions, is_partitioned, list_partitions, month_start
+
+# Rows updated per statement while backfilling search_history_articles.search_timestamp
+BACKFILL_BATCH_SIZE = 10000
+
+# Indexes every partition of a table gets: (name, columns)
+PARTITION_INDEXES = {
+    "search_history": [("timestamp", "timestamp"), ("user_timestamp", "user_id, timestamp")],
+    "search_history_articles": [("article", "article_id")],
+}
+
+
+# Matches the ForeignKeyConstraint on the SearchHistoryArticle model
+HISTORY_FOREIGN_KEY = "search_history_articles_search_history_fkey"
+
+
+def table_exists(connection, table: str) -> bool:
+    return connection.execute(text("SELECT to_regclass(:table)"), {"table": table}).scalar() is not None
+
+
+def constraint_exists(connection, table: str, name: str) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM pg_constraint WHERE conname = :name AND conrelid = to_regclass(:table)"),
+        {"name": name, "table": table}
+    ).first() is not None
+
+
+def prepare_legacy_tables(connection, boundary: datetime) -> None:
+    """Give the existing tables validated constraints and unique indexes matching the partitioned layout.
+
+    Everything here runs without blocking writes: CHECK constraints are
+    added NOT VALID and validated separately, and indexes are built
+    CONCURRENTLY. That lets the swap attach each table as a partition
+    without rescanning it.
+    """
+    # Partition keys must be NOT NULL; the few rows without a timestamp land in the oldest range
+    connection.execute(text("UPDATE search_history SET timestamp = TIMESTAMP '1970-01-01' WHERE timestamp IS NULL"))
+
+    # search_history_articles is partitioned by its search's timestamp, which it does not have yet
+    connection.execute(text("ALTER TABLE search_history_articles ADD COLUMN IF NOT EXISTS search_timestamp TIMESTAMP"))
+    backfill = text("""
+        UPDATE search_history_articles AS link
+        SET search_timestamp = COALESCE(
+            (SELECT history.timestamp FROM search_history AS history WHERE history.id = link.search_history_id),
+            TIMESTAMP '1970-01-01'
+        )
+        WHERE (link.search_history_id, link.article_id) IN (
+            SELECT search_history_id, article_id FROM search_history_articles
+            WHERE search_timestamp IS NULL
+            LIMIT :batch
+        )
+    """)
+    while connection.execute(backfill, {"batch": BACKFILL_BATCH_SIZE}).rowcount:
+        continue
+
+    for table, key in PARTITIONED_TABLES:
+        for name, condition in ((f"{table}_{key}_not_null", f"{key} IS NOT NULL"),
+                                (f"{table}_{key}_legacy_range", f"{key} < TIMESTAMP '{boundary.isoformat(' ')}'")):
+            if not constraint_exists(connection, table, name):
+                connection.execute(text(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" CHECK ({condition}) NOT VALID'))
+            connection.execute(text(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{name}"'))
+
+    # Unique indexes the partitioned primary keys can adopt
+    connection.execute(text(
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS search_history_legacy_pkey_ts "
+        "ON search_history (id, timestamp)"
+    ))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS search_history_articles_legacy_pkey_ts "
+        "ON search_history_articles (search_history_id, search_timestamp, article_id)"
+    ))
+
+
+def swap_in_partitioned_tables(connection, boundary: datetime) -> None:
+    """Replace both tables with partitioned ones holding the old tables as their first partition.
+
+    One short transaction of catalog changes: no rows are copied, and the
+    validated constraints let ATTACH skip scanning the old tables.
+    """
+    bound = boundary.isoformat(' ')
+    connection.execute(text("SET LOCAL lock_timeout = '10s'"))
+    connection.execute(text("""
+        -- Points at the old table's id alone; rows now link on (search_history_id, search_timestamp)
+        ALTER TABLE search_history_articles DROP CONSTRAINT IF EXISTS search_history_articles_search_history_id_fkey;
+
+        ALTER TABLE search_history RENAME TO search_history_legacy;
+        ALTER TABLE search_history_legacy ALTER COLUMN timestamp SET NOT NULL;
+        ALTER TABLE search_history_legacy DROP CONSTRAINT search_history_pkey;
+        ALTER TABLE search_history_legacy ADD CONSTRAINT search_history_legacy_pkey
+            PRIMARY KEY USING INDEX search_history_legacy_pkey_ts;
+        ALTER INDEX IF EXISTS idx_search_history_timestamp RENAME TO search_history_legacy_timestamp_idx;
+
+        CREATE TABLE search_history (
+            id INTEGER NOT NULL DEFAULT nextval('search_history_id_seq'),
+            query TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            result_count INTEGER,
+            user_id VARCHAR,
+            article_ids INTEGER[],
+            search_category VARCHAR,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp);
+        -- IDs keep counting from the old table, and the sequence outlives its partition
+        ALTER SEQUENCE search_history_id_seq OWNED BY search_history.id;
+
+        ALTER TABLE search_history_articles RENAME TO search_history_articles_legacy;
+        ALTER TABLE search_history_articles_legacy ALTER COLUMN search_timestamp SET NOT NULL;
+        ALTER TABLE search_history_articles_legacy DROP CONSTRAINT search_history_articles_pkey;
+        ALTER TABLE search_history_articles_legacy ADD CONSTRAINT search_history_articles_legacy_pkey
+            PRIMARY KEY USING INDEX search_history_articles_legacy_pkey_ts;
+
+        CREATE TABLE search_history_articles (
+            search_history_id INTEGER NOT NULL,
+            search_timestamp TIMESTAMP NOT NULL,
+            article_id INTEGER NOT NULL REFERENCES pubmed_articles(id),
+            rank INTEGER,
+            relevance_score FLOAT,
+            hr_relevance_score FLOAT,
+            PRIMARY KEY (search_history_id, search_timestamp, article_id)
+        ) PARTITION BY RANGE (search_timestamp);
+    """))
+    connection.execute(text(
+        f"ALTER TABLE search_history ATTACH PARTITION search_history_legacy FOR VALUES FROM (MINVALUE) TO ('{bound}')"
+    ))
+    connection.execute(text(
+        "ALTER TABLE search_history_articles ATTACH PARTITION search_history_articles_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{bound}')"
+    ))
+
+
+def add_history_foreign_key(connection) -> None:
+    """Link search_history_articles to search_history on (id, timestamp), as the models declare.
+
+    Postgres cannot add a NOT VALID foreign key to a partitioned table, so
+    each partition gets one first, validated without blocking writes. The
+    parent's constraint then adopts the validated ones instead of
+    rescanning, and partitions created later inherit it.
+    """
+    columns = "(search_history_id, search_timestamp) REFERENCES search_history (id, timestamp)"
+    for partition in list_partitions(connection, "search_history_articles"):
+        name = f"{partition.name}_search_history_fkey"
+        if not constraint_exists(connection, partition.name, name):
+            connection.execute(text(f'ALTER TABLE "{partition.name}" ADD CONSTRAINT "{name}" FOREIGN KEY {columns} NOT VALID'))
+        connection.execute(text(f'ALTER TABLE "{partition.name}" VALIDATE CONSTRAINT "{name}"'))
+    if not constraint_exists(connection, "search_history_articles", HISTORY_FOREIGN_KEY):
+        connection.execute(text(f'ALTER TABLE search_history_articles ADD CONSTRAINT "{HISTORY_FOREIGN_KEY}" FOREIGN KEY {columns}'))
+
+
+def build_partition_indexes(connection) -> None:
+    """Per-partition indexes, built CONCURRENTLY and attached to an index on the parent.
+
+    Postgres cannot build an index on a partitioned table concurrently, so
+    the parent index is created ON ONLY the parent and becomes valid once
+    every partition's index is attached. Partitions created later get it
+    automatically.
+    """
+    for table, indexes in PARTITION_INDEXES.items():
+        partitions = list_partitions(connection, table)
+        for suffix, columns in indexes:
+            parent_index = f"{table}_{suffix}_idx"
+            connection.execute(text(f'CREATE INDEX IF NOT EXISTS "{parent_index}" ON ONLY "{table}" ({columns})'))
+            for partition in partitions:
+                index = f"{partition.name}_{suffix}_idx"
+                connection.execute(text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index}" ON "{partition.name}" ({columns})'))
+                attached = connection.execute(
+                    text("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:index) AND inhparent = to_regclass(:parent)"),
+                    {"index": index, "parent": parent_index}
+                ).first()
+                if not attached:
+                    connection.execute(text(f'ALTER INDEX "{parent_index}" ATTACH PARTITION "{index}"'))
+
+
+def run_migration():
+    # Additive: no table is dropped and no rows are copied. The existing tables become the first
+    # partition, covering everything before the month after next; new months get their own partitions.
+    engine = create_engine(settings.DATABASE_URL)
+    boundary = add_months(month_start(datetime.utcnow()), 2)
+
+    try:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            if not table_exists(connection, "search_history"):
+                raise RuntimeError("search_history does not exist; create the schema first")
+            convert = not is_partitioned(connection, "search_history")
+            if convert:
+                prepare_legacy_tables(connection, boundary)
+
+        if convert:
+            with engine.begin() as connection:
+                swap_in_partitioned_tables(connection, boundary)
+
+        created = ensure_partitions(engine)
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            add_history_foreign_key(connection)
+            build_partition_indexes(connection)
+
+        print(f"Migration completed successfully! Created partitions: {', '.join(created) or 'none'}")
+
+    except Exception as e:
+        print(f"Migration failed: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,170 @@
+import re
+import json
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import text
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Tables split into monthly (UTC) ranges, with their partition keys. Articles come
+# first so a month's rows go before the searches they reference.
+PARTITIONED_TABLES = (
+    ("search_history_articles", "search_timestamp"),
+    ("search_history", "timestamp"),
+)
+
+BOUND_PATTERN = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    start: Optional[datetime]  # None is MINVALUE
+    end: Optional[datetime]  # None is MAXVALUE
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_bound(expression: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """(start, end) of a ``pg_get_expr(relpartbound)`` range such as FROM ('2024-01-01 00:00:00') TO (...)"""
+    match = BOUND_PATTERN.search(expression or "")
+    if not match:
+        raise ValueError(f"Not a range partition bound: {expression!r}")
+
+    def value(literal: str) -> Optional[datetime]:
+        literal = literal.strip()
+        if literal in ("MINVALUE", "MAXVALUE"):
+            return None
+        return datetime.fromisoformat(literal.strip("'"))
+
+    return value(match.group(1)), value(match.group(2))
+
+
+def overlaps(partition: Partition, start: datetime, end: datetime) -> bool:
+    return (partition.start is None or partition.start < end) and (partition.end is None or partition.end > start)
+
+
+def plan_partitions(table: str, existing: List[Partition], now: datetime, months_ahead: int) -> List[Partition]:
+    """Monthly partitions to create so the current month and ``months_ahead`` after it are covered"""
+    planned = []
+    for offset in range(months_ahead + 1):
+        start = add_months(month_start(now), offset)
+        end = add_months(start, 1)
+        # Months already covered, e.g. by the pre-partitioning table attached as one range, are skipped
+        if not any(overlaps(partition, start, end) for partition in existing):
+            planned.append(Partition(partition_name(table, start), start, end))
+    return planned
+
+
+def expired_partitions(existing: List[Partition], now: datetime, retention_months: int) -> List[Partition]:
+    """Partitions whose every row is older than ``retention_months`` whole months; none if retention is 0"""
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(month_start(now), -retention_months)
+    return [partition for partition in existing if partition.end is not None and partition.end <= cutoff]
+
+
+def is_partitioned(connection, table: str) -> bool:
+    return connection.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": table}
+    ).first() is not None
+
+
+def list_partitions(connection, table: str) -> List[Partition]:
+    rows = connection.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(:table)
+        ORDER BY child.relname
+    """), {"table": table}).all()
+    partitions = []
+    for name, bound in rows:
+        if bound == "DEFAULT":
+            continue
+        start, end = parse_bound(bound)
+        partitions.append(Partition(name, start, end))
+    return partitions
+
+
+def ensure_partitions(engine, months_ahead: Optional[int] = None, now: Optional[datetime] = None) -> List[str]:
+    """Create the monthly partitions missing from now through ``months_ahead``; returns their names"""
+    months_ahead = settings.HISTORY_PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+    now = now or datetime.utcnow()
+    created = []
+    with engine.begin() as connection:
+        for table, _ in PARTITIONED_TABLES:
+            if not is_partitioned(connection, table):
+                continue
+            for partition in plan_partitions(table, list_partitions(connection, table), now, months_ahead):
+                # Indexes defined on the parent are created on the new, empty partition too
+                connection.execute(text(
+                    f'CREATE TABLE IF NOT EXISTS "{partition.name}" PARTITION OF "{table}" '
+                    f"FOR VALUES FROM ('{partition.start.isoformat(' ')}') TO ('{partition.end.isoformat(' ')}')"
+                ))
+                created.append(partition.name)
+    return created
+
+
+def drop_expired_partitions(engine, retention_months: Optional[int] = None, now: Optional[datetime] = None,
+                            dry_run: bool = False) -> List[str]:
+    """Detach and drop partitions past retention; returns their names.
+
+    Dropping a month is a catalog change, so it costs the same however many
+    rows the month holds, and leaves no dead tuples behind.
+    """
+    retention_months = settings.HISTORY_RETENTION_MONTHS if retention_months is None else retention_months
+    now = now or datetime.utcnow()
+    dropped = []
+    for table, _ in PARTITIONED_TABLES:
+        with engine.begin() as connection:
+            if not is_partitioned(connection, table):
+                continue
+            for partition in expired_partitions(list_partitions(connection, table), now, retention_months):
+                if not dry_run:
+                    connection.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{partition.name}"'))
+                    connection.execute(text(f'DROP TABLE "{partition.name}"'))
+                dropped.append(partition.name)
+    return dropped
+
+
+def is_missing_partition(error: Exception) -> bool:
+    """Whether an insert failed because no partition covers its timestamp"""
+    return "no partition of relation" in str(error)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """Command line entry point: python -m src.db.partitions"""
+    parser = argparse.ArgumentParser(description="Create and expire monthly search history partitions")
+    parser.add_argument("--premake", type=int, default=settings.HISTORY_PARTITION_PREMAKE_MONTHS,
+                        help="Months to create ahead of the current one")
+    parser.add_argument("--retention-months", type=int, default=settings.HISTORY_RETENTION_MONTHS,
+                        help="Drop months older than this many whole months; 0 keeps everything")
+    parser.add_argument("--dry-run", action="store_true", help="Report expired partitions without dropping them")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    from src.db.db_utils import engine
+    created = [] if args.dry_run else ensure_partitions(engine, args.premake)
+    dropped = drop_expired_partitions(engine, args.retention_months, dry_run=args.dry_run)
+    report = {"created": created, "dropped": dropped, "dry_run": args.dry_run}
+    logger.info(json.dumps(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
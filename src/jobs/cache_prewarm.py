@@ -0,0 +1,143 @@
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Awaitable, Callable, Dict, List, Optional
+from src.config.settings import settings
+from src.utils.rate_limit import RateLimiter
+
+
+class CachePrewarmer:
+    """Replays retrieval for popular past queries so their caches are warm.
+
+    ``load_queries`` returns ``search_history`` entries (see
+    ``get_popular_queries``) and runs in a thread; ``warm`` fills the caches
+    for one query. A run starts at most ``rate`` queries per second with
+    ``concurrency`` in flight, and stops at ``time_budget`` seconds: warms
+    still running are cancelled and the rest are skipped. Failures are
+    logged and counted, never raised.
+    """
+
+    def __init__(self, warm: Callable[[str], Awaitable], load_queries: Callable[[], List[Dict]],
+                 time_budget: float, rate: float, concurrency: int = 1, interval: float = 0):
+        self.warm = warm
+        self.load_queries = load_queries
+        self.time_budget = time_budget
+        self.rate = rate
+        self.concurrency = max(1, concurrency)
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+        self.last_report: Optional[Dict] = None
+
+    async def run(self) -> Dict:
+        """Warm every loaded query that fits in the budget"""
+        start = time.monotonic()
+        deadline = start + self.time_budget
+        report = {"queries": 0, "warmed": 0, "failed": 0, "timed_out": 0, "skipped": 0}
+        try:
+            entries = await asyncio.to_thread(self.load_queries)
+        except Exception as e:
+            logging.error(f"Prewarm could not load queries: {e}")
+            entries = []
+        queries = [entry["query"] for entry in entries]
+        report["queries"] = len(queries)
+
+        limiter = RateLimiter(self.rate)
+        pending = iter(queries)
+
+        async def worker():
+            # Workers share one iterator, so each query is warmed once
+            for query in pending:
+                report[await self._warm_one(query, limiter, deadline)] += 1
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        report["seconds"] = round(time.monotonic() - start, 3)
+        self.last_report = report
+        return report
+
+    async def _warm_one(self, query: str, limiter: RateLimiter, deadline: float) -> str:
+        if time.monotonic() >= deadline:
+            return "skipped"
+        try:
+            await asyncio.wait_for(limiter.wait(), deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            return "skipped"
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return "skipped"
+        try:
+            await asyncio.wait_for(self.warm(query), remaining)
+            return "warmed"
+        except asyncio.TimeoutError:
+            return "timed_out"
+        except Exception as e:
+            logging.warning(f"Prewarm of {query!r} failed: {e}")
+            return "failed"
+
+    def start(self) -> asyncio.Task:
+        """Warm in the background on the running loop (idempotent); repeats every ``interval`` seconds if set"""
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run_periodically())
+        return self.task
+
+    async def _run_periodically(self) -> None:
+        while True:
+            report = await self.run()
+            logging.info(json.dumps({"prewarm": report}))
+            if not self.interval:
+                return
+            await asyncio.sleep(self.interval)
+
+
+def popular_query_loader(limit: int, days: int, recent: int) -> Callable[[], List[Dict]]:
+    """``load_queries`` reading the most frequent and most recent searches from the database"""
+    from src.db.db_utils import get_popular_queries
+    return lambda: get_popular_queries(limit=limit, days=days, recent=recent)
+
+
+def build_prewarmer(warm: Callable[[str], Awaitable]) -> CachePrewarmer:
+    """Prewarmer for ``warm`` configured from the PREWARM_* settings"""
+    return CachePrewarmer(
+        warm,
+        popular_query_loader(settings.PREWARM_QUERY_LIMIT, settings.PREWARM_LOOKBACK_DAYS,
+                             settings.PREWARM_RECENT_QUERIES),
+        time_budget=settings.PREWARM_TIME_BUDGET,
+        rate=settings.PREWARM_RATE,
+        concurrency=settings.PREWARM_CONCURRENCY,
+        interval=settings.PREWARM_INTERVAL
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    """Command line entry point: python -m src.jobs.cache_prewarm
+
+    Only caches that outlive the process (the SQLite PubMed response cache,
+    and LLM completions with LLM_CACHE_BACKEND=sqlite) stay warm after it
+    exits; worker memory caches are warmed by PREWARM_ON_STARTUP.
+    """
+    from src.agents.research_agent import ResearchAgent
+
+    parser = argparse.ArgumentParser(description="Replay popular past searches to warm the retrieval caches")
+    parser.add_argument("--limit", type=int, default=settings.PREWARM_QUERY_LIMIT)
+    parser.add_argument("--recent", type=int, default=settings.PREWARM_RECENT_QUERIES)
+    parser.add_argument("--days", type=int, default=settings.PREWARM_LOOKBACK_DAYS)
+    parser.add_argument("--time-budget", type=float, default=settings.PREWARM_TIME_BUDGET)
+    parser.add_argument("--rate", type=float, default=settings.PREWARM_RATE)
+    parser.add_argument("--concurrency", type=int, default=settings.PREWARM_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    prewarmer = CachePrewarmer(
+        ResearchAgent().warm_query,
+        popular_query_loader(args.limit, args.days, args.recent),
+        time_budget=args.time_budget,
+        rate=args.rate,
+        concurrency=args.concurrency
+    )
+    report = asyncio.run(prewarmer.run())
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
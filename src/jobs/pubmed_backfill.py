@@ -0,0 +1,389 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from src.config.settings import settings
+from src.utils.rate_limit import RateLimiter
+
+STAGES = ("fetch", "parse", "embed", "store", "upsert")
+
+
+class BackfillCheckpoint:
+    """Backfill progress persisted as JSON so an interrupted run can resume.
+
+    The search is pinned to the entry date of the first run (``maxdate``), so
+    result offsets stay stable across resumes even as PubMed grows. A batch
+    offset is recorded only once its vectors are upserted.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.term: Optional[str] = None
+        self.maxdate: Optional[str] = None
+        self.batch_size = 0
+        self.count = 0
+        self.completed = set()
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            state = json.load(f)
+        self.term = state["term"]
+        self.maxdate = state["maxdate"]
+        self.batch_size = state["batch_size"]
+        self.count = state.get("count", 0)
+        self.completed = set(state.get("completed", []))
+        return True
+
+    def reset(self, term: str, batch_size: int, maxdate: Optional[str] = None) -> None:
+        self.term = term
+        self.batch_size = batch_size
+        self.maxdate = maxdate or datetime.utcnow().strftime("%Y/%m/%d")
+        self.count = 0
+        self.completed = set()
+
+    def matches(self, term: str, batch_size: int) -> bool:
+        return self.term == term and self.batch_size == batch_size
+
+    def save(self) -> None:
+        """Write atomically so a crash mid-write leaves the previous checkpoint intact"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "term": self.term,
+                "maxdate": self.maxdate,
+                "batch_size": self.batch_size,
+                "count": self.count,
+                "completed": sorted(self.completed),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+class Batch:
+    """One efetch page as it moves through the pipeline"""
+
+    def __init__(self, offset: int, size: int):
+        self.offset = offset
+        self.size = size
+        self.medline = ""
+        self.articles: List[Dict] = []
+        self.embeddings: List[List[float]] = []
+
+
+class StageStats:
+    def __init__(self):
+        self.batches = 0
+        self.articles = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+
+class PubMedBackfill:
+    """Staged producer/consumer ingest of a PubMed search into the database and vector index.
+
+    Pages of an Entrez history search flow through fetch -> parse -> embed ->
+    store -> upsert. Each stage runs its own number of workers and hands
+    batches on through a bounded queue, so a slow stage stalls the ones before
+    it instead of buffering the corpus in memory. Entrez calls share a rate
+    limiter. A batch that fails in any stage is left out of the checkpoint and
+    picked up again on the next run.
+    """
+
+    def __init__(self, pubmed_service, store_articles: Callable[[List[Dict]], int], vector_store,
+                 checkpoint: Optional[BackfillCheckpoint] = None, batch_size: int = 500,
+                 concurrency: Optional[Dict[str, int]] = None, queue_size: int = 4,
+                 requests_per_second: float = 10.0, embedding_batch_size: int = 64,
+                 max_retries: int = 3, retry_backoff: float = 1.0, report_interval: float = 10.0,
+                 namespace: Optional[str] = None):
+        self.pubmed_service = pubmed_service
+        self.store_articles = store_articles
+        self.vector_store = vector_store
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.concurrency = {stage: 1 for stage in STAGES}
+        self.concurrency.update(concurrency or {})
+        self.queue_size = queue_size
+        self.requests_per_second = requests_per_second
+        self.embedding_batch_size = embedding_batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.report_interval = report_interval
+        self.namespace = namespace
+
+        self.limiter: Optional[RateLimiter] = None
+        self.checkpointing = True
+        self.stats = {stage: StageStats() for stage in STAGES}
+        self.failed: Dict[int, str] = {}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.target = 0
+        self.started = 0.0
+
+    async def _entrez(self, func, *args, **kwargs):
+        """Rate-limited Entrez call in a worker thread, retried with exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.wait()
+            try:
+                return await asyncio.to_thread(func, *args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                logging.warning(f"Entrez call failed (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def run(self, term: str, max_articles: Optional[int] = None) -> Dict:
+        """Ingest every article matching ``term`` not already recorded in the checkpoint"""
+        self.limiter = RateLimiter(self.requests_per_second)
+        if not self.checkpoint.load() or not self.checkpoint.matches(term, self.batch_size):
+            self.checkpoint.reset(term, self.batch_size)
+
+        count, webenv, query_key = await self._entrez(
+            self.pubmed_service.esearch_history, term, maxdate=self.checkpoint.maxdate
+        )
+        self.checkpoint.count = count
+        self.checkpoint.save()
+
+        total = min(count, max_articles) if max_articles else count
+        return await self._ingest(webenv, query_key, total, skip=self.checkpoint.completed)
+
+    async def ingest_changes(self, term: str, mindate: Optional[str], maxdate: str) -> Dict:
+        """Ingest articles matching ``term`` added or revised between two Entrez dates (inclusive).
+
+        Runs without touching the checkpoint; with no ``mindate`` everything
+        entered up to ``maxdate`` is ingested.
+        """
+        self.limiter = RateLimiter(self.requests_per_second)
+        if mindate is None:
+            count, webenv, query_key = await self._entrez(
+                self.pubmed_service.esearch_history, term, maxdate=maxdate
+            )
+        else:
+            # Entered or revised in the window: one search per date type, each taking its own rate-limit slot
+            webenv, query_keys = None, []
+            for datetype in ("edat", "mdat"):
+                _, webenv, query_key = await self._entrez(
+                    self.pubmed_service.esearch_history, term, mindate, maxdate, datetype=datetype, webenv=webenv
+                )
+                query_keys.append(query_key)
+            # Combine both result sets on the history server so each PMID is fetched once
+            count, webenv, query_key = await self._entrez(
+                self.pubmed_service.esearch_history, " OR ".join(f"#{key}" for key in query_keys), webenv=webenv
+            )
+        return await self._ingest(webenv, query_key, count, checkpoint=False)
+
+    async def _ingest(self, webenv: str, query_key: str, total: int, skip=(), checkpoint: bool = True) -> Dict:
+        self.checkpointing = checkpoint
+        self.stats = {stage: StageStats() for stage in STAGES}
+        self.failed = {}
+        batches = [
+            Batch(offset, min(self.batch_size, total - offset))
+            for offset in range(0, total, self.batch_size)
+            if offset not in skip
+        ]
+        self.target = sum(batch.size for batch in batches)
+        self.started = time.perf_counter()
+
+        self.queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+        handlers = {
+            "fetch": lambda batch: self._fetch(batch, webenv, query_key),
+            "parse": self._parse,
+            "embed": self._embed,
+            "store": self._store,
+            "upsert": self._upsert,
+        }
+        workers = []
+        for i, stage in enumerate(STAGES):
+            outbox = self.queues[STAGES[i + 1]] if i + 1 < len(STAGES) else None
+            for _ in range(self.concurrency[stage]):
+                workers.append(asyncio.create_task(
+                    self._worker(stage, self.queues[stage], outbox, handlers[stage])
+                ))
+        reporter = asyncio.create_task(self._report_periodically())
+
+        try:
+            for batch in batches:
+                await self.queues["fetch"].put(batch)
+            # A batch is handed on before it is marked done, so draining in stage order drains everything
+            for stage in STAGES:
+                await self.queues[stage].join()
+        finally:
+            reporter.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(reporter, *workers, return_exceptions=True)
+
+        report = self.progress()
+        print(self.format_progress(report))
+        return report
+
+    async def _worker(self, stage: str, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue], handler) -> None:
+        stats = self.stats[stage]
+        while True:
+            batch = await inbox.get()
+            try:
+                start = time.perf_counter()
+                await handler(batch)
+                stats.busy_seconds += time.perf_counter() - start
+                stats.batches += 1
+                stats.articles += len(batch.articles)
+                if outbox is not None:
+                    await outbox.put(batch)
+            except Exception as e:
+                stats.errors += 1
+                self.failed[batch.offset] = f"{stage}: {e}"
+                logging.error(f"Backfill batch at offset {batch.offset} failed in {stage}: {e}")
+            finally:
+                inbox.task_done()
+
+    async def _fetch(self, batch: Batch, webenv: str, query_key: str) -> None:
+        batch.medline = await self._entrez(
+            self.pubmed_service.efetch_history, webenv, query_key, batch.offset, batch.size
+        )
+
+    async def _parse(self, batch: Batch) -> None:
+        articles = await asyncio.to_thread(self.pubmed_service.parse_medline_records, batch.medline)
+        # One row per PMID: a repeated key would make the bulk upsert touch the same row twice
+        batch.articles = list({a["pmid"]: a for a in articles if a["pmid"]}.values())
+        batch.medline = ""
+
+    async def _embed(self, batch: Batch) -> None:
+        texts = [self.pubmed_service.embedding_text(a) for a in batch.articles]
+        batch.embeddings = await asyncio.to_thread(
+            self.pubmed_service.embed_texts, texts, self.embedding_batch_size
+        ) if texts else []
+
+    async def _store(self, batch: Batch) -> None:
+        records = [self.pubmed_service.article_record(a) for a in batch.articles]
+        await asyncio.to_thread(self.store_articles, records)
+
+    async def _upsert(self, batch: Batch) -> None:
+        vectors = [
+            {"id": a["pmid"], "values": embedding, "metadata": self.pubmed_service.vector_metadata(a)}
+            for a, embedding in zip(batch.articles, batch.embeddings)
+        ]
+        if vectors:
+            kwargs = {"namespace": self.namespace} if self.namespace else {}
+            await asyncio.to_thread(self.vector_store.upsert_embeddings, vectors, **kwargs)
+        self.failed.pop(batch.offset, None)
+        if self.checkpointing:
+            self.checkpoint.completed.add(batch.offset)
+            self.checkpoint.save()
+
+    def progress(self) -> Dict:
+        """Per-stage throughput, queue depths and how far the last stage lags the first"""
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        done = self.stats["upsert"].articles
+        rate = done / elapsed if elapsed else 0.0
+        remaining = max(self.target - done, 0)
+        return {
+            "elapsed_seconds": elapsed,
+            "target_articles": self.target,
+            "ingested_articles": done,
+            "articles_per_second": rate,
+            # Parsed but not yet in the vector index
+            "lag_articles": self.stats["parse"].articles - done,
+            "eta_seconds": remaining / rate if rate else None,
+            "queues": {stage: queue.qsize() for stage, queue in self.queues.items()},
+            "stages": {
+                stage: {
+                    "batches": stats.batches,
+                    "articles": stats.articles,
+                    "errors": stats.errors,
+                    "utilization": stats.busy_seconds / (elapsed * self.concurrency[stage]) if elapsed else 0.0,
+                }
+                for stage, stats in self.stats.items()
+            },
+            "failed_batches": dict(self.failed),
+        }
+
+    def format_progress(self, progress: Dict) -> str:
+        eta = progress["eta_seconds"]
+        queues = " ".join(f"{stage}={size}/{self.queue_size}" for stage, size in progress["queues"].items())
+        return (
+            f"[backfill] {progress['ingested_articles']}/{progress['target_articles']} articles"
+            f" | {progress['articles_per_second']:.1f} articles/s"
+            f" | lag {progress['lag_articles']}"
+            f" | queues {queues}"
+            f" | failed batches {len(progress['failed_batches'])}"
+            f" | eta {f'{eta:.0f}s' if eta is not None else '-'}"
+        )
+
+    async def _report_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            print(self.format_progress(self.progress()), flush=True)
+
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser) -> None:
+    """Batch, queue and per-stage concurrency flags shared by the ingest jobs"""
+    parser.add_argument("--batch-size", type=int, default=settings.BACKFILL_BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=settings.BACKFILL_QUEUE_SIZE)
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    parser.add_argument("--namespace", default=settings.BACKFILL_NAMESPACE,
+                        help="Vector index namespace to write into (default namespace if empty)")
+    for stage in STAGES:
+        parser.add_argument(f"--{stage}-concurrency", type=int,
+                            default=getattr(settings, f"BACKFILL_{stage.upper()}_CONCURRENCY"))
+
+
+def build_pipeline(args: argparse.Namespace, checkpoint: Optional[BackfillCheckpoint] = None) -> PubMedBackfill:
+    """Pipeline wired to PubMed, the article database and Pinecone"""
+    from src.services.pubmed_service import PubMedService
+    from src.services.pinecone_service import PineconeService
+    from src.db.db_utils import bulk_upsert_articles
+
+    pinecone_service = PineconeService(
+        api_key=settings.PINECONE_API_KEY,
+        environment=settings.PINECONE_ENVIRONMENT,
+        index_name=settings.PINECONE_INDEX_NAME
+    )
+    pubmed_service = PubMedService(
+        email=settings.ENTREZ_EMAIL,
+        api_key=settings.NCBI_API_KEY,
+        pinecone_service=pinecone_service,
+        embedding_model=settings.EMBEDDING_MODEL
+    )
+    return PubMedBackfill(
+        pubmed_service,
+        store_articles=bulk_upsert_articles,
+        vector_store=pinecone_service,
+        checkpoint=checkpoint,
+        batch_size=args.batch_size,
+        concurrency={stage: getattr(args, f"{stage}_concurrency") for stage in STAGES},
+        queue_size=args.queue_size,
+        requests_per_second=settings.NCBI_REQUESTS_PER_SECOND,
+        embedding_batch_size=settings.EMBEDDING_BATCH_SIZE,
+        report_interval=args.report_interval,
+        namespace=args.namespace or None
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    """Command line entry point: python -m src.jobs.pubmed_backfill"""
+    from src.services.pubmed_service import HR_MESH_FILTER
+
+    parser = argparse.ArgumentParser(description="Backfill PubMed articles into the database and vector index")
+    parser.add_argument("--query", help="Search terms, combined with the HR/I-O MeSH filter")
+    parser.add_argument("--max-articles", type=int)
+    parser.add_argument("--checkpoint", default=settings.BACKFILL_CHECKPOINT_PATH)
+    parser.add_argument("--reset", action="store_true", help="Ignore any existing checkpoint")
+    add_pipeline_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.reset and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    backfill = build_pipeline(args, BackfillCheckpoint(args.checkpoint))
+    term = f"{args.query} AND {HR_MESH_FILTER}" if args.query else HR_MESH_FILTER
+    report = asyncio.run(backfill.run(term, max_articles=args.max_articles))
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
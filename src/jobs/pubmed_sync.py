@@ -0,0 +1,86 @@
+import json
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from src.jobs.pubmed_backfill import PubMedBackfill, add_pipeline_arguments, build_pipeline
+
+DEFAULT_TOPIC = "hr_io"
+ENTREZ_DATE_FORMAT = "%Y/%m/%d"
+
+
+class PubMedSync:
+    """Incremental ingest of saved PubMed topics against a per-topic watermark.
+
+    Each run asks PubMed only for articles entered or modified between the
+    topic's watermark and today, ingests them through the backfill pipeline,
+    and advances the watermark only if every batch made it into the database
+    and the vector index. Entrez date ranges are inclusive and day-granular,
+    so the watermark day is searched again; the upserts make that harmless.
+    """
+
+    def __init__(self, pipeline: PubMedBackfill, get_watermark: Callable[[str], Optional[Dict]],
+                 advance_watermark: Callable[[str, str, datetime, int], Dict]):
+        self.pipeline = pipeline
+        self.get_watermark = get_watermark
+        self.advance_watermark = advance_watermark
+
+    async def sync_topic(self, topic: str, query: str, since: Optional[datetime] = None,
+                         until: Optional[datetime] = None) -> Dict:
+        """Ingest what changed for ``topic`` since its watermark (or ``since``)"""
+        watermark = self.get_watermark(topic)
+        until = (until or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+        if since is None and watermark and watermark["query"] == query:
+            since = watermark["synced_through"]
+
+        report = await self.pipeline.ingest_changes(
+            query,
+            mindate=since.strftime(ENTREZ_DATE_FORMAT) if since else None,
+            maxdate=until.strftime(ENTREZ_DATE_FORMAT)
+        )
+        report["topic"] = topic
+        report["window"] = {"mindate": since, "maxdate": until}
+
+        if report["failed_batches"]:
+            logging.error(f"Sync of {topic} left {len(report['failed_batches'])} batches unfinished; "
+                          f"watermark stays at {since}")
+            report["watermark"] = watermark
+            report["advanced"] = False
+        else:
+            report["watermark"] = self.advance_watermark(topic, query, until, report["ingested_articles"])
+            report["advanced"] = True
+        return report
+
+    async def sync_topics(self, topics: Dict[str, str]) -> List[Dict]:
+        """Sync several topics one after another; they share the Entrez rate limit"""
+        return [await self.sync_topic(topic, query) for topic, query in topics.items()]
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict]:
+    """Command line entry point: python -m src.jobs.pubmed_sync"""
+    from src.services.pubmed_service import HR_MESH_FILTER
+    from src.db.db_utils import advance_sync_watermark, get_sync_watermark, get_sync_watermarks
+
+    parser = argparse.ArgumentParser(description="Ingest PubMed articles added or revised since the last sync")
+    parser.add_argument("--topic", default=DEFAULT_TOPIC)
+    parser.add_argument("--query", help="Search terms for the topic, combined with the HR/I-O MeSH filter")
+    parser.add_argument("--all", action="store_true", help="Sync every saved topic with its stored query")
+    parser.add_argument("--since", type=lambda value: datetime.strptime(value, ENTREZ_DATE_FORMAT),
+                        help="Override the watermark (YYYY/MM/DD)")
+    add_pipeline_arguments(parser)
+    args = parser.parse_args(argv)
+
+    sync = PubMedSync(build_pipeline(args), get_sync_watermark, advance_sync_watermark)
+    if args.all:
+        topics = {w["topic"]: w["query"] for w in get_sync_watermarks()}
+        reports = asyncio.run(sync.sync_topics(topics))
+    else:
+        query = f"{args.query} AND {HR_MESH_FILTER}" if args.query else HR_MESH_FILTER
+        reports = [asyncio.run(sync.sync_topic(args.topic, query, since=args.since))]
+    print(json.dumps(reports, indent=2, default=str))
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Float, Boolean, JSON
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, ForeignKeyConstraint, Float, Boolean, JSON, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
@@ -20,6 +20,8 @@ class PubMedArticle(Base):
     raw_data = Column(Text)  # Store complete raw PubMed data
     created_at = Column(DateTime, default=datetime.utcnow)
     is_cached = Column(Boolean, default=False)
+    dedup_signature = Column(LargeBinary)  # MinHash of title + abstract (src/utils/dedup.py)
+    duplicate_of = Column(String, index=True)  # PMID of the article this one near-duplicates
     
     # HR-specific fields
     hr_categories = Column(ARRAY(String))  # Categories like 'employee_engagement', 'performance', etc.
@@ -30,22 +32,24 @@ class PubMedArticle(Base):
     
     # Relationships
     cache_entry = relationship("CachedArticle", back_populates="article", uselist=False)
-    search_history = relationship("SearchHistory", back_populates="articles")
+    search_history = relationship("SearchHistory", secondary="search_history_articles", back_populates="articles")
     metrics_analysis = relationship("MetricsAnalysis", back_populates="article")
 
 class SearchHistory(Base):
     __tablename__ = 'search_history'
+    # Monthly range partitions (src/db/partitions.py); the partition key has to be part of the primary key
+    __table_args__ = {'postgresql_partition_by': 'RANGE (timestamp)'}
     
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     query = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
     result_count = Column(Integer)
     user_id = Column(String)  # For future user authentication
     article_ids = Column(ARRAY(Integer))  # Store IDs of returned articles
     search_category = Column(String)  # e.g., 'metrics', 'research', 'best_practices'
     
     # Relationships
-    articles = relationship("PubMedArticle", secondary="search_history_articles")
+    articles = relationship("PubMedArticle", secondary="search_history_articles", back_populates="search_history")
 
 class CachedArticle(Base):
     __tablename__ = 'cached_articles'
@@ -78,9 +82,37 @@ class MetricsAnalysis(Base):
 # Association table for many-to-many relationship between SearchHistory and PubMedArticle
 class SearchHistoryArticle(Base):
     __tablename__ = 'search_history_articles'
+    __table_args__ = (
+        ForeignKeyConstraint(['search_history_id', 'search_timestamp'], ['search_history.id', 'search_history.timestamp'],
+                             name='search_history_articles_search_history_fkey'),
+        {'postgresql_partition_by': 'RANGE (search_timestamp)'}
+    )
     
-    search_history_id = Column(Integer, ForeignKey('search_history.id'), primary_key=True)
+    search_history_id = Column(Integer, primary_key=True)
+    search_timestamp = Column(DateTime, primary_key=True)  # Timestamp of the search; partitions rows by the same month
     article_id = Column(Integer, ForeignKey('pubmed_articles.id'), primary_key=True)
     rank = Column(Integer)  # Store the rank of the article in search results
     relevance_score = Column(Float)  # Store the relevance score if available
-    hr_relevance_score = Column(Float)  # Store HR-specific relevance score 
\ No newline at end of file
+    hr_relevance_score = Column(Float)  # Store HR-specific relevance score
+
+class PubMedSyncWatermark(Base):
+    __tablename__ = 'pubmed_sync_watermarks'
+    
+    id = Column(Integer, primary_key=True)
+    topic = Column(String, unique=True, nullable=False)
+    query = Column(Text, nullable=False)  # Entrez search term synced for this topic
+    synced_through = Column(DateTime)  # Entry/modification date the corpus is complete up to
+    last_run_at = Column(DateTime)
+    last_run_articles = Column(Integer, default=0)
+    total_articles = Column(Integer, default=0)
+
+class ConversationSession(Base):
+    __tablename__ = 'conversation_sessions'
+    
+    session_id = Column(String, primary_key=True)
+    user_id = Column(String, index=True)
+    summary = Column(Text)  # Rolling summary of turns that left the window
+    turns = Column(JSONB)  # Recent turns verbatim: [{"role", "content", "tokens"}]
+    token_count = Column(Integer, default=0)  # Tokens the summary and turns add to a prompt
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
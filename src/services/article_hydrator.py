@@ -0,0 +1,54 @@
+import time
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from cachetools import TTLCache
+from src.utils.cache import CacheStats
+from src.utils.tracing import span
+
+# Article fields served from the database rather than vector metadata
+DISPLAY_FIELDS = ("title", "abstract", "authors", "journal", "publication_date", "keywords")
+
+
+class ArticleHydrator:
+    """Fills in display fields for vector matches from the article database.
+
+    Vectors carry only the PMID and filterable fields. Rows for every match
+    not already in the in-process row cache are loaded with one ``load_rows``
+    call (an ``IN`` query), run in a thread so the loop keeps serving.
+    """
+
+    def __init__(self, load_rows: Callable[[List[str]], Dict[str, Dict]], maxsize: int, ttl: float):
+        self.load_rows = load_rows
+        self.rows = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.stats = CacheStats()
+
+    async def hydrate(self, matches: Iterable[Any]) -> List[Dict]:
+        """One dict per match, in rank order: its metadata overlaid with the article row"""
+        matches = list(matches)
+        pmids = list(dict.fromkeys(str(match.id) for match in matches))
+        found = {pmid: self.rows[pmid] for pmid in pmids if pmid in self.rows}
+        missing = [pmid for pmid in pmids if pmid not in found]
+        self.stats.hits += len(found)
+        self.stats.misses += len(missing)
+
+        if missing:
+            start = time.perf_counter()
+            with span("postgres.hydrate", size=len(missing)):
+                loaded = await asyncio.to_thread(self.load_rows, missing)
+            self.stats.record_backend(time.perf_counter() - start)
+            self.rows.update(loaded)
+            found.update(loaded)
+
+        # Vectors written before metadata was slimmed still carry display fields; the row wins where both exist
+        return [
+            {**(match.metadata or {}), **found.get(str(match.id), {}), "pmid": str(match.id)}
+            for match in matches
+        ]
+
+    def invalidate(self, pmids: Optional[Iterable[str]] = None) -> None:
+        """Drop cached rows for ``pmids``, or every row when None"""
+        if pmids is None:
+            self.rows.clear()
+            return
+        for pmid in pmids:
+            self.rows.pop(str(pmid), None)
@@ -1,9 +1,13 @@
 from azure.core.credentials import AzureKeyCredential
-from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import SearchIndex
 from azure.search.documents.models import QueryType
 from src.config.settings import settings
+from src.utils.cache import AsyncResultCache
+from src.utils.tracing import traced
+from src.utils.memory import cache_registry
+from src.services.search_indexer import BulkSearchIndexer
 
 class BingGroundingService:
     def __init__(self):
@@ -17,6 +21,21 @@ class BingGroundingService:
             endpoint=f"https://{settings.AZURE_SEARCH_SERVICE_NAME}.search.windows.net",
             credential=AzureKeyCredential(settings.AZURE_SEARCH_API_KEY)
         )
+        
+        # Results shared across sessions, keyed by (query, top_k)
+        self.result_cache = AsyncResultCache(
+            maxsize=settings.SEARCH_CACHE_SIZE,
+            ttl=settings.SEARCH_CACHE_TTL
+        )
+        cache_registry.register_mapping("search_results", self.result_cache.cache, priority=10)
+        
+        self.indexer = BulkSearchIndexer(
+            self.search_client,
+            max_batch_documents=settings.SEARCH_INDEX_BATCH_DOCUMENTS,
+            max_batch_bytes=settings.SEARCH_INDEX_BATCH_BYTES,
+            max_concurrency=settings.SEARCH_INDEX_CONCURRENCY,
+            max_retries=settings.SEARCH_INDEX_MAX_RETRIES
+        )
 
     async def create_index(self):
         """Create the search index if it doesn't exist"""
@@ -35,16 +54,31 @@ class BingGroundingService:
             self.index_client.create_index(index)
 
     async def add_documents(self, documents):
-        """Add documents to the search index"""
-        self.search_client.upload_documents(documents)
+        """Add documents to the search index in parallel, size-bounded batches"""
+        report = await self.indexer.index(documents)
+        # Newly indexed documents may change any cached answer
+        self.result_cache.invalidate()
+        return report
 
     async def search(self, query: str, top_k: int = 5):
-        """Search for relevant documents"""
-        results = self.search_client.search(
+        """Search for relevant documents, sharing cached and in-flight results"""
+        key = (" ".join(query.split()).lower(), top_k)
+        return await self.result_cache.get_or_load(key, lambda: self._search(query, top_k))
+
+    @traced("azure_search.query", size=len)
+    async def _search(self, query: str, top_k: int):
+        results = await self.search_client.search(
             search_text=query,
             query_type=QueryType.SEMANTIC,
             query_language="en-us",
             semantic_configuration_name="default",
             top=top_k
         )
-        return [doc for doc in results] 
\ No newline at end of file
+        return [doc async for doc in results]
+
+    def cache_stats(self) -> dict:
+        """Hit ratio, coalesced lookups and backend latency of the result cache"""
+        return {**self.result_cache.stats.as_dict(), "entries": len(self.result_cache)}
+
+    async def close(self):
+        await self.search_client.close()
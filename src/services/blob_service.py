@@ -0,0 +1,58 @@
+from typing import BinaryIO, Optional
+from azure.core import MatchConditions
+from azure.storage.blob.aio import BlobServiceClient
+from src.config.settings import settings
+
+
+class BlobStorageService:
+    """Async Azure Blob Storage access with chunked, parallel transfers.
+
+    Uploads are sent as blocks of ``chunk_size`` and downloads as ranged GETs of
+    ``chunk_size``, with up to ``max_concurrency`` in flight, so memory per
+    transfer is bounded by ``chunk_size * max_concurrency`` whatever the blob size.
+    """
+
+    def __init__(self, connection_string: Optional[str] = None, container: Optional[str] = None,
+                 chunk_size: Optional[int] = None, max_concurrency: Optional[int] = None):
+        self.chunk_size = chunk_size or settings.BLOB_CHUNK_SIZE
+        self.max_concurrency = max_concurrency or settings.BLOB_MAX_CONCURRENCY
+        self.blob_service_client = BlobServiceClient.from_connection_string(
+            connection_string or settings.AZURE_STORAGE_CONNECTION_STRING,
+            max_block_size=self.chunk_size,
+            max_single_put_size=self.chunk_size,
+            max_single_get_size=self.chunk_size,
+            max_chunk_get_size=self.chunk_size
+        )
+        self.container_client = self.blob_service_client.get_container_client(
+            container or settings.AZURE_STORAGE_CONTAINER
+        )
+
+    async def upload_stream(self, blob_name: str, stream: BinaryIO, length: Optional[int] = None) -> str:
+        """Upload a file-like object block by block; returns the new blob's ETag"""
+        blob_client = self.container_client.get_blob_client(blob_name)
+        result = await blob_client.upload_blob(
+            stream,
+            length=length,
+            max_concurrency=self.max_concurrency
+        )
+        return result["etag"]
+
+    async def get_etag(self, blob_name: str) -> str:
+        """Current ETag of a blob"""
+        blob_client = self.container_client.get_blob_client(blob_name)
+        properties = await blob_client.get_blob_properties()
+        return properties.etag
+
+    async def download_to_file(self, blob_name: str, stream: BinaryIO, etag: Optional[str] = None) -> int:
+        """Download a blob with parallel ranged reads into a writable, seekable stream.
+
+        When ``etag`` is given the download fails if the blob changed since.
+        Returns the number of bytes written.
+        """
+        blob_client = self.container_client.get_blob_client(blob_name)
+        kwargs = {"etag": etag, "match_condition": MatchConditions.IfNotModified} if etag else {}
+        downloader = await blob_client.download_blob(max_concurrency=self.max_concurrency, **kwargs)
+        return await downloader.readinto(stream)
+
+    async def close(self) -> None:
+        await self.blob_service_client.close()
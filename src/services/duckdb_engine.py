@@ -0,0 +1,280 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.types as pa_types
+from typing import Dict, List, Optional
+from src.utils.graph_rendering import (
+    bar_traces,
+    binned_bar_traces,
+    box_trace,
+    build_figure,
+    density_trace,
+    render_graph,
+)
+
+try:
+    import duckdb
+except ImportError:  # Optional dependency: DataAnalysisTool falls back to pandas without it
+    duckdb = None
+
+
+def quote(identifier: str) -> str:
+    """Quote a column name for use in DuckDB SQL"""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class DuckDBQueryEngine:
+    """Runs data-analysis projections and aggregations as SQL over an Arrow table.
+
+    The table (usually memory-mapped from the dataset cache) is registered
+    without copying; DuckDB only scans the columns a query references and runs
+    on all cores, so plotting receives a small, already-aggregated result.
+    """
+
+    def __init__(self, threads: int = 0):
+        if duckdb is None:
+            raise ImportError("duckdb is required for the DuckDB query engine")
+        self.threads = threads or os.cpu_count() or 1
+
+    @staticmethod
+    def available() -> bool:
+        return duckdb is not None
+
+    def _connect(self, table: pa.Table):
+        con = duckdb.connect()
+        con.execute(f"SET threads TO {int(self.threads)}")
+        con.register("dataset", table)
+        return con
+
+    @staticmethod
+    def _numeric_expr(table: pa.Table, column: str) -> Optional[str]:
+        """SQL expression giving the column as DOUBLE (timestamps as epoch ns), None if not numeric"""
+        field_type = table.schema.field(column).type
+        if pa_types.is_integer(field_type) or pa_types.is_floating(field_type):
+            return f"CAST({quote(column)} AS DOUBLE)"
+        if pa_types.is_timestamp(field_type) or pa_types.is_date(field_type):
+            return f"CAST(epoch_ns(CAST({quote(column)} AS TIMESTAMP)) AS DOUBLE)"
+        return None
+
+    @staticmethod
+    def _pandas_dtype(table: pa.Table, column: str):
+        return table.schema.empty_table().select([column]).to_pandas()[column].dtype
+
+    def generate_graph(self, table: pa.Table, graph_type: str, x_col: str, y_col: Optional[str] = None,
+                       color_col: Optional[str] = None, max_points: int = 5000, bins: int = 200) -> Dict:
+        """Same figure as ``render_graph`` but with the heavy lifting pushed into SQL"""
+        for column in (x_col, y_col, color_col):
+            if column is not None and column not in table.schema.names:
+                raise ValueError(f"Unknown column: {column}")
+
+        con = self._connect(table)
+        try:
+            if graph_type == "line":
+                return self._line(con, table, x_col, y_col, color_col, max_points)
+            elif graph_type == "bar":
+                return self._bar(con, table, x_col, y_col, color_col)
+            elif graph_type == "scatter":
+                return self._scatter(con, table, x_col, y_col, color_col, max_points, bins)
+            elif graph_type == "histogram":
+                return self._histogram(con, table, x_col, color_col, bins)
+            elif graph_type == "box":
+                return self._box(con, table, x_col, y_col, color_col)
+            else:
+                raise ValueError(f"Unsupported graph type: {graph_type}")
+        finally:
+            con.close()
+
+    def _projection(self, con, columns: List[str], limit: Optional[int] = None) -> pd.DataFrame:
+        sql = f"SELECT {', '.join(quote(c) for c in dict.fromkeys(columns))} FROM dataset"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return con.execute(sql).fetch_df()
+
+    @staticmethod
+    def _columns(*columns) -> List[str]:
+        return [c for c in columns if c is not None]
+
+    def _line(self, con, table, x_col, y_col, color_col, max_points):
+        x_num = self._numeric_expr(table, x_col)
+        y_num = self._numeric_expr(table, y_col)
+        if x_num is None or y_num is None or table.num_rows <= 2 * max_points:
+            df = self._projection(con, self._columns(x_col, y_col, color_col))
+            figure = render_graph(df, "line", x_col, y_col, color_col, max_points=max_points)
+            figure["layout"]["meta"]["rows"] = table.num_rows
+            return figure
+
+        # Min/max per x bucket keeps every peak and trough; LTTB then trims to max_points
+        color_sel = f"{quote(color_col)} AS c" if color_col else "NULL AS c"
+        rows = con.execute(f"""
+            WITH points AS (
+                SELECT {color_sel}, {quote(x_col)} AS x, {quote(y_col)} AS y, {x_num} AS xn
+                FROM dataset WHERE {quote(x_col)} IS NOT NULL AND {quote(y_col)} IS NOT NULL
+            ), bounds AS (SELECT min(xn) AS lo, max(xn) AS hi FROM points),
+            bucketed AS (
+                SELECT c, x, y,
+                       least(CAST(floor((xn - lo) / nullif(hi - lo, 0) * {int(max_points)}) AS BIGINT),
+                             {int(max_points) - 1}) AS bucket
+                FROM points, bounds
+            )
+            SELECT c, arg_min(x, y) AS x_low, min(y) AS y_low, arg_max(x, y) AS x_high, max(y) AS y_high
+            FROM bucketed GROUP BY c, bucket
+        """).fetch_df()
+        df = pd.concat([
+            rows[["c", "x_low", "y_low"]].set_axis(["c", x_col, y_col], axis=1),
+            rows[["c", "x_high", "y_high"]].set_axis(["c", x_col, y_col], axis=1),
+        ]).drop_duplicates()
+        if color_col:
+            df = df.rename(columns={"c": color_col})
+        figure = render_graph(df, "line", x_col, y_col, color_col, max_points=max_points)
+        figure["layout"]["meta"]["rows"] = table.num_rows
+        return figure
+
+    def _bar(self, con, table, x_col, y_col, color_col):
+        keys = ", ".join(quote(c) for c in self._columns(color_col, x_col))
+        value = f"sum({quote(y_col)})" if y_col is not None else "count(*)"
+        alias = y_col if y_col is not None else "count"
+        df = con.execute(
+            f"SELECT {keys}, {value} AS {quote(alias)} FROM dataset GROUP BY {keys}"
+        ).fetch_df()
+        traces = bar_traces(df, x_col, alias, color_col)
+        return build_figure(traces, "bar", x_col, y_col, color_col, table.num_rows)
+
+    def _bounded_bins(self, con, x_num, y_num, bins):
+        """Equal-width bin indices for one or two numeric expressions over non-null rows"""
+        exprs = [e for e in (x_num, y_num) if e is not None]
+        where = " AND ".join(f"{e} IS NOT NULL" for e in exprs)
+        bounds = con.execute(
+            f"SELECT {', '.join(f'min({e}), max({e})' for e in exprs)} FROM dataset WHERE {where}"
+        ).fetchone()
+        edges, bucket_exprs = [], []
+        for i, expr in enumerate(exprs):
+            lo, hi = bounds[2 * i], bounds[2 * i + 1]
+            if lo is None:
+                lo, hi = 0.0, 1.0
+            if lo == hi:
+                lo, hi = lo - 0.5, hi + 0.5
+            edges.append(np.linspace(lo, hi, bins + 1))
+            bucket_exprs.append(
+                f"least(CAST(floor(({expr} - {lo!r}) / {(hi - lo)!r} * {bins}) AS BIGINT), {bins - 1})"
+            )
+        return edges, bucket_exprs, where
+
+    def _scatter(self, con, table, x_col, y_col, color_col, max_points, bins):
+        x_num = self._numeric_expr(table, x_col)
+        y_num = self._numeric_expr(table, y_col)
+        if table.num_rows <= max_points or x_num is None or y_num is None:
+            df = self._projection(con, self._columns(x_col, y_col, color_col), limit=max_points)
+            figure = render_graph(df, "scatter", x_col, y_col, color_col, max_points=max_points, bins=bins)
+            figure["layout"]["meta"]["rows"] = table.num_rows
+            return figure
+
+        (x_edges, y_edges), (bx, by), where = self._bounded_bins(con, x_num, y_num, bins)
+        rows = con.execute(
+            f"SELECT {bx} AS x_bin, {by} AS y_bin, count(*) AS n FROM dataset WHERE {where} GROUP BY x_bin, y_bin"
+        ).fetchnumpy()
+        counts = np.zeros((bins, bins))
+        counts[rows["x_bin"].astype(np.int64), rows["y_bin"].astype(np.int64)] = rows["n"]
+        trace = density_trace(x_edges, y_edges, counts,
+                              self._pandas_dtype(table, x_col), self._pandas_dtype(table, y_col))
+        return build_figure([trace], "scatter", x_col, y_col, color_col, table.num_rows)
+
+    def _histogram(self, con, table, x_col, color_col, bins):
+        x_num = self._numeric_expr(table, x_col)
+        color_sel = f"{quote(color_col)}" if color_col else "NULL"
+        if x_num is None:
+            keys = ", ".join(quote(c) for c in self._columns(color_col, x_col))
+            df = con.execute(f"SELECT {keys}, count(*) AS n FROM dataset GROUP BY {keys}").fetch_df()
+            traces = bar_traces(df, x_col, "n", color_col)
+            return build_figure(traces, "histogram", x_col, None, color_col, table.num_rows)
+
+        (edges,), (bucket,), where = self._bounded_bins(con, x_num, None, bins)
+        rows = con.execute(
+            f"SELECT {color_sel} AS c, {bucket} AS b, count(*) AS n FROM dataset WHERE {where} GROUP BY c, b"
+        ).fetch_df()
+        grouped_counts = []
+        for name, group in (rows.groupby("c", sort=False, dropna=False) if color_col else [(None, rows)]):
+            counts = np.zeros(bins)
+            counts[group["b"].to_numpy(dtype=np.int64)] = group["n"].to_numpy()
+            grouped_counts.append((name, counts))
+        traces = binned_bar_traces(edges, grouped_counts, self._pandas_dtype(table, x_col), color_col)
+        return build_figure(traces, "histogram", x_col, None, color_col, table.num_rows)
+
+    def _box(self, con, table, x_col, y_col, color_col):
+        value_col = y_col if y_col is not None else x_col
+        category = quote(x_col) if y_col is not None else f"'{x_col.replace(chr(39), chr(39) * 2)}'"
+        color_sel = quote(color_col) if color_col else "NULL"
+        value = quote(value_col)
+        rows = con.execute(f"""
+            WITH data AS (
+                SELECT {color_sel} AS c, {category} AS category, CAST({value} AS DOUBLE) AS v
+                FROM dataset WHERE {value} IS NOT NULL
+            ), quartiles AS (
+                SELECT c, category,
+                       quantile_cont(v, 0.25) AS q1, quantile_cont(v, 0.5) AS median,
+                       quantile_cont(v, 0.75) AS q3, avg(v) AS mean
+                FROM data GROUP BY c, category
+            )
+            SELECT q.c, q.category, q.q1, q.median, q.q3, q.mean,
+                   min(d.v) FILTER (WHERE d.v >= q.q1 - 1.5 * (q.q3 - q.q1)) AS lowerfence,
+                   max(d.v) FILTER (WHERE d.v <= q.q3 + 1.5 * (q.q3 - q.q1)) AS upperfence
+            FROM quartiles q JOIN data d
+              ON d.c IS NOT DISTINCT FROM q.c AND d.category IS NOT DISTINCT FROM q.category
+            GROUP BY q.c, q.category, q.q1, q.median, q.q3, q.mean
+        """).fetch_df()
+        traces = []
+        for name, group in (rows.groupby("c", sort=False, dropna=False) if color_col else [(None, rows)]):
+            traces.append(box_trace(name, group.to_dict("records"), color_col))
+        return build_figure(traces, "box", x_col, y_col, color_col, table.num_rows)
+
+    def analyze_data(self, table: pa.Table) -> Dict:
+        """Same output as ``DataAnalysisTool.analyze_data``, computed in a single SQL scan"""
+        columns = table.schema.names
+        numeric = [c for c in columns if self._numeric_expr(table, c) is not None
+                   and not pa_types.is_timestamp(table.schema.field(c).type)
+                   and not pa_types.is_date(table.schema.field(c).type)]
+
+        selects = ["count(*)"] + [f"count({quote(c)})" for c in columns]
+        for c in numeric:
+            q = quote(c)
+            selects += [f"avg({q})", f"stddev_samp({q})", f"min({q})",
+                        f"quantile_cont({q}, [0.25, 0.5, 0.75])", f"max({q})"]
+        pairs = [(a, b) for i, a in enumerate(numeric) for b in numeric[i:]]
+        if len(numeric) > 1:
+            selects += [f"corr({quote(a)}, {quote(b)})" for a, b in pairs]
+
+        con = self._connect(table)
+        try:
+            row = list(con.execute(f"SELECT {', '.join(selects)} FROM dataset").fetchone())
+        finally:
+            con.close()
+
+        def number(value):
+            return float("nan") if value is None else float(value)
+
+        total = row.pop(0)
+        counts = {c: row.pop(0) for c in columns}
+        summary = {}
+        for c in numeric:
+            mean, std, minimum, quartiles, maximum = (row.pop(0) for _ in range(5))
+            quartiles = quartiles or [None, None, None]
+            summary[c] = {
+                "count": float(counts[c]), "mean": number(mean), "std": number(std), "min": number(minimum),
+                "25%": number(quartiles[0]), "50%": number(quartiles[1]), "75%": number(quartiles[2]),
+                "max": number(maximum),
+            }
+
+        correlation = {}
+        if len(numeric) > 1:
+            correlation = {c: {} for c in numeric}
+            for a, b in pairs:
+                value = number(row.pop(0))
+                correlation[a][b] = correlation[b][a] = value
+            correlation = {c: {r: correlation[c][r] for r in numeric} for c in numeric}
+
+        return {
+            "summary": summary,
+            "missing_values": {c: total - counts[c] for c in columns},
+            "data_types": table.schema.empty_table().to_pandas().dtypes.astype(str).to_dict(),
+            "correlation": correlation
+        }
@@ -1,7 +1,10 @@
 import pinecone
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional
 import numpy as np
 from datetime import datetime
+from src.config.settings import settings
+from src.services.vector_writer import BulkVectorWriter, VectorWriteError, VectorWriteReport
+from src.utils.tracing import traced
 
 class PineconeService:
     def __init__(self, api_key: str, environment: str, index_name: str = "research-chat"):
@@ -17,27 +20,66 @@ class PineconeService:
             )
         
         self.index = pinecone.Index(index_name)
+        self.writer = BulkVectorWriter(
+            self.index,
+            max_batch_vectors=settings.PINECONE_UPSERT_BATCH_SIZE,
+            max_concurrency=settings.PINECONE_WRITE_CONCURRENCY,
+            max_retries=settings.PINECONE_MAX_RETRIES
+        )
+    
+    @staticmethod
+    def _namespace(namespace: Optional[str]) -> Dict:
+        # Omitted rather than sent empty, so the default namespace works on every client version
+        return {"namespace": namespace} if namespace else {}
     
-    def store_embeddings(self, article_id: str, embedding: List[float], metadata: Dict) -> None:
+    @traced("pinecone.upsert")
+    def store_embeddings(self, article_id: str, embedding: List[float], metadata: Dict,
+                         namespace: Optional[str] = None) -> None:
         """Store article embedding in Pinecone"""
         self.index.upsert(
             vectors=[{
                 "id": article_id,
                 "values": embedding,
                 "metadata": metadata
-            }]
+            }],
+            **self._namespace(namespace)
         )
     
-    def search_similar(self, query_embedding: List[float], top_k: int = 3) -> List[Dict]:
-        """Search for similar articles using vector similarity"""
+    @traced("pinecone.upsert")
+    def upsert_vectors(self, vectors: List[Dict], namespace: Optional[str] = None,
+                       batch_size: Optional[int] = None) -> VectorWriteReport:
+        """Store many {"id", "values", "metadata"} vectors in parallel chunks; failures are reported"""
+        return self.writer.upsert(vectors, namespace=namespace, batch_size=batch_size)
+    
+    def upsert_embeddings(self, vectors: List[Dict], batch_size: Optional[int] = None,
+                          namespace: Optional[str] = None) -> int:
+        """Store many vectors; raises VectorWriteError if any are still missing after retries"""
+        report = self.upsert_vectors(vectors, namespace=namespace, batch_size=batch_size)
+        if report.failed:
+            raise VectorWriteError(report)
+        return report.succeeded
+    
+    @traced("pinecone.query", size=len)
+    def search_similar(self, query_embedding: List[float], top_k: int = 3, filter: Optional[Dict] = None,
+                       namespace: Optional[str] = None) -> List[Dict]:
+        """Search for similar articles using vector similarity, optionally within one namespace"""
+        kwargs = self._namespace(namespace)
+        if filter:
+            kwargs["filter"] = filter
         results = self.index.query(
             vector=query_embedding,
             top_k=top_k,
-            include_metadata=True
+            include_metadata=True,
+            **kwargs
         )
         
         return results.matches
     
-    def delete_article(self, article_id: str) -> None:
+    def delete_article(self, article_id: str, namespace: Optional[str] = None) -> None:
         """Delete an article from Pinecone"""
-        self.index.delete(ids=[article_id]) 
\ No newline at end of file
+        self.index.delete(ids=[article_id], **self._namespace(namespace))
+    
+    @traced("pinecone.delete")
+    def delete_articles(self, article_ids: Iterable[str], namespace: Optional[str] = None) -> VectorWriteReport:
+        """Delete many articles in parallel chunks; failures are reported"""
+        return self.writer.delete(article_ids, namespace=namespace)
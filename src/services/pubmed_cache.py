@@ -0,0 +1,137 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+from src.utils.cache import CacheStats
+
+# A Medline record starts at its PMID line; records are separated by blank lines
+_RECORD_START = re.compile(r"^PMID- *(\S+)", re.MULTILINE)
+
+
+def split_medline(text: str) -> Dict[str, str]:
+    """Split a multi-record Medline response into {pmid: record text}"""
+    starts = list(_RECORD_START.finditer(text))
+    records = {}
+    for i, match in enumerate(starts):
+        end = starts[i + 1].start() if i + 1 < len(starts) else len(text)
+        records[match.group(1)] = text[match.start():end].strip() + "\n"
+    return records
+
+
+class PubMedResponseCache:
+    """Persistent SQLite cache of esearch ID lists and efetch Medline records.
+
+    Search results change as PubMed grows and get a short TTL; records are
+    keyed by PMID and kept much longer. The database survives restarts and is
+    shared by every process on the host (WAL mode).
+    """
+
+    def __init__(self, path: str, search_ttl: float, record_ttl: float, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.search_ttl = search_ttl
+        self.record_ttl = record_ttl
+        self.clock = clock
+        self.search_stats = CacheStats()
+        self.record_stats = CacheStats()
+        self.lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS searches (
+                term TEXT NOT NULL,
+                retmax INTEGER NOT NULL,
+                pmids TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (term, retmax)
+            )
+        """)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                pmid TEXT PRIMARY KEY,
+                medline TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+
+    @staticmethod
+    def _term_key(term: str) -> str:
+        # Whitespace only: Entrez boolean operators are case-sensitive
+        return " ".join(term.split())
+
+    def get_search(self, term: str, retmax: int) -> Optional[List[str]]:
+        """Cached PMID list for a search, or None if absent or expired"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT pmids FROM searches WHERE term = ? AND retmax = ? AND fetched_at > ?",
+                (self._term_key(term), retmax, self.clock() - self.search_ttl)
+            ).fetchone()
+        if row is None:
+            self.search_stats.misses += 1
+            return None
+        self.search_stats.hits += 1
+        return json.loads(row[0])
+
+    def put_search(self, term: str, retmax: int, pmids: List[str]) -> None:
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO searches (term, retmax, pmids, fetched_at) VALUES (?, ?, ?, ?)",
+                (self._term_key(term), retmax, json.dumps(list(pmids)), self.clock())
+            )
+
+    def get_records(self, pmids: Iterable[str]) -> Dict[str, str]:
+        """Unexpired Medline records for whichever of ``pmids`` are cached"""
+        pmids = list(pmids)
+        found = {}
+        cutoff = self.clock() - self.record_ttl
+        with self.lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(pmids), 500):
+                chunk = pmids[start:start + 500]
+                rows = self.connection.execute(
+                    f"SELECT pmid, medline FROM records WHERE fetched_at > ? "
+                    f"AND pmid IN ({','.join('?' * len(chunk))})",
+                    [cutoff, *chunk]
+                ).fetchall()
+                found.update(rows)
+        self.record_stats.hits += len(found)
+        self.record_stats.misses += len(pmids) - len(found)
+        return found
+
+    def put_records(self, records: Dict[str, str]) -> None:
+        now = self.clock()
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO records (pmid, medline, fetched_at) VALUES (?, ?, ?)",
+                    [(pmid, medline, now) for pmid, medline in records.items()]
+                )
+            except Exception:
+                # Leave the shared connection usable for the next transaction
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def purge_expired(self) -> int:
+        """Delete expired searches and records; returns rows removed"""
+        now = self.clock()
+        with self.lock:
+            removed = self.connection.execute(
+                "DELETE FROM searches WHERE fetched_at <= ?", (now - self.search_ttl,)
+            ).rowcount
+            removed += self.connection.execute(
+                "DELETE FROM records WHERE fetched_at <= ?", (now - self.record_ttl,)
+            ).rowcount
+        return removed
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {"searches": self.search_stats.as_dict(), "records": self.record_stats.as_dict()}
+
+    def close(self) -> None:
+        self.connection.close()
@@ -1,25 +1,80 @@
+import io
+import json
+import time
+import asyncio
 from Bio import Entrez, Medline
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
 from src.models.pubmed import PubMedArticle
 from sentence_transformers import SentenceTransformer
 from src.services.pinecone_service import PineconeService
+from src.services.pubmed_cache import PubMedResponseCache, split_medline
+from src.services.article_hydrator import ArticleHydrator
+from src.db.db_utils import get_articles_by_pmids, get_dedup_signatures
+from src.utils.dedup import Deduplicator, MinHasher
+from src.config.settings import settings
+from src.utils.cache import AsyncResultCache
+from src.utils.batching import MicroBatcher
+from src.utils.rate_limit import RateLimiter
+from src.utils.memory import cache_registry
+from src.utils.tracing import span, traced
+
+# MeSH scope for HR and I-O psychology research
+HR_MESH_FILTER = "(industrial psychology[MeSH] OR organizational behavior[MeSH] OR personnel management[MeSH])"
+
+# PMIDs per efetch request; NCBI recommends POST above ~200
+EFETCH_BATCH_SIZE = 200
 
 class PubMedService:
-    def __init__(self, email: str, api_key: str, pinecone_service: PineconeService, embedding_model: str = 'sentence-transformers/all-mpnet-base-v2'):
+    def __init__(self, email: str, api_key: str, pinecone_service: PineconeService, embedding_model: str = 'sentence-transformers/all-mpnet-base-v2',
+                 response_cache: Optional[PubMedResponseCache] = None, article_hydrator: Optional[ArticleHydrator] = None,
+                 deduplicator: Optional[Deduplicator] = None, entrez_limiter: Optional[RateLimiter] = None):
         """Initialize PubMed service"""
         self.email = email
         Entrez.email = email
         Entrez.api_key = api_key
         self.model = SentenceTransformer(embedding_model)
         self.pinecone_service = pinecone_service
+        if response_cache is None and settings.PUBMED_CACHE_PATH:
+            response_cache = PubMedResponseCache(
+                settings.PUBMED_CACHE_PATH,
+                search_ttl=settings.PUBMED_SEARCH_CACHE_TTL,
+                record_ttl=settings.PUBMED_RECORD_CACHE_TTL
+            )
+        self.response_cache = response_cache
+        # One request budget for every Entrez call this worker makes
+        self.entrez_limiter = entrez_limiter or RateLimiter(settings.NCBI_REQUESTS_PER_SECOND)
+        # Query embeddings requested concurrently share one model call
+        self.query_embedder = MicroBatcher(self.embed_texts, max_batch=settings.EMBEDDING_BATCH_SIZE)
+
+        # Vector search results keyed by (query, top_k); saves the query embedding and the Pinecone round trip
+        self.similar_cache = AsyncResultCache(
+            maxsize=settings.SIMILAR_CACHE_SIZE,
+            ttl=settings.SIMILAR_CACHE_TTL
+        )
+        cache_registry.register_mapping("similar_articles", self.similar_cache.cache, priority=15)
+
+        # Display fields for vector matches, loaded from Postgres
+        self.article_hydrator = article_hydrator or ArticleHydrator(
+            get_articles_by_pmids,
+            maxsize=settings.ARTICLE_ROW_CACHE_SIZE,
+            ttl=settings.ARTICLE_ROW_CACHE_TTL
+        )
+        cache_registry.register_mapping("article_rows", self.article_hydrator.rows, priority=20)
+
+        # Near-duplicates (reprints, errata, re-posted abstracts) are stored but not embedded
+        self.deduplicator = deduplicator or Deduplicator(get_dedup_signatures)
     
     def parse_pubmed_article(self, medline_record: str) -> Dict:
         """Parse PubMed article data from Medline format"""
-        record = Medline.parse(medline_record)
-        article_data = next(record)
-        
+        return self.parse_medline_records(medline_record)[0]
+
+    def parse_medline_records(self, medline_text: str) -> List[Dict]:
+        """Parse every article in a Medline-format efetch response"""
+        return [self._article_from_record(record) for record in Medline.parse(io.StringIO(medline_text))]
+
+    def _article_from_record(self, article_data) -> Dict:
         return {
             'pmid': article_data.get('PMID', ''),
             'title': article_data.get('TI', ''),
@@ -31,84 +86,256 @@ class PubMedService:
             'raw_data': str(article_data)
         }
     
+    @staticmethod
+    def parse_publication_date(value: str) -> Optional[datetime]:
+        """Parse a Medline DP field such as '2021 Mar 4', '2021 Mar' or '2021'"""
+        parts = (value or "").split()
+        for fmt, count in (("%Y %b %d", 3), ("%Y %b", 2), ("%Y", 1)):
+            try:
+                return datetime.strptime(" ".join(parts[:count]), fmt)
+            except ValueError:
+                continue
+        return None
+
+    def article_record(self, article_data: Dict) -> Dict:
+        """Column values for a PubMedArticle row"""
+        return {
+            'pmid': article_data['pmid'],
+            'title': article_data['title'],
+            'abstract': article_data['abstract'],
+            'authors': article_data['authors'],
+            'publication_date': self.parse_publication_date(article_data['publication_date']),
+            'journal': article_data['journal'],
+            'keywords': article_data['keywords'],
+            'raw_data': article_data['raw_data'],
+            'dedup_signature': MinHasher.encode(self.deduplicator.signature(article_data))
+        }
+
+    def vector_metadata(self, article_data: Dict) -> Dict:
+        """Metadata stored alongside an article's embedding: the PMID and filterable fields.
+
+        Display fields stay in Postgres and are hydrated at query time.
+        """
+        metadata = {
+            'pmid': article_data['pmid'],
+            'journal': article_data['journal'],
+            'keywords': article_data['keywords']
+        }
+        published = self.parse_publication_date(article_data['publication_date'])
+        # Pinecone rejects null metadata values
+        if published:
+            metadata['publication_year'] = published.year
+        return metadata
+
+    @traced("embedding.encode", size=len)
+    def embed_texts(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        """Embed many texts in one batched model call"""
+        embeddings = self.model.encode(texts, batch_size=batch_size)
+        return [embedding.tolist() for embedding in embeddings]
+
+    def embedding_text(self, article_data: Dict) -> str:
+        return f"{article_data['title']} {article_data['abstract']}"
+
+    def esearch_history(self, term: str, mindate: Optional[str] = None, maxdate: Optional[str] = None,
+                        datetype: str = "edat", webenv: Optional[str] = None) -> Tuple[int, str, str]:
+        """Run a search on the Entrez history server; returns (count, webenv, query_key).
+
+        Passing ``webenv`` adds the search to an existing history session, so
+        ``term`` can combine its earlier results, e.g. ``#1 OR #2``.
+        """
+        kwargs = {}
+        if mindate or maxdate:
+            # Entrez needs both ends of a date range
+            kwargs = {"datetype": datetype, "mindate": mindate or "1800/01/01", "maxdate": maxdate or "3000/12/31"}
+        handle = Entrez.esearch(db="pubmed", term=term, usehistory="y", retmax=0, webenv=webenv, **kwargs)
+        results = Entrez.read(handle)
+        handle.close()
+        return int(results["Count"]), results["WebEnv"], results["QueryKey"]
+
+    def efetch_history(self, webenv: str, query_key: str, retstart: int, retmax: int) -> str:
+        """Fetch one page of Medline records from a history-server search"""
+        handle = Entrez.efetch(db="pubmed", webenv=webenv, query_key=query_key,
+                               retstart=retstart, retmax=retmax, rettype="medline", retmode="text")
+        try:
+            return handle.read()
+        finally:
+            handle.close()
+
     def create_citation(self, article_data: Dict) -> str:
         """Create a citation string from article data"""
         return f"{article_data['authors']} ({article_data['publication_date']}). {article_data['title']}. {article_data['journal']}"
     
-    async def store_pubmed_data(self, articles_data: List[Dict], session: Session) -> List[PubMedArticle]:
-        """Store PubMed articles in the database and their embeddings in Pinecone"""
+    async def store_pubmed_data(self, articles_data: List[Dict], session: Session,
+                                namespace: Optional[str] = None) -> List[PubMedArticle]:
+        """Store PubMed articles in the database and their embeddings in Pinecone (in ``namespace`` if given)"""
         stored_articles = []
+        # Articles that get a vector, i.e. all but near-duplicates
+        embedded = []
+        # Canonical articles of this call; they join the shared index only once committed
+        pending = Deduplicator(lambda: (), hasher=self.deduplicator.hasher, threshold=self.deduplicator.threshold,
+                               bands=self.deduplicator.index.bands)
+        if settings.DEDUP_ENABLED:
+            await asyncio.to_thread(self.deduplicator.ensure_loaded)
         
         for article_data in articles_data:
+            signature = self.deduplicator.signature(article_data)
             # Create article record
             article = PubMedArticle(
                 pmid=article_data['pmid'],
                 title=article_data['title'],
                 abstract=article_data['abstract'],
                 authors=article_data['authors'],
-                publication_date=datetime.strptime(article_data['publication_date'], '%Y %b') if article_data['publication_date'] else None,
+                publication_date=self.parse_publication_date(article_data['publication_date']),
                 journal=article_data['journal'],
                 keywords=article_data['keywords'],
-                raw_data=article_data['raw_data']
+                raw_data=article_data['raw_data'],
+                dedup_signature=MinHasher.encode(signature)
             )
             
-            # Generate embedding for title + abstract
-            text_for_embedding = f"{article_data['title']} {article_data['abstract']}"
-            embedding = self.model.encode(text_for_embedding)
-            
-            # Store in Pinecone
-            metadata = {
-                'title': article_data['title'],
-                'abstract': article_data['abstract'],
-                'authors': article_data['authors'],
-                'journal': article_data['journal'],
-                'publication_date': article_data['publication_date'],
-                'keywords': article_data['keywords']
-            }
-            self.pinecone_service.store_embeddings(
-                article_id=article_data['pmid'],
-                embedding=embedding.tolist(),
-                metadata=metadata
-            )
+            # A near-duplicate points at the article it repeats and gets no vector of its own
+            if settings.DEDUP_ENABLED:
+                article.duplicate_of = (self.deduplicator.find(signature, article_data['pmid'])
+                                        or pending.find(signature, article_data['pmid']))
+                if article.duplicate_of:
+                    session.add(article)
+                    stored_articles.append(article)
+                    continue
+                pending.add(article_data['pmid'], signature)
             
+            embedded.append(article_data)
             session.add(article)
             stored_articles.append(article)
         
+        # Embed title + abstract of every new article in one batched model call, off the event loop
+        if embedded:
+            embeddings = await asyncio.to_thread(
+                self.embed_texts, [self.embedding_text(article_data) for article_data in embedded]
+            )
+            vectors = [
+                {"id": article_data['pmid'], "values": embedding, "metadata": self.vector_metadata(article_data)}
+                for article_data, embedding in zip(embedded, embeddings)
+            ]
+            # Store in Pinecone, in parallel chunks rather than one request per article; the
+            # retries sleep between attempts, so this runs in a worker thread too
+            await asyncio.to_thread(self.pinecone_service.upsert_embeddings, vectors, namespace=namespace)
+        
         session.commit()
+        for pmid, signature in pending.index.signatures.items():
+            self.deduplicator.add(pmid, signature)
+        # New vectors may change any cached ranking, and re-stored rows any cached display fields
+        self.similar_cache.invalidate()
+        self.article_hydrator.invalidate(article.pmid for article in stored_articles)
         return stored_articles
     
-    async def fetch_pubmed_data(self, query: str, max_results: int = 5) -> List[Dict]:
-        """Fetch research papers from PubMed based on the query"""
+    def _esearch_ids(self, query: str, max_results: int) -> List[str]:
+        handle = Entrez.esearch(db="pubmed", term=query, retmax=max_results)
+        results = Entrez.read(handle)
+        handle.close()
+        return [str(pmid) for pmid in results["IdList"]]
+
+    def _efetch_medline(self, pmids: List[str]) -> str:
+        handle = Entrez.efetch(db="pubmed", id=",".join(pmids), rettype="medline", retmode="text")
         try:
-            # Search PubMed
-            handle = Entrez.esearch(db="pubmed", term=query, retmax=max_results)
-            results = Entrez.read(handle)
+            return handle.read()
+        finally:
             handle.close()
 
-            # Fetch details for each paper
-            papers = []
-            for id in results["IdList"]:
-                handle = Entrez.efetch(db="pubmed", id=id, rettype="medline", retmode="text")
-                papers.append(handle.read())
-                handle.close()
-            
-            # Parse papers
-            parsed_papers = [self.parse_pubmed_article(paper) for paper in papers]
-            return parsed_papers
+    async def _search_ids(self, query: str, max_results: int) -> List[str]:
+        """PMIDs matching ``query``, from the response cache or esearch"""
+        pmids = self.response_cache.get_search(query, max_results) if self.response_cache else None
+        if pmids is None:
+            with span("pubmed.esearch") as stage:
+                await self.entrez_limiter.wait()
+                start = time.perf_counter()
+                pmids = await asyncio.to_thread(self._esearch_ids, query, max_results)
+                stage.set_size(len(pmids))
+            if self.response_cache:
+                self.response_cache.search_stats.record_backend(time.perf_counter() - start)
+                self.response_cache.put_search(query, max_results, pmids)
+        return pmids
+
+    async def _fetch_records(self, pmids: List[str]) -> Dict[str, str]:
+        """Medline records by PMID: cached ones, plus the rest fetched in chunks of EFETCH_BATCH_SIZE"""
+        records = self.response_cache.get_records(pmids) if self.response_cache else {}
+        missing = [pmid for pmid in dict.fromkeys(pmids) if pmid not in records]
+        chunks = [missing[i:i + EFETCH_BATCH_SIZE] for i in range(0, len(missing), EFETCH_BATCH_SIZE)]
+        for fetched in await asyncio.gather(*(self._efetch_records(chunk) for chunk in chunks)):
+            records.update(fetched)
+        return records
+
+    async def _efetch_records(self, pmids: List[str]) -> Dict[str, str]:
+        with span("pubmed.efetch") as stage:
+            await self.entrez_limiter.wait()
+            start = time.perf_counter()
+            medline = await asyncio.to_thread(self._efetch_medline, pmids)
+            stage.set_size(len(medline))
+        fetched = split_medline(medline)
+        if self.response_cache:
+            self.response_cache.record_stats.record_backend(time.perf_counter() - start)
+            self.response_cache.put_records(fetched)
+        return fetched
+
+    async def fetch_pubmed_data(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Fetch research papers from PubMed based on the query"""
+        try:
+            pmids = await self._search_ids(query, max_results)
+            # Serve cached records and fetch the rest
+            records = await self._fetch_records(pmids)
+            # Parse papers in search order
+            return self.parse_medline_records("\n".join(records[pmid] for pmid in pmids if pmid in records))
             
         except Exception as e:
             print(f"Error fetching PubMed data: {e}")
             return []
+
+    async def fetch_pubmed_batch(self, queries: List[str], max_results: int = 5) -> Dict[str, List[Dict]]:
+        """Fetch research papers for many queries; returns each query's papers in search order.
+
+        The searches run concurrently within the NCBI request rate. PMIDs
+        found by several queries are fetched and parsed once, so the returned
+        lists share article dicts. A query whose search fails gets no papers.
+        """
+        queries = list(dict.fromkeys(queries))
+        id_lists = await asyncio.gather(*(self._search_ids(query, max_results) for query in queries),
+                                        return_exceptions=True)
+        for query, pmids in zip(queries, id_lists):
+            if isinstance(pmids, Exception):
+                print(f"Error searching PubMed for {query!r}: {pmids}")
+        id_lists = [[] if isinstance(pmids, Exception) else pmids for pmids in id_lists]
+        
+        try:
+            records = await self._fetch_records([pmid for pmids in id_lists for pmid in pmids])
+        except Exception as e:
+            print(f"Error fetching PubMed data: {e}")
+            return {query: [] for query in queries}
+        
+        articles = {article['pmid']: article for article in self.parse_medline_records("\n".join(records.values()))}
+        return {query: [articles[pmid] for pmid in pmids if pmid in articles] for query, pmids in zip(queries, id_lists)}
     
-    async def search_similar_articles(self, query: str, top_k: int = 3) -> List[Dict]:
-        """Search for similar articles using vector similarity"""
-        # Generate embedding for the query
-        query_embedding = self.model.encode(query)
+    async def search_similar_articles(self, query: str, top_k: int = 3, namespace: Optional[str] = None,
+                                      filter: Optional[Dict] = None) -> List[Dict]:
+        """Search for similar articles using vector similarity, sharing cached and in-flight results.
+
+        ``namespace`` limits the search to one partition of the index, and
+        ``filter`` to vectors whose metadata matches it.
+        """
+        key = (" ".join(query.split()).lower(), top_k, namespace, json.dumps(filter, sort_keys=True) if filter else None)
+        return await self.similar_cache.get_or_load(
+            key, lambda: self._search_similar_articles(query, top_k, namespace, filter)
+        )
+
+    async def _search_similar_articles(self, query: str, top_k: int, namespace: Optional[str],
+                                       filter: Optional[Dict] = None) -> List[Dict]:
+        # Generate embedding for the query, batched with any other queries in flight
+        query_embedding = await self.query_embedder.submit(query)
         
         # Search in Pinecone
-        similar_articles = self.pinecone_service.search_similar(
-            query_embedding=query_embedding.tolist(),
-            top_k=top_k
+        similar_articles = await asyncio.to_thread(
+            self.pinecone_service.search_similar,
+            query_embedding=query_embedding,
+            top_k=top_k,
+            filter=filter,
+            namespace=namespace
         )
         
-        return [match.metadata for match in similar_articles] 
\ No newline at end of file
+        return await self.article_hydrator.hydrate(similar_articles) 
\ No newline at end of file
@@ -0,0 +1,127 @@
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, Iterable, List
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
+
+# Azure Cognitive Search accepts at most 1000 documents / 16 MB per indexing request
+MAX_BATCH_DOCUMENTS = 1000
+MAX_BATCH_BYTES = 16 * 1024 * 1024
+
+# Per-document status codes worth retrying (throttling, conflicts, transient service errors)
+RETRIABLE_STATUS_CODES = {409, 422, 429, 500, 502, 503, 504}
+
+
+class IndexingReport:
+    """Outcome of a bulk indexing run"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.succeeded = 0
+        self.failed: Dict[str, str] = {}
+        self.batches = 0
+        self.retries = 0
+        self.seconds = 0.0
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.succeeded / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": len(self.failed),
+            "failed_keys": dict(self.failed),
+            "batches": self.batches,
+            "retries": self.retries,
+            "seconds": self.seconds,
+            "documents_per_second": self.documents_per_second,
+        }
+
+
+class BulkSearchIndexer:
+    """Uploads documents to a search index in bounded batches with bounded parallelism.
+
+    Batches are cut at ``max_batch_documents`` documents or ``max_batch_bytes``
+    of serialized JSON, whichever comes first, and up to ``max_concurrency``
+    batches are in flight. On partial failure only the failed keys with a
+    retriable status are re-sent, with exponential backoff.
+    """
+
+    def __init__(self, search_client, key_field: str = "id", max_batch_documents: int = MAX_BATCH_DOCUMENTS,
+                 max_batch_bytes: int = MAX_BATCH_BYTES, max_concurrency: int = 4,
+                 max_retries: int = 3, retry_backoff: float = 0.5):
+        self.search_client = search_client
+        self.key_field = key_field
+        self.max_batch_documents = min(max_batch_documents, MAX_BATCH_DOCUMENTS)
+        self.max_batch_bytes = min(max_batch_bytes, MAX_BATCH_BYTES)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def batches(self, documents: Iterable[Dict]) -> Iterable[List[Dict]]:
+        """Split documents into batches bounded by count and serialized size"""
+        batch, batch_bytes = [], 0
+        for document in documents:
+            size = len(json.dumps(document, default=str).encode("utf-8"))
+            if batch and (len(batch) >= self.max_batch_documents or batch_bytes + size > self.max_batch_bytes):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(document)
+            batch_bytes += size
+        if batch:
+            yield batch
+
+    async def index(self, documents: Iterable[Dict]) -> IndexingReport:
+        """Upload all documents and report throughput and any keys that still failed"""
+        documents = list(documents)
+        report = IndexingReport(total=len(documents))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        start = time.perf_counter()
+
+        async def run(batch):
+            async with semaphore:
+                await self._upload_batch(batch, report)
+
+        await asyncio.gather(*[run(batch) for batch in self.batches(documents)])
+        report.seconds = time.perf_counter() - start
+        return report
+
+    async def _upload_batch(self, batch: List[Dict], report: IndexingReport) -> None:
+        pending = {str(document[self.key_field]): document for document in batch}
+        error = "retries exhausted"
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                report.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            report.batches += 1
+
+            try:
+                results = await self.search_client.upload_documents(documents=list(pending.values()))
+            except (HttpResponseError, ServiceRequestError) as e:
+                error = str(e)
+                status = getattr(e, "status_code", None)
+                if status is not None and status not in RETRIABLE_STATUS_CODES:
+                    break
+                logging.warning(f"Search indexing batch failed (attempt {attempt + 1}): {e}")
+                continue
+
+            # Keys the service did not report on are re-sent along with retriable failures
+            retry = dict(pending)
+            for result in results:
+                if result.succeeded:
+                    report.succeeded += 1
+                    retry.pop(result.key, None)
+                elif result.status_code in RETRIABLE_STATUS_CODES:
+                    error = result.error_message or f"status {result.status_code}"
+                else:
+                    report.failed[result.key] = result.error_message or f"status {result.status_code}"
+                    retry.pop(result.key, None)
+            pending = retry
+            if not pending:
+                return
+
+        for key in pending:
+            report.failed[key] = error
@@ -0,0 +1,147 @@
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Pinecone accepts at most 1000 vectors / 2 MB per upsert and 1000 IDs per delete
+MAX_UPSERT_VECTORS = 1000
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+MAX_DELETE_IDS = 1000
+
+# Throttling and transient server errors; a request without a status (connection error) is also retried
+RETRIABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class VectorWriteError(Exception):
+    """Raised when some vectors could not be written after every retry"""
+
+    def __init__(self, report: "VectorWriteReport"):
+        super().__init__(f"{len(report.failed)} of {report.total} vectors failed")
+        self.report = report
+
+
+class VectorWriteReport:
+    """Outcome of a bulk upsert or delete"""
+
+    def __init__(self, total: int, namespace: Optional[str] = None):
+        self.total = total
+        self.namespace = namespace
+        self.succeeded = 0
+        self.failed: Dict[str, str] = {}
+        self.requests = 0
+        self.retries = 0
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def vectors_per_second(self) -> float:
+        return self.succeeded / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "namespace": self.namespace,
+            "succeeded": self.succeeded,
+            "failed": len(self.failed),
+            "failed_ids": dict(self.failed),
+            "requests": self.requests,
+            "retries": self.retries,
+            "seconds": self.seconds,
+            "vectors_per_second": self.vectors_per_second,
+        }
+
+
+class BulkVectorWriter:
+    """Upserts and deletes vectors in bounded chunks with bounded parallelism.
+
+    Upserts are cut at ``max_batch_vectors`` vectors or ``max_batch_bytes`` of
+    serialized JSON, deletes at ``max_delete_ids`` IDs. Up to
+    ``max_concurrency`` chunks are sent at once from a thread pool, since the
+    Pinecone client blocks. A failed chunk is re-sent whole with exponential
+    backoff; IDs of chunks that still fail are reported, not raised.
+    """
+
+    def __init__(self, index, max_batch_vectors: int = 100, max_batch_bytes: int = MAX_REQUEST_BYTES,
+                 max_delete_ids: int = MAX_DELETE_IDS, max_concurrency: int = 4, max_retries: int = 3,
+                 retry_backoff: float = 0.5, sleep: Callable[[float], None] = time.sleep):
+        self.index = index
+        self.max_batch_vectors = min(max_batch_vectors, MAX_UPSERT_VECTORS)
+        self.max_batch_bytes = min(max_batch_bytes, MAX_REQUEST_BYTES)
+        self.max_delete_ids = min(max_delete_ids, MAX_DELETE_IDS)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.sleep = sleep
+
+    def chunks(self, vectors: Iterable[Dict], max_vectors: Optional[int] = None) -> Iterable[List[Dict]]:
+        """Split vectors into chunks bounded by count and serialized size"""
+        max_vectors = min(max_vectors or self.max_batch_vectors, MAX_UPSERT_VECTORS)
+        chunk, chunk_bytes = [], 0
+        for vector in vectors:
+            size = len(json.dumps(vector, default=str).encode("utf-8"))
+            if chunk and (len(chunk) >= max_vectors or chunk_bytes + size > self.max_batch_bytes):
+                yield chunk
+                chunk, chunk_bytes = [], 0
+            chunk.append(vector)
+            chunk_bytes += size
+        if chunk:
+            yield chunk
+
+    def upsert(self, vectors: Iterable[Dict], namespace: Optional[str] = None,
+               batch_size: Optional[int] = None) -> VectorWriteReport:
+        """Upsert {"id", "values", "metadata"} vectors into ``namespace`` (the default namespace if None)"""
+        vectors = list(vectors)
+        kwargs = {"namespace": namespace} if namespace else {}
+        requests = [
+            ([str(v["id"]) for v in chunk], lambda chunk=chunk: self.index.upsert(vectors=chunk, **kwargs))
+            for chunk in self.chunks(vectors, batch_size)
+        ]
+        return self._run(requests, VectorWriteReport(len(vectors), namespace))
+
+    def delete(self, ids: Iterable[str], namespace: Optional[str] = None) -> VectorWriteReport:
+        """Delete vectors by ID from ``namespace``"""
+        ids = [str(i) for i in ids]
+        kwargs = {"namespace": namespace} if namespace else {}
+        requests = [
+            (chunk, lambda chunk=chunk: self.index.delete(ids=chunk, **kwargs))
+            for chunk in (ids[start:start + self.max_delete_ids] for start in range(0, len(ids), self.max_delete_ids))
+        ]
+        return self._run(requests, VectorWriteReport(len(ids), namespace))
+
+    def _run(self, requests: List, report: VectorWriteReport) -> VectorWriteReport:
+        start = time.perf_counter()
+        if len(requests) == 1:
+            self._send(*requests[0], report)
+        elif requests:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(requests))) as pool:
+                for future in [pool.submit(self._send, ids, send, report) for ids, send in requests]:
+                    future.result()
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _send(self, ids: List[str], send: Callable[[], object], report: VectorWriteReport) -> None:
+        error = "retries exhausted"
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with report.lock:
+                    report.retries += 1
+                self.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            with report.lock:
+                report.requests += 1
+            try:
+                send()
+            except Exception as e:
+                error = str(e)
+                status = getattr(e, "status", None)
+                if status is not None and status not in RETRIABLE_STATUS_CODES:
+                    break
+                logging.warning(f"Pinecone request for {len(ids)} vectors failed (attempt {attempt + 1}): {e}")
+                continue
+            with report.lock:
+                report.succeeded += len(ids)
+            return
+
+        with report.lock:
+            report.failed.update((i, error) for i in ids)
@@ -1,13 +1,12 @@
-from langchain_core.tools import tool
+from typing import Optional
 from src.services.bing_service import BingGroundingService
 
-@tool
 class BingGroundingTool:
     name = "bing_grounding"
     description = "Searches and grounds information using Bing Search and Azure Cognitive Search."
 
-    def __init__(self):
-        self.service = BingGroundingService()
+    def __init__(self, service: Optional[BingGroundingService] = None):
+        self.service = service or BingGroundingService()
 
     async def run(self, query: str, top_k: int = 5):
         """Execute the grounding search"""
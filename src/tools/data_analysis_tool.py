@@ -1,67 +1,122 @@
-from langchain_core.tools import tool
+import os
+import asyncio
+import tempfile
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from typing import Dict, List, Optional
-import json
-from azure.storage.blob import BlobServiceClient
 from src.config.settings import settings
+from src.services.blob_service import BlobStorageService
+from src.utils.dataset_cache import DatasetCache
+from src.utils.streaming_stats import analyze_batches
+from src.utils.graph_rendering import render_graph
+from src.services.duckdb_engine import DuckDBQueryEngine
 
-@tool
 class DataAnalysisTool:
     name = "data_analysis"
     description = "Analyzes datasets and generates visualizations based on user requests."
 
     def __init__(self):
-        self.blob_service_client = BlobServiceClient.from_connection_string(
-            settings.AZURE_STORAGE_CONNECTION_STRING
-        )
-        self.container_client = self.blob_service_client.get_container_client(
-            settings.AZURE_STORAGE_CONTAINER
+        self.blob_storage = BlobStorageService()
+        self.dataset_cache = DatasetCache(
+            settings.DATASET_CACHE_DIR,
+            settings.DATASET_CACHE_MAX_BYTES
         )
+        self.query_engine = None
+        if settings.DATA_ANALYSIS_ENGINE == "duckdb" and DuckDBQueryEngine.available():
+            self.query_engine = DuckDBQueryEngine(threads=settings.DUCKDB_THREADS)
+
+    async def load_table(self, blob_name: str) -> pa.Table:
+        """Load dataset as an Arrow table, served from the local cache when the blob is unchanged"""
+        etag = await self.blob_storage.get_etag(blob_name)
+
+        table = self.dataset_cache.get(blob_name, etag)
+        if table is not None:
+            return table
+
+        # Ranged parallel download into a spool file, then parse it block by block into the cache
+        spool = tempfile.NamedTemporaryFile(dir=self.dataset_cache.cache_dir, suffix=".download", delete=False)
+        try:
+            with spool:
+                await self.blob_storage.download_to_file(blob_name, spool, etag=etag)
+            await asyncio.to_thread(self._convert_to_cache, blob_name, etag, spool.name)
+        finally:
+            os.remove(spool.name)
+        return self.dataset_cache.get(blob_name, etag)
+
+    def _convert_to_cache(self, blob_name: str, etag: str, path: str) -> None:
+        """Parse a downloaded CSV/Parquet file into the Arrow dataset cache"""
+        if blob_name.lower().endswith(".parquet"):
+            parquet_file = pq.ParquetFile(path)
+            reader = pa.RecordBatchReader.from_batches(
+                parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=settings.STREAMING_CHUNK_ROWS)
+            )
+            self.dataset_cache.put_stream(blob_name, etag, reader)
+            return
+        try:
+            # Parse block by block straight into the cache file
+            self.dataset_cache.put_stream(blob_name, etag, pa_csv.open_csv(path))
+        except pa.ArrowInvalid:
+            # Types inferred from the first block did not hold for later rows; infer over the whole file
+            self.dataset_cache.put(blob_name, etag, pa_csv.read_csv(path))
+
+    async def get_schema(self, blob_name: str) -> Dict[str, str]:
+        """Column names and pandas dtypes of a dataset"""
+        table = await self.load_table(blob_name)
+        return table.schema.empty_table().to_pandas().dtypes.astype(str).to_dict()
 
-    def load_dataset(self, blob_name: str) -> pd.DataFrame:
+    async def load_dataset(self, blob_name: str) -> pd.DataFrame:
         """Load dataset from Azure Blob Storage"""
-        blob_client = self.container_client.get_blob_client(blob_name)
-        data = blob_client.download_blob().readall()
-        return pd.read_csv(data)
+        return (await self.load_table(blob_name)).to_pandas()
 
     def generate_graph(self, df: pd.DataFrame, graph_type: str, 
                       x_col: str, y_col: Optional[str] = None,
                       color_col: Optional[str] = None) -> Dict:
-        """Generate various types of graphs using Plotly"""
-        if graph_type == "line":
-            fig = px.line(df, x=x_col, y=y_col, color=color_col)
-        elif graph_type == "bar":
-            fig = px.bar(df, x=x_col, y=y_col, color=color_col)
-        elif graph_type == "scatter":
-            fig = px.scatter(df, x=x_col, y=y_col, color=color_col)
-        elif graph_type == "histogram":
-            fig = px.histogram(df, x=x_col, color=color_col)
-        elif graph_type == "box":
-            fig = px.box(df, x=x_col, y=y_col, color=color_col)
-        else:
-            raise ValueError(f"Unsupported graph type: {graph_type}")
-
-        return json.loads(fig.to_json())
+        """Generate various types of graphs as Plotly figure dicts, downsampled/aggregated server-side"""
+        return render_graph(
+            df, graph_type, x_col, y_col, color_col,
+            max_points=settings.GRAPH_MAX_POINTS,
+            bins=settings.GRAPH_BINS
+        )
 
     def analyze_data(self, df: pd.DataFrame) -> Dict:
         """Generate basic statistical analysis of the dataset"""
+        numeric = df.select_dtypes(include=['float64', 'int64'])
         return {
             "summary": df.describe().to_dict(),
             "missing_values": df.isnull().sum().to_dict(),
             "data_types": df.dtypes.astype(str).to_dict(),
-            "correlation": df.corr().to_dict() if df.select_dtypes(include=['float64', 'int64']).shape[1] > 1 else {}
+            "correlation": numeric.corr().to_dict() if numeric.shape[1] > 1 else {}
         }
 
+    def analyze_table_streaming(self, table: pa.Table) -> Dict:
+        """Same output as analyze_data, computed chunk by chunk with bounded memory"""
+        return analyze_batches(
+            table.schema,
+            table.to_batches(max_chunksize=settings.STREAMING_CHUNK_ROWS)
+        )
+
     async def run(self, blob_name: str, analysis_type: str, 
                  graph_params: Optional[Dict] = None) -> Dict:
         """Main execution method for data analysis"""
-        df = self.load_dataset(blob_name)
+        table = await self.load_table(blob_name)
+        
+        if self.query_engine is not None:
+            if analysis_type == "graph" and graph_params:
+                return self.query_engine.generate_graph(
+                    table, **graph_params,
+                    max_points=settings.GRAPH_MAX_POINTS,
+                    bins=settings.GRAPH_BINS
+                )
+            elif analysis_type == "analysis":
+                return self.query_engine.analyze_data(table)
         
         if analysis_type == "graph" and graph_params:
-            return self.generate_graph(df, **graph_params)
+            return self.generate_graph(table.to_pandas(), **graph_params)
         elif analysis_type == "analysis":
-            return self.analyze_data(df)
+            if table.nbytes > settings.STREAMING_ANALYSIS_THRESHOLD_BYTES:
+                return self.analyze_table_streaming(table)
+            return self.analyze_data(table.to_pandas())
         else:
             raise ValueError(f"Unsupported analysis type: {analysis_type}") 
\ No newline at end of file
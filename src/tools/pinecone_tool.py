@@ -1,18 +1,29 @@
-from langchain_core.tools import tool
+from typing import Dict, List, Optional
 from src.services.pinecone_service import PineconeService
+from src.services.pubmed_service import PubMedService
 from src.config.settings import settings
 
-@tool
 class PineconeTool:
     name = "pinecone_search"
     description = "Performs vector similarity search using Pinecone."
 
-    def __init__(self):
-        self.service = PineconeService(
-            api_key=settings.PINECONE_API_KEY,
-            environment=settings.PINECONE_ENVIRONMENT,
-            index_name=settings.PINECONE_INDEX_NAME
+    def __init__(self, pubmed_service: Optional[PubMedService] = None):
+        # Query embedding, result caching and hydration from Postgres live in PubMedService
+        self.pubmed_service = pubmed_service or PubMedService(
+            email=settings.ENTREZ_EMAIL,
+            api_key=settings.NCBI_API_KEY,
+            pinecone_service=PineconeService(
+                api_key=settings.PINECONE_API_KEY,
+                environment=settings.PINECONE_ENVIRONMENT,
+                index_name=settings.PINECONE_INDEX_NAME
+            ),
+            embedding_model=settings.EMBEDDING_MODEL
         )
+        self.service = self.pubmed_service.pinecone_service
 
     def run(self, embedding, top_k=3):
-        return self.service.search_similar(embedding, top_k=top_k) 
\ No newline at end of file
+        return self.service.search_similar(embedding, top_k=top_k)
+
+    async def similarity_search(self, query: str, k: int = 5, filter: Optional[Dict] = None) -> List[Dict]:
+        """Articles most similar to ``query``; concurrent searches share one embedding batch"""
+        return await self.pubmed_service.search_similar_articles(query, top_k=k, filter=filter)
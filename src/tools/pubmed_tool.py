@@ -1,14 +1,14 @@
-from langchain_core.tools import tool
+from typing import Dict, List, Optional
 from src.services.pubmed_service import PubMedService
 from src.config.settings import settings
 
-@tool
 class PubMedTool:
     name = "pubmed_search"
     description = "Searches PubMed for research articles."
 
-    def __init__(self):
-        self.service = PubMedService(
+    def __init__(self, service: Optional[PubMedService] = None):
+        # Pass the PineconeTool's service to share one embedding model between the tools
+        self.service = service or PubMedService(
             email=settings.ENTREZ_EMAIL,
             api_key=settings.NCBI_API_KEY,
             pinecone_service=None,  # Set if needed
@@ -16,4 +16,7 @@ class PubMedTool:
         )
 
     async def run(self, query: str):
-        return await self.service.fetch_pubmed_data(query) 
\ No newline at end of file
+        return await self.service.fetch_pubmed_data(query)
+
+    async def search_batch(self, queries: List[str]) -> Dict[str, List[Dict]]:
+        return await self.service.fetch_pubmed_batch(queries)
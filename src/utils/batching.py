@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Callable, List, Optional, Sequence
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into batched calls of ``process``.
+
+    Items submitted in the same event loop turn (or within ``max_wait``
+    seconds of the first) go to one ``process(items)`` call, run in a worker
+    thread. A batch is sent as soon as it reaches ``max_batch`` items. If the
+    call fails, every caller in the batch gets the error.
+    """
+
+    def __init__(self, process: Callable[[List[Any]], Sequence[Any]], max_batch: int = 64, max_wait: float = 0.0):
+        self.process = process
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.pending: List[Any] = []
+        self.futures: List[asyncio.Future] = []
+        self.flush_handle: Optional[asyncio.Handle] = None
+        self.batches = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append(item)
+        self.futures.append(future)
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.flush_handle is None:
+            if self.max_wait > 0:
+                self.flush_handle = loop.call_later(self.max_wait, self._flush)
+            else:
+                self.flush_handle = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        items, futures = self.pending, self.futures
+        self.pending, self.futures = [], []
+        if items:
+            self.batches += 1
+            asyncio.ensure_future(self._run(items, futures))
+
+    async def _run(self, items: List[Any], futures: List[asyncio.Future]) -> None:
+        try:
+            results = await asyncio.to_thread(self.process, items)
+            if len(results) != len(items):
+                raise ValueError(f"Batch of {len(items)} items returned {len(results)} results")
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
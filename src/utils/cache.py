@@ -0,0 +1,97 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from cachetools import TTLCache
+
+
+class CacheStats:
+    """Hit/miss counters and backend latency for a cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.backend_calls = 0
+        self.backend_errors = 0
+        self.backend_seconds = 0.0
+        self.backend_max_seconds = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+    def record_backend(self, seconds: float, error: bool = False) -> None:
+        self.backend_calls += 1
+        self.backend_errors += int(error)
+        self.backend_seconds += seconds
+        self.backend_max_seconds = max(self.backend_max_seconds, seconds)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": self.hit_ratio,
+            "backend_calls": self.backend_calls,
+            "backend_errors": self.backend_errors,
+            "backend_mean_seconds": self.backend_seconds / self.backend_calls if self.backend_calls else 0.0,
+            "backend_max_seconds": self.backend_max_seconds,
+        }
+
+
+class AsyncResultCache:
+    """TTL cache for async results with single-flight coalescing.
+
+    Concurrent ``get_or_load`` calls for the same key share one in-flight
+    backend call; its result is cached for ``ttl`` seconds. Failures are not
+    cached and propagate to every waiter.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = self.cache[key]
+        except KeyError:
+            pass
+        else:
+            self.stats.hits += 1
+            return value
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            self.stats.misses += 1
+            # The load runs as its own task so one caller going away doesn't cancel it for the others
+            task = asyncio.ensure_future(self._load(key, loader))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self.in_flight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        try:
+            value = await loader()
+        except Exception:
+            self.stats.record_backend(time.perf_counter() - start, error=True)
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+        self.stats.record_backend(time.perf_counter() - start)
+        self.cache[key] = value
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when ``key`` is None"""
+        if key is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(key, None)
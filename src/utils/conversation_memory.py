@@ -0,0 +1,126 @@
+import asyncio
+from typing import Callable, Dict, List, Optional
+from src.config.settings import settings
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency: token counts fall back to ~4 characters per token
+    tiktoken = None
+
+# Encodings are looked up once; None means the estimate is used
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            _encoding = tiktoken.get_encoding(settings.CONVERSATION_TOKEN_ENCODING) if tiktoken else None
+        except Exception as e:  # The encoding file is downloaded on first use
+            print(f"Error loading tokenizer, estimating token counts: {e}")
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in ``text``: exact with tiktoken, otherwise estimated from its length"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def truncate_tokens(text: str, limit: int) -> str:
+    """The longest prefix of ``text`` within ``limit`` tokens"""
+    if limit <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= limit else encoding.decode(tokens[:limit])
+    return text[:limit * 4]
+
+
+class ConversationMemory:
+    """One chat session's history under a fixed token ceiling.
+
+    Recent turns are kept verbatim. When they outgrow their share of
+    ``max_tokens``, the oldest are folded into a rolling summary by
+    ``summarize(summary, turns)`` until the recent turns are back under
+    half their share, so summarization runs every few turns rather than on
+    every one. The summary is capped at ``summary_tokens``. State is read
+    with ``load(session_id)`` and written with ``save(session_id, state)``,
+    so any worker can pick up a session.
+    """
+
+    def __init__(self, session_id: str, summarize: Callable[[str, List[Dict]], str],
+                 load: Callable[[str], Optional[Dict]], save: Callable[[str, Dict], None],
+                 max_tokens: Optional[int] = None, summary_tokens: Optional[int] = None,
+                 user_id: Optional[str] = None):
+        self.session_id = session_id
+        self.summarize = summarize
+        self.load_state = load
+        self.save_state = save
+        self.max_tokens = max_tokens or settings.CONVERSATION_MAX_TOKENS
+        self.summary_tokens = min(summary_tokens or settings.CONVERSATION_SUMMARY_TOKENS, self.max_tokens // 2)
+        self.user_id = user_id
+        self.summary = ""
+        self.turns: List[Dict] = []
+
+    @property
+    def recent_budget(self) -> int:
+        return self.max_tokens - self.summary_tokens
+
+    def tokens(self) -> int:
+        """Tokens the summary and recent turns add to a prompt"""
+        return count_tokens(self.summary) + sum(turn["tokens"] for turn in self.turns)
+
+    def messages(self) -> List[Dict]:
+        """Recent turns as chat messages, oldest first"""
+        return self.messages_of(self.turns)
+
+    async def load(self) -> None:
+        # The first lookup may download the encoding; keep it off the event loop
+        await asyncio.to_thread(_get_encoding)
+        state = await asyncio.to_thread(self.load_state, self.session_id) or {}
+        self.summary = state.get("summary") or ""
+        self.turns = list(state.get("turns") or [])
+
+    async def add_turn(self, user: str, assistant: str) -> None:
+        """Record an exchange, compact older turns if needed and save the session"""
+        share = self.recent_budget // 2
+        for role, content in (("user", user), ("assistant", assistant)):
+            # A single message larger than its share of the window is cut to fit
+            content = truncate_tokens(content, share)
+            self.turns.append({"role": role, "content": content, "tokens": count_tokens(content)})
+
+        if sum(turn["tokens"] for turn in self.turns) > self.recent_budget:
+            evicted = []
+            # Drop whole exchanges, oldest first, so roles keep alternating
+            while len(self.turns) > 2 and sum(turn["tokens"] for turn in self.turns) > self.recent_budget // 2:
+                evicted.extend(self.turns[:2])
+                self.turns = self.turns[2:]
+            if evicted:
+                await self._fold(evicted)
+
+        await asyncio.to_thread(self.save_state, self.session_id, {
+            "summary": self.summary,
+            "turns": self.turns,
+            "token_count": self.tokens(),
+            "user_id": self.user_id
+        })
+
+    async def _fold(self, turns: List[Dict]) -> None:
+        try:
+            summary = await asyncio.to_thread(self.summarize, self.summary, self.messages_of(turns))
+        except Exception as e:
+            # Keep the previous summary; the evicted turns are lost rather than overflowing the window
+            print(f"Error summarizing conversation {self.session_id}: {e}")
+            return
+        self.summary = truncate_tokens(summary or "", self.summary_tokens)
+
+    @staticmethod
+    def messages_of(turns: List[Dict]) -> List[Dict]:
+        return [{"role": turn["role"], "content": turn["content"]} for turn in turns]
@@ -0,0 +1,120 @@
+import os
+import hashlib
+import logging
+import threading
+import pyarrow as pa
+import pyarrow.feather as feather
+from typing import Optional
+
+
+class DatasetCache:
+    """Local cache of parsed datasets stored as uncompressed Arrow IPC files.
+
+    Entries are keyed by blob name + ETag, so a re-uploaded blob never serves a
+    stale table. Files are memory-mapped on read and evicted least-recently-used
+    first once the directory grows past ``max_bytes``.
+    """
+
+    SUFFIX = ".arrow"
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, blob_name: str, etag: str) -> str:
+        """Cache file path for a blob version"""
+        digest = hashlib.sha256(f"{blob_name}\0{etag}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + self.SUFFIX)
+
+    def get(self, blob_name: str, etag: str) -> Optional[pa.Table]:
+        """Return the memory-mapped table for a blob version, or None on a miss"""
+        path = self.path_for(blob_name, etag)
+        try:
+            source = pa.memory_map(path, "r")
+            table = pa.ipc.open_file(source).read_all()
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        # Bump mtime so eviction treats this entry as recently used
+        os.utime(path)
+        return table
+
+    @staticmethod
+    def _tmp_path(path: str) -> str:
+        # Unique per thread: concurrent cold loads of one blob convert in parallel worker threads
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def put(self, blob_name: str, etag: str, table: pa.Table) -> str:
+        """Write a table for a blob version and evict old entries if over budget"""
+        path = self.path_for(blob_name, etag)
+        tmp_path = self._tmp_path(path)
+        try:
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def put_stream(self, blob_name: str, etag: str, reader: pa.RecordBatchReader) -> str:
+        """Write record batches as they arrive, so large datasets never sit fully in memory"""
+        path = self.path_for(blob_name, etag)
+        tmp_path = self._tmp_path(path)
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def entries(self):
+        """(path, size, mtime) for every cache file, least recently used first"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size_bytes(self) -> int:
+        """Total size of the cache directory"""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, target_bytes: Optional[int] = None, keep: Optional[str] = None) -> int:
+        """Delete least recently used files until the cache fits ``target_bytes``.
+
+        Returns the number of bytes freed.
+        """
+        target_bytes = self.max_bytes if target_bytes is None else target_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for path, size, _ in entries:
+            if total <= target_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.error(f"Error evicting dataset cache entry {path}: {e}")
+                continue
+            total -= size
+            freed += size
+        return freed
+
+    def clear(self) -> int:
+        """Remove every cached dataset"""
+        return self.evict(target_bytes=0)
@@ -0,0 +1,186 @@
+import re
+import zlib
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from src.config.settings import settings
+
+# Universal hashing modulus; signatures keep the low 32 bits
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def article_text(article: Dict) -> str:
+    """Text an article is compared on: title and abstract"""
+    return f"{article.get('title') or ''} {article.get('abstract') or ''}"
+
+
+class MinHasher:
+    """MinHash signatures over word shingles.
+
+    The fraction of equal positions in two signatures estimates the Jaccard
+    similarity of the texts' shingle sets. Signatures are deterministic for a
+    given ``num_perm`` and ``seed``, so stored ones stay comparable.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(MERSENNE_PRIME), num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(MERSENNE_PRIME), num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if len(tokens) <= self.shingle_size:
+            return {" ".join(tokens)} if tokens else set()
+        return {" ".join(tokens[i:i + self.shingle_size]) for i in range(len(tokens) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """uint32 signature of ``text``, or None when it has no words to compare"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # (a * x + b) mod p per permutation; uint64 wraparound is part of the hash family
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(first == second))
+
+    @staticmethod
+    def encode(signature: Optional[np.ndarray]) -> Optional[bytes]:
+        return signature.astype("<u4").tobytes() if signature is not None else None
+
+    @staticmethod
+    def decode(data: Optional[bytes]) -> Optional[np.ndarray]:
+        return np.frombuffer(data, dtype="<u4").astype(np.uint32) if data else None
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing over MinHash signatures.
+
+    Signatures are cut into ``bands`` bands; two signatures become candidates
+    when any band matches exactly, and candidates are then checked against
+    the similarity threshold. With 16 bands of 8 rows, pairs above ~0.7
+    similarity almost always share a band.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self.signatures: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key: str, signature: np.ndarray) -> None:
+        if key in self.signatures:
+            return
+        self.signatures[key] = signature
+        for bucket, band in zip(self.buckets, self._band_keys(signature)):
+            bucket.setdefault(band, set()).add(key)
+
+    def candidates(self, signature: np.ndarray) -> Set[str]:
+        found = set()
+        for bucket, band in zip(self.buckets, self._band_keys(signature)):
+            found.update(bucket.get(band, ()))
+        return found
+
+    def query(self, signature: np.ndarray, threshold: float, exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Most similar indexed key at or above ``threshold``, with its similarity"""
+        best = None
+        for key in self.candidates(signature):
+            if key == exclude:
+                continue
+            similarity = MinHasher.similarity(signature, self.signatures[key])
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+class Deduplicator:
+    """Finds the article an incoming one near-duplicates, across everything stored.
+
+    The LSH index is filled once from the stored signatures of canonical
+    articles (``load_signatures`` yields (pmid, signature bytes)) and then
+    grows as new articles are added.
+    """
+
+    def __init__(self, load_signatures: Callable[[], Iterable[Tuple[str, bytes]]],
+                 hasher: Optional["MinHasher"] = None, threshold: Optional[float] = None,
+                 bands: Optional[int] = None):
+        self.load_signatures = load_signatures
+        self.hasher = hasher or minhasher
+        self.threshold = threshold if threshold is not None else settings.DEDUP_THRESHOLD
+        self.index = LSHIndex(self.hasher.num_perm, bands or settings.DEDUP_LSH_BANDS)
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def ensure_loaded(self) -> None:
+        """Index the stored signatures on first use; blocking, so call it off the event loop"""
+        with self.lock:
+            if self.loaded:
+                return
+            for pmid, data in self.load_signatures():
+                signature = self.hasher.decode(data)
+                if signature is not None and len(signature) == self.hasher.num_perm:
+                    self.index.add(pmid, signature)
+            self.loaded = True
+
+    def signature(self, article: Dict) -> Optional[np.ndarray]:
+        return self.hasher.signature(article_text(article))
+
+    def find(self, signature: Optional[np.ndarray], pmid: Optional[str] = None) -> Optional[str]:
+        """PMID of a stored article ``signature`` near-duplicates, other than ``pmid`` itself"""
+        if signature is None:
+            return None
+        match = self.index.query(signature, self.threshold, exclude=pmid)
+        return match[0] if match else None
+
+    def add(self, pmid: str, signature: Optional[np.ndarray]) -> None:
+        if signature is not None:
+            self.index.add(pmid, signature)
+
+
+def collapse_duplicates(articles: Sequence[Dict], exclude: Sequence[Dict] = (),
+                        threshold: Optional[float] = None) -> List[Dict]:
+    """Articles in rank order without repeats of an earlier one or of any in ``exclude``.
+
+    A repeat has the same PMID, is marked ``duplicate_of`` an article already
+    kept, or has near-identical title and abstract.
+    """
+    if not settings.DEDUP_ENABLED:
+        return list(articles)
+    threshold = threshold if threshold is not None else settings.DEDUP_THRESHOLD
+    index = LSHIndex(minhasher.num_perm, settings.DEDUP_LSH_BANDS)
+    seen: Set[str] = set()
+    kept = []
+    for position, article in enumerate(list(exclude) + list(articles)):
+        pmid = str(article.get("pmid") or f"#{position}")
+        if pmid in seen or article.get("duplicate_of") in seen:
+            continue
+        signature = minhasher.signature(article_text(article))
+        if signature is not None:
+            if index.query(signature, threshold):
+                continue
+            index.add(pmid, signature)
+        seen.add(pmid)
+        if position >= len(exclude):
+            kept.append(article)
+    return kept
+
+
+minhasher = MinHasher(settings.DEDUP_NUM_PERM)
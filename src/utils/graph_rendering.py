@@ -0,0 +1,286 @@
+import base64
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+# Plotly.js typed-array dtype codes
+TYPED_ARRAY_DTYPES = {
+    np.dtype("int8"): "i1", np.dtype("uint8"): "u1",
+    np.dtype("int16"): "i2", np.dtype("uint16"): "u2",
+    np.dtype("int32"): "i4", np.dtype("uint32"): "u4",
+    np.dtype("float32"): "f4", np.dtype("float64"): "f8",
+}
+
+BOX_STATS = ("q1", "median", "q3", "lowerfence", "upperfence", "mean")
+
+
+def typed_array(values) -> object:
+    """Encode an array in Plotly's base64 typed-array form (non-numeric data stays a list)"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return [str(v) for v in np.datetime_as_string(values, unit="auto")]
+    if values.dtype == np.int64:
+        values = values.astype(np.float64)
+    if values.dtype not in TYPED_ARRAY_DTYPES:
+        return values.tolist()
+    encoded = {
+        "dtype": TYPED_ARRAY_DTYPES[values.dtype],
+        "bdata": base64.b64encode(np.ascontiguousarray(values).tobytes()).decode("ascii"),
+    }
+    if values.ndim > 1:
+        encoded["shape"] = ",".join(str(d) for d in values.shape)
+    return encoded
+
+
+def _as_numeric(values: np.ndarray) -> Optional[np.ndarray]:
+    """float64 view of numeric/datetime data, None for anything else"""
+    if np.issubdtype(values.dtype, np.datetime64):
+        out = values.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+        # NaT casts to int64 min; keep it missing like NaN
+        out[np.isnat(values)] = np.nan
+        return out
+    if np.issubdtype(values.dtype, np.number) or values.dtype == bool:
+        return values.astype(np.float64)
+    return None
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` points preserving the line's shape"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        following_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        if bucket + 2 < len(edges):
+            avg_x = x[end:following_end].mean()
+            avg_y = y[end:following_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area)) if end > start else start
+        selected[bucket + 1] = previous
+    return selected
+
+
+def _bin_centers(edges: np.ndarray, dtype) -> np.ndarray:
+    centers = (edges[:-1] + edges[1:]) / 2
+    if np.issubdtype(dtype, np.datetime64):
+        return centers.astype(np.int64).astype("datetime64[ns]")
+    return centers
+
+
+def _groups(df: pd.DataFrame, color_col: Optional[str]):
+    if color_col is None:
+        yield None, df
+        return
+    for name, group in df.groupby(color_col, sort=False, dropna=False, observed=True):
+        yield name, group
+
+
+def _trace_name(name, color_col) -> Dict:
+    return {} if color_col is None else {"name": str(name), "legendgroup": str(name)}
+
+
+def line_traces(df, x_col, y_col, color_col, max_points: int) -> List[Dict]:
+    groups = list(_groups(df, color_col))
+    per_trace = max(3, max_points // len(groups))
+    traces = []
+    for name, group in groups:
+        group = group.sort_values(x_col, kind="stable")
+        x = group[x_col].to_numpy()
+        y = group[y_col].to_numpy()
+        x_numeric = _as_numeric(x)
+        y_numeric = _as_numeric(y)
+        if x_numeric is not None:
+            placed = ~np.isnan(x_numeric)
+            x, y, x_numeric = x[placed], y[placed], x_numeric[placed]
+            if y_numeric is not None:
+                y_numeric = y_numeric[placed]
+        if y_numeric is not None:
+            keep = lttb_indices(
+                x_numeric if x_numeric is not None else np.arange(len(x), dtype=np.float64),
+                np.nan_to_num(y_numeric), per_trace
+            )
+        else:
+            keep = np.unique(np.linspace(0, len(x) - 1, min(per_trace, len(x))).astype(np.int64))
+        traces.append({
+            "type": "scattergl", "mode": "lines",
+            "x": typed_array(x[keep]), "y": typed_array(y[keep]),
+            **_trace_name(name, color_col)
+        })
+    return traces
+
+
+def scatter_traces(df, x_col, y_col, color_col, max_points: int, bins: int) -> List[Dict]:
+    x = _as_numeric(df[x_col].to_numpy())
+    y = _as_numeric(df[y_col].to_numpy())
+    if len(df) <= max_points or x is None or y is None:
+        sampled = len(df) > max_points
+        if sampled:
+            # Non-numeric axes can't be binned: keep evenly spaced rows across the whole frame
+            df = df.iloc[np.unique(np.linspace(0, len(df) - 1, max_points).astype(np.int64))]
+        traces = []
+        for name, group in _groups(df, color_col):
+            trace = {
+                "type": "scattergl", "mode": "markers",
+                "x": typed_array(group[x_col].to_numpy()),
+                "y": typed_array(group[y_col].to_numpy()),
+                **_trace_name(name, color_col)
+            }
+            if sampled:
+                trace["meta"] = {"sampled": True}
+            traces.append(trace)
+        return traces
+
+    # Too dense to draw point by point: render a 2D count density instead
+    valid = ~(np.isnan(x) | np.isnan(y))
+    counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=bins)
+    return [density_trace(x_edges, y_edges, counts, df[x_col].dtype, df[y_col].dtype)]
+
+
+def density_trace(x_edges: np.ndarray, y_edges: np.ndarray, counts: np.ndarray,
+                  x_dtype=np.float64, y_dtype=np.float64) -> Dict:
+    """Heatmap trace from 2D bin counts indexed [x_bin, y_bin]"""
+    return {
+        "type": "heatmap",
+        "x": typed_array(_bin_centers(x_edges, x_dtype)),
+        "y": typed_array(_bin_centers(y_edges, y_dtype)),
+        "z": typed_array(np.asarray(counts).T.astype(np.float32)),
+        "colorscale": "Viridis",
+        "colorbar": {"title": {"text": "count"}},
+    }
+
+
+def histogram_traces(df, x_col, color_col, bins: int) -> List[Dict]:
+    x_all = _as_numeric(df[x_col].to_numpy())
+    traces = []
+    if x_all is None:
+        for name, group in _groups(df, color_col):
+            counts = group[x_col].value_counts(sort=False)
+            traces.append({
+                "type": "bar", "x": [str(v) for v in counts.index],
+                "y": typed_array(counts.to_numpy()), **_trace_name(name, color_col)
+            })
+        return traces
+
+    finite = x_all[~np.isnan(x_all)]
+    edges = np.histogram_bin_edges(finite, bins="auto") if finite.size else np.array([0.0, 1.0])
+    if len(edges) - 1 > bins:
+        edges = np.histogram_bin_edges(finite, bins=bins)
+    grouped_counts = []
+    for name, group in _groups(df, color_col):
+        values = _as_numeric(group[x_col].to_numpy())
+        counts, _ = np.histogram(values[~np.isnan(values)], bins=edges)
+        grouped_counts.append((name, counts))
+    return binned_bar_traces(edges, grouped_counts, df[x_col].dtype, color_col)
+
+
+def binned_bar_traces(edges: np.ndarray, grouped_counts, dtype, color_col: Optional[str]) -> List[Dict]:
+    """Histogram bars from shared bin edges and per-group ``(name, counts)``"""
+    centers = _bin_centers(edges, dtype)
+    # Plotly measures bar width on date axes in milliseconds
+    widths = np.diff(edges) / 1e6 if np.issubdtype(dtype, np.datetime64) else np.diff(edges)
+    return [{
+        "type": "bar", "x": typed_array(centers),
+        "y": typed_array(np.asarray(counts, dtype=np.float64)),
+        "width": typed_array(widths), **_trace_name(name, color_col)
+    } for name, counts in grouped_counts]
+
+
+def bar_traces(df, x_col, y_col, color_col) -> List[Dict]:
+    keys = [x_col] if color_col is None else [color_col, x_col]
+    if y_col is None:
+        aggregated = df.groupby(keys, sort=False, dropna=False, observed=True).size().rename("count")
+        y_col = "count"
+    else:
+        aggregated = df.groupby(keys, sort=False, dropna=False, observed=True)[y_col].sum()
+    aggregated = aggregated.reset_index()
+    traces = []
+    for name, group in _groups(aggregated, color_col):
+        traces.append({
+            "type": "bar", "x": typed_array(group[x_col].to_numpy()),
+            "y": typed_array(group[y_col].to_numpy()), **_trace_name(name, color_col)
+        })
+    return traces
+
+
+def box_traces(df, x_col, y_col, color_col) -> List[Dict]:
+    """Box plots from precomputed quartiles and whiskers (outlier points are not sent)"""
+    value_col = y_col if y_col is not None else x_col
+    category_col = x_col if y_col is not None else None
+    traces = []
+    for name, group in _groups(df, color_col):
+        if category_col is None:
+            categories = [(value_col, group[value_col])]
+        else:
+            categories = list(group.groupby(category_col, sort=False, dropna=False, observed=True)[value_col])
+        rows = []
+        for category, values in categories:
+            values = values.dropna().to_numpy(dtype=np.float64)
+            if values.size == 0:
+                continue
+            q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+            iqr = q3 - q1
+            rows.append({
+                "category": category, "q1": q1, "median": median, "q3": q3,
+                "lowerfence": values[values >= q1 - 1.5 * iqr].min(),
+                "upperfence": values[values <= q3 + 1.5 * iqr].max(),
+                "mean": values.mean(),
+            })
+        traces.append(box_trace(name, rows, color_col))
+    return traces
+
+
+def box_trace(name, rows: List[Dict], color_col: Optional[str]) -> Dict:
+    """Box trace from per-category dicts of category/q1/median/q3/lowerfence/upperfence/mean"""
+    trace = {"type": "box", **_trace_name(name, color_col)}
+    for key in BOX_STATS:
+        trace[key] = typed_array(np.array([row[key] for row in rows], dtype=np.float64))
+    trace["x"] = [str(row["category"]) for row in rows]
+    return trace
+
+
+def build_figure(traces: List[Dict], graph_type: str, x_col: str, y_col: Optional[str],
+                 color_col: Optional[str], rows: int) -> Dict:
+    """Wrap traces in a figure dict with axis titles and the source row count in ``layout.meta``"""
+    layout = {
+        "xaxis": {"title": {"text": x_col}},
+        "yaxis": {"title": {"text": y_col if y_col is not None else "count"}},
+        "meta": {"rows": rows, "graph_type": graph_type},
+    }
+    if color_col is not None:
+        layout["legend"] = {"title": {"text": color_col}}
+    if graph_type in ("bar", "histogram"):
+        layout["barmode"] = "stack" if graph_type == "bar" else "overlay"
+    if graph_type == "box":
+        layout["boxmode"] = "group"
+    return {"data": traces, "layout": layout}
+
+
+def render_graph(df: pd.DataFrame, graph_type: str, x_col: str, y_col: Optional[str] = None,
+                 color_col: Optional[str] = None, max_points: int = 5000, bins: int = 200) -> Dict:
+    """Build a Plotly figure dict whose size is bounded by ``max_points``/``bins``, not row count"""
+    if graph_type == "line":
+        traces = line_traces(df, x_col, y_col, color_col, max_points)
+    elif graph_type == "bar":
+        traces = bar_traces(df, x_col, y_col, color_col)
+    elif graph_type == "scatter":
+        traces = scatter_traces(df, x_col, y_col, color_col, max_points, bins)
+    elif graph_type == "histogram":
+        traces = histogram_traces(df, x_col, color_col, bins)
+    elif graph_type == "box":
+        traces = box_traces(df, x_col, y_col, color_col)
+    else:
+        raise ValueError(f"Unsupported graph type: {graph_type}")
+
+    return build_figure(traces, graph_type, x_col, y_col, color_col, len(df))
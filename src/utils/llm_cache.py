@@ -0,0 +1,291 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from cachetools import TTLCache
+from langchain_core.caches import BaseCache
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from src.config.settings import settings
+from src.utils.cache import CacheStats
+from src.utils.memory import cache_registry, mapping_size, shrink_mapping
+from src.utils.tracing import escape_label
+
+
+def normalize_messages(messages: Sequence[Any]) -> List[Tuple[str, str]]:
+    """(role, content) pairs with whitespace collapsed, from dicts, LangChain messages or (role, content) tuples"""
+    normalized = []
+    for message in messages:
+        if isinstance(message, dict):
+            role, content = message.get("role", message.get("type", "")), message.get("content", "")
+        elif isinstance(message, (tuple, list)):
+            role, content = message
+        else:
+            role, content = getattr(message, "type", ""), getattr(message, "content", "")
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, default=str)
+        normalized.append((str(role), " ".join(content.split())))
+    return normalized
+
+
+def completion_key(model: str, temperature: Optional[float], messages: Sequence[Any], **params) -> str:
+    """Cache key: model, temperature and a hash of the normalized messages plus any other sampling params"""
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": normalize_messages(messages), "params": params},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCompletionBackend:
+    """Per-process LRU of completions with a TTL"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # LangChain may look up from executor threads
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self.lock:
+            return self.cache.get(key)
+
+    def put(self, key: str, model: str, completion: str, latency: float) -> None:
+        with self.lock:
+            self.cache[key] = (completion, latency)
+
+    def size_bytes(self) -> int:
+        with self.lock:
+            return mapping_size(self.cache)
+
+    def evict(self, target_bytes: int) -> None:
+        with self.lock:
+            shrink_mapping(self.cache, target_bytes)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.cache.clear()
+
+
+class SQLiteCompletionBackend:
+    """Completions in a local SQLite file, shared by every worker on the host and kept across restarts"""
+
+    def __init__(self, path: str, ttl: float, clock: Callable[[], float] = time.time,
+                 purge_interval: float = 3600):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.purge_interval = purge_interval
+        self.lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                completion TEXT NOT NULL,
+                latency REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        # TTL is only checked on read, so expired rows are deleted here and periodically from put()
+        self.purge_expired()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT completion, latency FROM completions WHERE key = ? AND created_at > ?",
+                (key, self.clock() - self.ttl)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def put(self, key: str, model: str, completion: str, latency: float) -> None:
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO completions (key, model, completion, latency, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, model, completion, latency, self.clock())
+            )
+        if self.clock() >= self.next_purge:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete expired completions; returns rows removed"""
+        with self.lock:
+            now = self.clock()
+            self.next_purge = now + self.purge_interval
+            return self.connection.execute(
+                "DELETE FROM completions WHERE created_at <= ?", (now - self.ttl,)
+            ).rowcount
+
+    def clear(self) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM completions")
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class LLMCompletionCache:
+    """Completion cache shared by every LLM call site.
+
+    Only deterministic calls (temperature 0) are cached unless the caller opts
+    in; a sampled completion replayed from cache would hide the variety the
+    temperature asked for. Stats are kept per call site.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.stats: Dict[str, CacheStats] = {}
+        self.saved_seconds: Dict[str, float] = {}
+        self.bypassed: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def cacheable(self, temperature: Optional[float], opt_in: bool = False) -> bool:
+        return self.enabled and (opt_in or not temperature)
+
+    def _stats(self, site: str) -> CacheStats:
+        if site not in self.stats:
+            self.stats[site] = CacheStats()
+            self.saved_seconds[site] = 0.0
+            self.bypassed[site] = 0
+        return self.stats[site]
+
+    def lookup(self, site: str, key: str) -> Optional[str]:
+        """Cached completion for ``key``, counting the hit or miss against ``site``"""
+        stats = self._stats(site)
+        entry = self.backend.get(key)
+        if entry is None:
+            stats.misses += 1
+            return None
+        completion, latency = entry
+        stats.hits += 1
+        self.saved_seconds[site] += latency
+        return completion
+
+    def store(self, site: str, key: str, model: str, completion: str, latency: float) -> None:
+        self._stats(site).record_backend(latency)
+        self.backend.put(key, model, completion, latency)
+
+    def bypass(self, site: str) -> None:
+        self._stats(site)
+        self.bypassed[site] += 1
+
+    def call(self, site: str, model: str, temperature: Optional[float], messages: Sequence[Any],
+             complete: Callable[[], str], opt_in: bool = False, **params) -> str:
+        """Return the cached completion, or run ``complete()`` and cache its text"""
+        if not self.cacheable(temperature, opt_in):
+            if self.enabled:
+                self.bypass(site)
+            return complete()
+        key = completion_key(model, temperature, messages, **params)
+        completion = self.lookup(site, key)
+        if completion is not None:
+            return completion
+        start = time.perf_counter()
+        completion = complete()
+        self.store(site, key, model, completion, time.perf_counter() - start)
+        return completion
+
+    def langchain_cache(self, site: str, model: str, temperature: Optional[float], opt_in: bool = False):
+        """Value for a LangChain chat model's ``cache=``: an adapter, or False when calls must not be cached"""
+        if not self.cacheable(temperature, opt_in):
+            return False
+        return LangChainCompletionCache(self, site, model, temperature)
+
+    def render_prometheus(self, prefix: str = "research_chat") -> str:
+        """Per-site lookups and latency saved, as Prometheus counters"""
+        lines = [
+            f"# HELP {prefix}_llm_cache_requests_total LLM calls by call site and cache outcome.",
+            f"# TYPE {prefix}_llm_cache_requests_total counter",
+        ]
+        for site, stats in sorted(self.stats.items()):
+            for result, count in (("hit", stats.hits), ("miss", stats.misses), ("bypass", self.bypassed[site])):
+                lines.append(f'{prefix}_llm_cache_requests_total{{site="{escape_label(site)}",result="{result}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_llm_cache_saved_seconds_total Model latency avoided by cache hits.",
+            f"# TYPE {prefix}_llm_cache_saved_seconds_total counter",
+        ]
+        lines += [f'{prefix}_llm_cache_saved_seconds_total{{site="{escape_label(site)}"}} {seconds:.6f}'
+                  for site, seconds in sorted(self.saved_seconds.items())]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            site: {**stats.as_dict(), "bypassed": self.bypassed[site], "saved_seconds": self.saved_seconds[site]}
+            for site, stats in self.stats.items()
+        }
+
+
+class LangChainCompletionCache(BaseCache):
+    """Adapter letting a LangChain chat model read and write the shared completion cache"""
+
+    def __init__(self, cache: LLMCompletionCache, site: str, model: str, temperature: Optional[float]):
+        self.cache = cache
+        self.site = site
+        self.model = model
+        self.temperature = temperature
+        # Miss time per key, so the model latency of the update that follows can be recorded
+        self.pending: Dict[str, float] = {}
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        try:
+            messages = [entry["kwargs"] for entry in json.loads(prompt)]
+        except (ValueError, TypeError, KeyError):
+            messages = [("prompt", prompt)]
+        return completion_key(self.model, self.temperature, messages, llm=llm_string)
+
+    def lookup(self, prompt: str, llm_string: str):
+        key = self._key(prompt, llm_string)
+        completion = self.cache.lookup(self.site, key)
+        if completion is None:
+            self.pending[key] = time.perf_counter()
+            return None
+        return [ChatGeneration(message=AIMessage(content=completion))]
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        key = self._key(prompt, llm_string)
+        start = self.pending.pop(key, None)
+        # Only single plain-text completions are stored
+        if len(return_val) != 1 or not isinstance(return_val[0].text, str) or not return_val[0].text:
+            return
+        latency = time.perf_counter() - start if start is not None else 0.0
+        self.cache.store(self.site, key, self.model, return_val[0].text, latency)
+
+    async def alookup(self, prompt: str, llm_string: str):
+        # SQLite queries wait on disk and on a lock executor threads share; keep them off the event loop
+        if isinstance(self.cache.backend, SQLiteCompletionBackend):
+            return await asyncio.to_thread(self.lookup, prompt, llm_string)
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val) -> None:
+        if isinstance(self.cache.backend, SQLiteCompletionBackend):
+            await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+            return
+        self.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs) -> None:
+        self.cache.backend.clear()
+
+
+def build_backend():
+    """Backend named by LLM_CACHE_BACKEND, or None when caching is off"""
+    if settings.LLM_CACHE_BACKEND == "sqlite":
+        return SQLiteCompletionBackend(settings.LLM_CACHE_PATH, settings.LLM_CACHE_TTL)
+    if settings.LLM_CACHE_BACKEND == "memory":
+        backend = MemoryCompletionBackend(settings.LLM_CACHE_SIZE, settings.LLM_CACHE_TTL)
+        # Each entry replaces a multi-second model call, so completions are shed after search results
+        cache_registry.register("llm_completions", backend.size_bytes, backend.evict, priority=25)
+        return backend
+    return None
+
+
+llm_cache = LLMCompletionCache(build_backend())
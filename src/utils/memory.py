@@ -1,7 +1,19 @@
 import gc
-import torch
+import sys
+import time
+import asyncio
 import psutil
 import logging
+import threading
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, List, MutableMapping, Optional
+from src.config.settings import settings
+from src.utils.tracing import escape_label
+
+def _torch():
+    """torch if this process already loaded it; importing it just to check the GPU would cost far more memory than it frees"""
+    return sys.modules.get("torch")
 
 def clear_memory():
     """Clear system memory and GPU cache"""
@@ -10,7 +22,8 @@ def clear_memory():
         gc.collect()
         
         # Clear GPU cache if available
-        if torch.cuda.is_available():
+        torch = _torch()
+        if torch is not None and torch.cuda.is_available():
             torch.cuda.empty_cache()
             
         return True
@@ -27,7 +40,8 @@ def get_memory_usage():
             "ram_used": psutil.virtual_memory().used / (1024 * 1024 * 1024)  # GB
         }
         
-        if torch.cuda.is_available():
+        torch = _torch()
+        if torch is not None and torch.cuda.is_available():
             memory_stats.update({
                 "gpu_memory_allocated": torch.cuda.memory_allocated() / (1024 * 1024 * 1024),  # GB
                 "gpu_memory_cached": torch.cuda.memory_reserved() / (1024 * 1024 * 1024)  # GB
@@ -36,4 +50,254 @@ def get_memory_usage():
         return memory_stats
     except Exception as e:
         logging.error(f"Error getting memory stats: {e}")
-        return None 
\ No newline at end of file
+        return None
+
+def approximate_size(obj: Any, depth: int = 3) -> int:
+    """Rough deep size in bytes: containers are walked a few levels, arrays and frames report their buffers"""
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage) and hasattr(obj, "columns"):
+        return int(memory_usage(deep=True).sum())
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        size += sum(approximate_size(k, depth - 1) + approximate_size(v, depth - 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item, depth - 1) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += approximate_size(vars(obj), depth - 1)
+    return size
+
+def mapping_size(cache: MutableMapping, sample: int = 16) -> int:
+    """Estimated bytes held by a cache: its length times the mean size of a few entries"""
+    count = len(cache)
+    if not count:
+        return 0
+    try:
+        items = list(islice(cache.items(), sample))
+    except RuntimeError:
+        # Resized while sampling on another thread; try again next time
+        return 0
+    if not items:
+        return 0
+    mean = sum(approximate_size(k) + approximate_size(v) for k, v in items) / len(items)
+    return int(mean * count)
+
+def shrink_mapping(cache: MutableMapping, target_bytes: int) -> None:
+    """Drop entries (least recently used first for cachetools caches) until the estimate fits ``target_bytes``"""
+    size = mapping_size(cache)
+    count = len(cache)
+    if not count or size <= target_bytes:
+        return
+    keep = int(count * target_bytes / size)
+    while len(cache) > keep:
+        try:
+            cache.popitem()
+        except KeyError:
+            break
+
+
+class ReclaimableCache:
+    """A registered cache: how to measure it and how to shrink it"""
+
+    def __init__(self, name: str, size: Callable[[], int], evict: Callable[[int], Any], priority: int,
+                 thread_safe: bool):
+        self.name = name
+        self.size = size
+        self.evict = evict
+        self.priority = priority
+        self.thread_safe = thread_safe
+        self.shed_bytes = 0
+        self.last_size = 0
+
+
+class CacheRegistry:
+    """Caches that can give memory back under pressure.
+
+    Lower ``priority`` values are shed first. Caches that are only safe to
+    touch from the event loop (``thread_safe=False``) are shrunk by a callback
+    scheduled on the loop attached with ``attach_loop``.
+    """
+
+    def __init__(self):
+        self.caches: Dict[str, ReclaimableCache] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.lock = threading.Lock()
+
+    def register(self, name: str, size: Callable[[], int], evict: Callable[[int], Any],
+                 priority: int = 0, thread_safe: bool = True) -> None:
+        """``size()`` returns bytes held; ``evict(target_bytes)`` shrinks the cache to at most that"""
+        with self.lock:
+            self.caches[name] = ReclaimableCache(name, size, evict, priority, thread_safe)
+
+    def register_mapping(self, name: str, cache: MutableMapping, priority: int = 0) -> None:
+        """Register a dict-like cache used from the event loop"""
+        self.register(name, lambda: mapping_size(cache), lambda target: shrink_mapping(cache, target),
+                      priority=priority, thread_safe=False)
+
+    def unregister(self, name: str) -> None:
+        with self.lock:
+            self.caches.pop(name, None)
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+
+    def sizes(self) -> Dict[str, int]:
+        with self.lock:
+            caches = list(self.caches.values())
+        for cache in caches:
+            try:
+                cache.last_size = int(cache.size())
+            except Exception as e:
+                logging.error(f"Error measuring cache {cache.name}: {e}")
+        return {cache.name: cache.last_size for cache in caches}
+
+    def shed(self, bytes_to_free: int) -> Dict[str, int]:
+        """Shrink caches in priority order until ``bytes_to_free`` (by their own estimates) is released"""
+        sizes = self.sizes()
+        with self.lock:
+            caches = sorted(self.caches.values(), key=lambda c: c.priority)
+        plan = {}
+        for cache in caches:
+            if bytes_to_free <= 0:
+                break
+            size = sizes.get(cache.name, 0)
+            take = min(size, bytes_to_free)
+            if take <= 0:
+                continue
+            self._evict(cache, size - take)
+            cache.shed_bytes += take
+            plan[cache.name] = take
+            bytes_to_free -= take
+        return plan
+
+    def _evict(self, cache: ReclaimableCache, target_bytes: int) -> None:
+        loop = self.loop
+        if not cache.thread_safe and loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self._run_evict, cache, target_bytes)
+        else:
+            self._run_evict(cache, target_bytes)
+
+    @staticmethod
+    def _run_evict(cache: ReclaimableCache, target_bytes: int) -> None:
+        try:
+            cache.evict(target_bytes)
+        except Exception as e:
+            logging.error(f"Error evicting from cache {cache.name}: {e}")
+
+
+def memory_limit_bytes() -> int:
+    """Configured limit, else the container's cgroup limit, else physical memory"""
+    if settings.MEMORY_LIMIT_BYTES:
+        return settings.MEMORY_LIMIT_BYTES
+    total = psutil.virtual_memory().total
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit():
+            return min(int(value), total)
+    return total
+
+
+class MemoryMonitor:
+    """Background thread sampling process RSS and shedding registered caches under pressure.
+
+    Above ``high_watermark`` (a fraction of ``limit_bytes``) caches are shed
+    in priority order until RSS is expected to drop to ``low_watermark``.
+    Each sample, with the size of every cache, is kept in a bounded history.
+    """
+
+    def __init__(self, registry: CacheRegistry, limit_bytes: Optional[int] = None, high_watermark: float = 0.85,
+                 low_watermark: float = 0.70, interval: float = 5.0, history_size: int = 720,
+                 rss: Optional[Callable[[], int]] = None):
+        self.registry = registry
+        self.limit_bytes = limit_bytes or memory_limit_bytes()
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.interval = interval
+        self.samples = deque(maxlen=history_size)
+        self.shed_events = 0
+        self.rss = rss or (lambda: psutil.Process().memory_info().rss)
+        self.thread: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start sampling (idempotent); ``loop`` is where loop-bound caches get shrunk"""
+        if loop is not None:
+            self.registry.attach_loop(loop)
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"Memory monitor check failed: {e}")
+
+    def check(self) -> Dict:
+        """Take one sample and shed caches if RSS is above the high watermark"""
+        rss = self.rss()
+        sample = {"timestamp": time.time(), "rss_bytes": rss, "caches": self.registry.sizes(), "shed": {}}
+        if rss > self.high_watermark * self.limit_bytes:
+            to_free = int(rss - self.low_watermark * self.limit_bytes)
+            sample["shed"] = self.registry.shed(to_free)
+            self.shed_events += 1
+            gc.collect()
+            logging.warning(f"Memory pressure: RSS {rss / 2**20:.0f} MiB above "
+                            f"{self.high_watermark:.0%} of {self.limit_bytes / 2**20:.0f} MiB; shed {sample['shed']}")
+        self.samples.append(sample)
+        return sample
+
+    def history(self, limit: Optional[int] = None) -> List[Dict]:
+        """Samples oldest first: timestamp, RSS and bytes per cache"""
+        samples = list(self.samples)
+        return samples[-limit:] if limit else samples
+
+    def render_prometheus(self, prefix: str = "research_chat") -> str:
+        """Latest sample as Prometheus gauges"""
+        latest = self.samples[-1] if self.samples else {"rss_bytes": self.rss(), "caches": self.registry.sizes()}
+        lines = [
+            f"# HELP {prefix}_process_rss_bytes Resident set size of this worker.",
+            f"# TYPE {prefix}_process_rss_bytes gauge",
+            f"{prefix}_process_rss_bytes {latest['rss_bytes']}",
+            f"# HELP {prefix}_memory_limit_bytes Memory limit the watermarks are relative to.",
+            f"# TYPE {prefix}_memory_limit_bytes gauge",
+            f"{prefix}_memory_limit_bytes {self.limit_bytes}",
+            f"# HELP {prefix}_cache_bytes Estimated bytes held by each reclaimable cache.",
+            f"# TYPE {prefix}_cache_bytes gauge",
+        ]
+        lines += [f'{prefix}_cache_bytes{{cache="{escape_label(name)}"}} {size}' for name, size in sorted(latest["caches"].items())]
+        lines += [
+            f"# HELP {prefix}_cache_shed_bytes_total Bytes shed from each cache under memory pressure.",
+            f"# TYPE {prefix}_cache_shed_bytes_total counter",
+        ]
+        lines += [f'{prefix}_cache_shed_bytes_total{{cache="{escape_label(c.name)}"}} {c.shed_bytes}'
+                  for c in sorted(self.registry.caches.values(), key=lambda c: c.name)]
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry; caches register themselves where they are created
+cache_registry = CacheRegistry()
+memory_monitor = MemoryMonitor(
+    cache_registry,
+    limit_bytes=settings.MEMORY_LIMIT_BYTES or None,
+    high_watermark=settings.MEMORY_HIGH_WATERMARK,
+    low_watermark=settings.MEMORY_LOW_WATERMARK,
+    interval=settings.MEMORY_MONITOR_INTERVAL,
+    history_size=settings.MEMORY_HISTORY_SIZE
+)
@@ -0,0 +1,148 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+SUPPORTED_METRICS = ("cosine", "dotproduct")
+
+# Rows are de-quantized in blocks so scoring never materialises a full float32 copy of the index
+SCORE_BLOCK_ROWS = 16384
+
+
+class QuantizedVectorStore:
+    """In-process vector store keeping embeddings in float16 or per-dimension int8.
+
+    int8 codes are stored with a per-dimension scale/offset so that
+    ``vector ~= codes * scale + offset``. Similarity is computed directly on the
+    codes: ``query . vector = (query * scale) . codes + query . offset``.
+    """
+
+    def __init__(self, dimension: int = 768, dtype: str = "int8", metric: str = "cosine",
+                 keep_full_precision: bool = False):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        self.dimension = dimension
+        self.dtype = dtype
+        self.metric = metric
+        self.keep_full_precision = keep_full_precision
+
+        self.ids: List[str] = []
+        self.codes = np.empty((0, dimension), dtype=np.dtype(dtype))
+        self.full_precision: Optional[np.ndarray] = (
+            np.empty((0, dimension), dtype=np.float32) if keep_full_precision else None
+        )
+        self.scale: Optional[np.ndarray] = None
+        self.offset: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the vectors (codes, quantization params and optional float32 copy)"""
+        total = self.codes.nbytes
+        if self.scale is not None:
+            total += self.scale.nbytes + self.offset.nbytes
+        if self.full_precision is not None:
+            total += self.full_precision.nbytes
+        return total
+
+    def _prepare(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, got {vectors.shape[1]}")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+        return vectors
+
+    def _fit_int8(self, vectors: np.ndarray) -> None:
+        """Derive per-dimension scale/offset mapping [min, max] onto [-127, 127]"""
+        lo = vectors.min(axis=0)
+        hi = vectors.max(axis=0)
+        self.offset = ((hi + lo) / 2).astype(np.float32)
+        self.scale = np.maximum((hi - lo) / 254, 1e-12).astype(np.float32)
+
+    def quantize(self, vectors: np.ndarray) -> np.ndarray:
+        """Convert prepared float32 vectors into the storage dtype"""
+        if self.dtype == "int8":
+            codes = np.rint((vectors - self.offset) / self.scale)
+            return np.clip(codes, -127, 127).astype(np.int8)
+        return vectors.astype(np.dtype(self.dtype))
+
+    def dequantize(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstruct approximate float32 vectors from stored codes"""
+        if self.dtype == "int8":
+            return codes.astype(np.float32) * self.scale + self.offset
+        return codes.astype(np.float32)
+
+    def add(self, ids: Sequence[str], vectors) -> None:
+        """Add vectors to the store.
+
+        For int8 the scale/offset are fitted on the first batch added; later
+        batches are clipped to that range, so add a representative sample first.
+        """
+        vectors = self._prepare(vectors)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("ids and vectors must have the same length")
+
+        if self.dtype == "int8" and self.scale is None:
+            self._fit_int8(vectors)
+
+        self.codes = np.concatenate([self.codes, self.quantize(vectors)])
+        if self.full_precision is not None:
+            self.full_precision = np.concatenate([self.full_precision, vectors])
+        self.ids.extend(ids)
+
+    def _scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Approximate similarity of ``query`` against all (or the selected) stored rows"""
+        codes = self.codes if rows is None else self.codes[rows]
+        if self.dtype == "int8":
+            scaled_query = query * self.scale
+            bias = float(query @ self.offset)
+        else:
+            scaled_query = query
+            bias = 0.0
+
+        scores = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            scores[start:start + SCORE_BLOCK_ROWS] = block @ scaled_query
+        return scores + bias
+
+    def search(self, query_embedding, top_k: int = 3, rescore: bool = False,
+               rescore_factor: int = 4) -> List[Tuple[str, float]]:
+        """Return the ``top_k`` most similar ids with their scores.
+
+        With ``rescore=True`` the best ``top_k * rescore_factor`` candidates from
+        the quantized scan are re-ranked using exact float32 similarity.
+        """
+        if not self.ids:
+            return []
+        if rescore and self.full_precision is None:
+            raise ValueError("Rescoring requires keep_full_precision=True")
+
+        query = self._prepare(query_embedding)[0]
+        scores = self._scores(query)
+
+        candidates = min(len(self.ids), top_k * rescore_factor if rescore else top_k)
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        if rescore:
+            scores = np.full_like(scores, -np.inf)
+            scores[top] = self.full_precision[top] @ query
+
+        top = top[np.argsort(-scores[top], kind="stable")][:top_k]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Remove vectors by id"""
+        drop = set(ids)
+        keep = np.array([i not in drop for i in self.ids], dtype=bool)
+        self.ids = [i for i in self.ids if i not in drop]
+        self.codes = self.codes[keep]
+        if self.full_precision is not None:
+            self.full_precision = self.full_precision[keep]
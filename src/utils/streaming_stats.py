@@ -0,0 +1,194 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.types as pa_types
+from typing import Dict, Iterable, List, Optional, Sequence
+
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch in the style of KLL.
+
+    Values are buffered in levels; whenever a level exceeds ``k`` items it is
+    sorted and every other item (random offset) is promoted to the next level
+    with double weight. Memory is O(k log(n / k)) regardless of stream length.
+    While nothing has been compacted the answer is exact.
+    """
+
+    def __init__(self, k: int = 2048, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            while items.size > self.k:
+                items = np.sort(items)
+                even = items.size - items.size % 2
+                promoted = items[self._rng.integers(2):even:2]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                items = items[even:]
+            self.levels[level] = items
+            level += 1
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        if self.count == 0:
+            return [float("nan")] * len(qs)
+        if len(self.levels) == 1:
+            return [float(v) for v in np.quantile(self.levels[0], qs)]
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2 ** level, dtype=np.float64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks), values.size - 1)
+        return [float(v) for v in values[positions]]
+
+
+class StreamingStatistics:
+    """Incrementally computes the output of ``DataAnalysisTool.analyze_data``.
+
+    Feed Arrow record batches (or DataFrames) with ``update`` and call ``result``.
+    Means/variances are merged with Chan's parallel update, the correlation
+    matrix uses pairwise-complete sums (matching ``DataFrame.corr``), shifted by
+    the first batch's means for numerical stability.
+    """
+
+    def __init__(self, schema: pa.Schema, sketch_k: int = 2048):
+        self.schema = schema
+        self.columns = list(schema.names)
+        self.numeric_columns = [
+            field.name for field in schema
+            if pa_types.is_integer(field.type) or pa_types.is_floating(field.type)
+        ]
+        p = len(self.numeric_columns)
+
+        self.null_counts = {name: 0 for name in self.columns}
+        self.count = np.zeros(p)
+        self.mean = np.zeros(p)
+        self.m2 = np.zeros(p)
+        self.minimum = np.full(p, np.inf)
+        self.maximum = np.full(p, -np.inf)
+        self.sketches = [QuantileSketch(sketch_k, seed=i) for i in range(p)]
+
+        self.shift: Optional[np.ndarray] = None
+        self.pair_n = np.zeros((p, p))
+        self.pair_sum = np.zeros((p, p))
+        self.pair_sum_sq = np.zeros((p, p))
+        self.pair_cross = np.zeros((p, p))
+
+    def update(self, batch) -> None:
+        """Fold one batch of rows into the running statistics"""
+        if not isinstance(batch, (pa.RecordBatch, pa.Table)):
+            batch = pa.RecordBatch.from_pandas(batch, preserve_index=False)
+
+        for name in self.columns:
+            self.null_counts[name] += batch.column(name).null_count
+
+        if not self.numeric_columns:
+            return
+
+        x = np.column_stack([
+            batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64)
+            for name in self.numeric_columns
+        ])
+        present = ~np.isnan(x)
+
+        self._update_moments(x, present)
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(x[:, i])
+        self._update_pairs(x, present)
+
+    def _update_moments(self, x: np.ndarray, present: np.ndarray) -> None:
+        n_b = present.sum(axis=0).astype(np.float64)
+        has_values = n_b > 0
+        if not has_values.any():
+            return
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(has_values, np.nansum(x, axis=0) / n_b, 0.0)
+            m2_b = np.nansum((x - mean_b) ** 2, axis=0)
+            total = self.count + n_b
+            delta = mean_b - self.mean
+            self.mean = np.where(has_values, self.mean + delta * n_b / total, self.mean)
+            self.m2 = np.where(has_values, self.m2 + m2_b + delta ** 2 * self.count * n_b / total, self.m2)
+        self.count = total
+
+        self.minimum = np.fmin(self.minimum, np.where(has_values, np.nanmin(np.where(present, x, np.inf), axis=0), np.inf))
+        self.maximum = np.fmax(self.maximum, np.where(has_values, np.nanmax(np.where(present, x, -np.inf), axis=0), -np.inf))
+
+    def _update_pairs(self, x: np.ndarray, present: np.ndarray) -> None:
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                self.shift = np.nan_to_num(np.nanmean(np.where(present, x, np.nan), axis=0))
+        mask = present.astype(np.float64)
+        z = np.where(present, x - self.shift, 0.0)
+
+        self.pair_n += mask.T @ mask
+        self.pair_sum += z.T @ mask
+        self.pair_sum_sq += (z * z).T @ mask
+        self.pair_cross += z.T @ z
+
+    def correlation(self) -> Dict[str, Dict[str, float]]:
+        """Pairwise-complete Pearson correlation matrix as a nested dict"""
+        n, sx, sxx, sxy = self.pair_n, self.pair_sum, self.pair_sum_sq, self.pair_cross
+        sy, syy = sx.T, sxx.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+        r = np.clip(r, -1.0, 1.0)
+        return {
+            col: {row: float(r[i, j]) for i, row in enumerate(self.numeric_columns)}
+            for j, col in enumerate(self.numeric_columns)
+        }
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Same layout as ``DataFrame.describe().to_dict()`` for numeric columns"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(self.m2 / (self.count - 1))
+        summary = {}
+        for i, name in enumerate(self.numeric_columns):
+            empty = self.count[i] == 0
+            stats = {
+                "count": float(self.count[i]),
+                "mean": float("nan") if empty else float(self.mean[i]),
+                "std": float(std[i]) if self.count[i] > 1 else float("nan"),
+                "min": float("nan") if empty else float(self.minimum[i]),
+            }
+            for q, value in zip(DESCRIBE_PERCENTILES, self.sketches[i].quantiles(DESCRIBE_PERCENTILES)):
+                stats[f"{q * 100:g}%"] = value
+            stats["max"] = float("nan") if empty else float(self.maximum[i])
+            summary[name] = stats
+        return summary
+
+    def result(self) -> Dict:
+        data_types = self.schema.empty_table().to_pandas().dtypes.astype(str).to_dict()
+        return {
+            "summary": self.summary(),
+            "missing_values": dict(self.null_counts),
+            "data_types": data_types,
+            "correlation": self.correlation() if len(self.numeric_columns) > 1 else {}
+        }
+
+
+def analyze_batches(schema: pa.Schema, batches: Iterable) -> Dict:
+    """Run ``StreamingStatistics`` over an iterable of record batches"""
+    stats = StreamingStatistics(schema)
+    for batch in batches:
+        stats.update(batch)
+    return stats.result()
@@ -0,0 +1,263 @@
+import json
+import time
+import inspect
+import logging
+import threading
+import functools
+import contextvars
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from src.config.settings import settings
+
+# Seconds; spans from sub-millisecond cache hits up to slow LLM calls
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bytes or item counts, whichever the stage records
+SIZE_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+logger = logging.getLogger("tracing")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def escape_label(value: Any) -> str:
+    """A Prometheus label value with backslashes, quotes and newlines escaped"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label value, in Prometheus layout"""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        self.series: Dict[str, List] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum, count
+                series = self.series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {
+                label_value: {"count": count, "sum": total, "mean": total / count if count else 0.0}
+                for label_value, (_, total, count) in self.series.items()
+            }
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for label_value, (counts, total, count) in sorted(self.series.items()):
+                label = f'{self.label}="{escape_label(label_value)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_sum{{{label}}} {total:.6f}")
+                lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+    def clear(self) -> None:
+        with self.lock:
+            self.series.clear()
+
+
+class Span:
+    """One timed stage; nested spans see their parent through a context variable, across awaits"""
+
+    __slots__ = ("tracer", "name", "parent", "root", "size", "error", "start", "duration", "children", "attributes",
+                 "is_request", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, size: Optional[float] = None, **attributes):
+        self.tracer = tracer
+        self.name = name
+        self.size = size
+        self.attributes = attributes
+        self.error = None
+        self.duration = 0.0
+        self.parent = None
+        self.root = None
+        self.children: Optional[List["Span"]] = None
+        self.is_request = False
+
+    def set_size(self, size: float) -> None:
+        """Record the stage's payload size (bytes or items)"""
+        self.size = size
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.parent = _current_span.get()
+        self.root = self.parent.root if self.parent is not None else self
+        if self.root is self:
+            self.children = []
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        if self.root is not self:
+            self.root.children.append(self)
+        self.tracer.record(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        entry = {"name": self.name, "ms": round(self.duration * 1000, 3)}
+        if self.parent is not None and self.parent is not self.root:
+            entry["parent"] = self.parent.name
+        if self.size is not None:
+            entry["size"] = self.size
+        if self.error:
+            entry["error"] = self.error
+        return entry
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled"""
+
+    def set_size(self, size: float) -> None:
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Per-stage latency and payload-size histograms fed by spans, plus one log line per request"""
+
+    def __init__(self, enabled: bool = True, log_requests: bool = True, prefix: str = "research_chat"):
+        self.enabled = enabled
+        self.log_requests = log_requests
+        self.durations = Histogram(f"{prefix}_stage_duration_seconds", "Duration of each pipeline stage.",
+                                   "stage", DURATION_BUCKETS)
+        self.sizes = Histogram(f"{prefix}_stage_payload_size", "Payload size of each pipeline stage (bytes or items).",
+                               "stage", SIZE_BUCKETS)
+        self.errors: Dict[str, int] = {}
+        # Spans are recorded from worker threads as well as the event loop
+        self.lock = threading.Lock()
+        self.error_name = f"{prefix}_stage_errors_total"
+
+    def span(self, name: str, size: Optional[float] = None, **attributes):
+        """Context manager timing a stage; nests under whichever span is current"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, size, **attributes)
+
+    def request(self, name: str, **attributes):
+        """Root span for one request; on exit its stages are logged as a single JSON line"""
+        if not self.enabled:
+            return NOOP_SPAN
+        root = Span(self, name, **attributes)
+        root.is_request = True
+        return root
+
+    def record(self, span: Span) -> None:
+        self.durations.observe(span.name, span.duration)
+        if span.size is not None:
+            self.sizes.observe(span.name, span.size)
+        if span.error:
+            with self.lock:
+                self.errors[span.name] = self.errors.get(span.name, 0) + 1
+        if span.is_request and self.log_requests:
+            logger.info(json.dumps({
+                "trace": span.name,
+                "ms": round(span.duration * 1000, 3),
+                **span.attributes,
+                **({"error": span.error} if span.error else {}),
+                "spans": [child.as_dict() for child in span.children],
+            }, default=str))
+
+    def traced(self, name: Optional[str] = None, size: Optional[Callable[[Any], float]] = None):
+        """Decorator timing a sync or async function as a span.
+
+        ``size`` maps the return value to the payload size recorded with the span.
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with Span(self, span_name) as span:
+                        result = await func(*args, **kwargs)
+                        if size is not None:
+                            span.size = _safe_size(size, result)
+                        return result
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, span_name) as span:
+                    result = func(*args, **kwargs)
+                    if size is not None:
+                        span.size = _safe_size(size, result)
+                    return result
+            return wrapper
+        return decorator
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = self.durations.render() + self.sizes.render()
+        lines += [f"# HELP {self.error_name} Spans that exited with an exception.", f"# TYPE {self.error_name} counter"]
+        with self.lock:
+            errors = sorted(self.errors.items())
+        lines += [f'{self.error_name}{{stage="{escape_label(stage)}"}} {count}' for stage, count in errors]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return self.durations.snapshot()
+
+    def reset(self) -> None:
+        self.durations.clear()
+        self.sizes.clear()
+        with self.lock:
+            self.errors.clear()
+
+
+def _safe_size(size: Callable[[Any], float], result: Any) -> Optional[float]:
+    try:
+        return size(result)
+    except Exception:
+        return None
+
+
+def payload_bytes(value: Any) -> int:
+    """Approximate serialized size of a response payload"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+tracer = Tracer(enabled=settings.TRACING_ENABLED, log_requests=settings.TRACING_LOG_REQUESTS)
+span = tracer.span
+traced = tracer.traced
+trace_request = tracer.request
@@ -0,0 +1,62 @@
+import io
+import os
+import uuid
+import pytest
+import pytest_asyncio
+import pandas as pd
+from src.services.blob_service import BlobStorageService
+from src.tools.data_analysis_tool import DataAnalysisTool
+from src.utils.dataset_cache import DatasetCache
+
+# Run against Azurite, e.g.:
+#   docker run -p 10000:10000 mcr.microsoft.com/azure-storage/azurite azurite-blob --blobHost 0.0.0.0
+#   AZURITE_CONNECTION_STRING="UseDevelopmentStorage=true" pytest -m integration
+AZURITE_CONNECTION_STRING = os.environ.get("AZURITE_CONNECTION_STRING")
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not AZURITE_CONNECTION_STRING, reason="AZURITE_CONNECTION_STRING not set"),
+]
+
+@pytest_asyncio.fixture
+async def blob_storage():
+    container = f"test-{uuid.uuid4().hex[:12]}"
+    # Small chunks force multi-block uploads and multi-range downloads
+    service = BlobStorageService(
+        connection_string=AZURITE_CONNECTION_STRING,
+        container=container,
+        chunk_size=256 * 1024,
+        max_concurrency=4
+    )
+    await service.container_client.create_container()
+    yield service
+    await service.container_client.delete_container()
+    await service.close()
+
+def _csv_bytes(rows):
+    return pd.DataFrame({
+        'employee_id': range(rows),
+        'salary': [50000 + i % 1000 for i in range(rows)],
+        'department': ['HR', 'IT', 'Sales', 'Ops'] * (rows // 4)
+    }).to_csv(index=False).encode()
+
+@pytest.mark.asyncio
+async def test_chunked_upload_and_ranged_download_round_trip(blob_storage):
+    data = _csv_bytes(200_000)
+    etag = await blob_storage.upload_stream("employees.csv", io.BytesIO(data))
+
+    assert etag == await blob_storage.get_etag("employees.csv")
+    downloaded = io.BytesIO()
+    assert await blob_storage.download_to_file("employees.csv", downloaded, etag=etag) == len(data)
+    assert downloaded.getvalue() == data
+
+@pytest.mark.asyncio
+async def test_tool_loads_uploaded_dataset(blob_storage, tmp_path):
+    await blob_storage.upload_stream("employees.csv", io.BytesIO(_csv_bytes(100_000)))
+    tool = DataAnalysisTool()
+    tool.blob_storage = blob_storage
+    tool.dataset_cache = DatasetCache(str(tmp_path), max_bytes=1024 * 1024 * 1024)
+
+    table = await tool.load_table("employees.csv")
+    assert table.num_rows == 100_000
+    assert table.column_names == ['employee_id', 'salary', 'department']
@@ -0,0 +1,73 @@
+import io
+import time
+from Bio import Medline
+
+def medline_record(pmid):
+    return (
+        f"PMID- {pmid}\n"
+        f"TI  - Employee engagement study {pmid}\n"
+        f"AB  - Abstract {pmid}\n"
+        f"AU  - Smith J\n"
+        f"DP  - 2021 Mar\n"
+        f"JT  - Journal of Applied Psychology\n"
+        f"MH  - Personnel Management\n"
+    )
+
+class FakePubMedService:
+    """PubMedService stand-in serving a fixed corpus from an Entrez-style history search"""
+    def __init__(self, count):
+        self.count = count
+        self.fetch_calls = []
+        self.esearch_calls = []
+
+    def esearch_history(self, term, mindate=None, maxdate=None):
+        self.esearch_calls.append((term, maxdate))
+        return self.count, "WEBENV", "1"
+
+    def efetch_history(self, webenv, query_key, retstart, retmax):
+        self.fetch_calls.append(retstart)
+        pmids = range(retstart + 1, min(retstart + retmax, self.count) + 1)
+        return "\n".join(medline_record(pmid) for pmid in pmids)
+
+    def parse_medline_records(self, text):
+        return [
+            {"pmid": r.get("PMID", ""), "title": r.get("TI", ""), "abstract": r.get("AB", ""),
+             "authors": "; ".join(r.get("AU", [])), "publication_date": r.get("DP", ""),
+             "journal": r.get("JT", ""), "keywords": r.get("MH", []), "raw_data": str(r)}
+            for r in Medline.parse(io.StringIO(text))
+        ]
+
+    def embedding_text(self, article):
+        return f"{article['title']} {article['abstract']}"
+
+    def embed_texts(self, texts, batch_size=64):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def article_record(self, article):
+        return {key: article[key] for key in ("pmid", "title", "abstract")}
+
+    def vector_metadata(self, article):
+        return {"title": article["title"]}
+
+class FakeVectorStore:
+    def __init__(self, fail_first=(), delay=0.0):
+        self.fail_first = set(fail_first)
+        self.delay = delay
+        self.vectors = {}
+
+    def upsert_embeddings(self, vectors):
+        time.sleep(self.delay)
+        first_id = int(vectors[0]["id"])
+        if first_id in self.fail_first:
+            self.fail_first.discard(first_id)
+            raise RuntimeError("index unavailable")
+        self.vectors.update({v["id"]: v for v in vectors})
+        return len(vectors)
+
+class FakeDatabase:
+    def __init__(self):
+        self.rows = {}
+
+    def store(self, records):
+        self.rows.update({r["pmid"]: r for r in records})
+        return len(records)
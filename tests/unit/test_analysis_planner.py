@@ -0,0 +1,61 @@
+import pytest
+from src.agents.analysis_planner import (
+    graph_params,
+    normalize_request,
+    parse_request,
+    schema_fingerprint,
+    validate_plan
+)
+
+SCHEMA = {
+    'department': 'object',
+    'salary': 'float64',
+    'hire_date': 'datetime64[ns]',
+    'performance_score': 'int64',
+    'gender': 'object'
+}
+
+def test_normalize_request():
+    assert normalize_request("  Show a BAR chart: Salary, by Department!") == "show a bar chart salary by department"
+
+def test_schema_fingerprint_is_order_independent():
+    reordered = dict(reversed(list(SCHEMA.items())))
+    assert schema_fingerprint(SCHEMA) == schema_fingerprint(reordered)
+    assert schema_fingerprint(SCHEMA) != schema_fingerprint({**SCHEMA, 'salary': 'int64'})
+
+@pytest.mark.parametrize("request_text,expected", [
+    ("Bar chart of salary by department",
+     {"graph_type": "bar", "x_col": "department", "y_col": "salary", "color_col": None}),
+    ("Plot a histogram of salary colored by gender",
+     {"graph_type": "histogram", "x_col": "salary", "y_col": None, "color_col": "gender"}),
+    ("scatter plot of performance score vs salary",
+     {"graph_type": "scatter", "x_col": "salary", "y_col": "performance_score", "color_col": None}),
+    ("Show salary over hire date as a line graph, split by department",
+     {"graph_type": "line", "x_col": "hire_date", "y_col": "salary", "color_col": "department"}),
+    ("box plot of salary per department",
+     {"graph_type": "box", "x_col": "department", "y_col": "salary", "color_col": None}),
+])
+def test_explicit_requests_resolve_without_llm(request_text, expected):
+    plan = parse_request(request_text, SCHEMA)
+    assert plan == {"analysis_type": "graph", **expected}
+    assert graph_params(plan) == expected
+
+def test_summary_request():
+    assert parse_request("Give me summary statistics for this dataset", SCHEMA) == {"analysis_type": "analysis"}
+
+@pytest.mark.parametrize("request_text", [
+    "Create a graph showing how our people are doing",
+    "scatter plot of salary",
+    "line chart of tenure over time",
+])
+def test_ambiguous_requests_fall_back(request_text):
+    assert parse_request(request_text, SCHEMA) is None
+
+def test_validate_plan_rejects_unknown_columns():
+    assert validate_plan({"analysis_type": "graph", "graph_type": "bar", "x_col": "team"}, SCHEMA) is None
+    assert validate_plan({"analysis_type": "graph", "graph_type": "pie", "x_col": "salary"}, SCHEMA) is None
+    assert validate_plan("not a plan", SCHEMA) is None
+    assert validate_plan(
+        {"analysis_type": "graph", "graph_type": "bar", "x_col": "department", "y_col": "", "color_col": None},
+        SCHEMA
+    ) == {"analysis_type": "graph", "graph_type": "bar", "x_col": "department", "y_col": None, "color_col": None}
@@ -0,0 +1,53 @@
+import pytest
+from types import SimpleNamespace
+from src.services.article_hydrator import ArticleHydrator
+
+ROWS = {
+    "1": {"title": "Burnout in nurses", "abstract": "A long abstract " * 200, "journal": "J Appl Psychol"},
+    "2": {"title": "Remote work and engagement", "abstract": "", "journal": "Pers Psychol"},
+}
+
+class FakeDatabase:
+    def __init__(self):
+        self.queries = []
+
+    def get_articles_by_pmids(self, pmids):
+        self.queries.append(list(pmids))
+        return {pmid: dict(ROWS[pmid]) for pmid in pmids if pmid in ROWS}
+
+def _match(pmid, **metadata):
+    return SimpleNamespace(id=pmid, score=0.9, metadata={"pmid": pmid, **metadata})
+
+@pytest.mark.asyncio
+async def test_hydrates_all_matches_in_one_query_and_keeps_rank_order():
+    db = FakeDatabase()
+    hydrator = ArticleHydrator(db.get_articles_by_pmids, maxsize=10, ttl=60)
+
+    articles = await hydrator.hydrate([_match("2", journal="Pers Psychol"), _match("1")])
+
+    assert db.queries == [["2", "1"]]
+    assert [a["title"] for a in articles] == ["Remote work and engagement", "Burnout in nurses"]
+    assert articles[1]["abstract"] == ROWS["1"]["abstract"]
+
+@pytest.mark.asyncio
+async def test_cached_rows_are_not_queried_again():
+    db = FakeDatabase()
+    hydrator = ArticleHydrator(db.get_articles_by_pmids, maxsize=10, ttl=60)
+
+    await hydrator.hydrate([_match("1")])
+    await hydrator.hydrate([_match("1"), _match("2")])
+    assert db.queries == [["1"], ["2"]]
+    assert (hydrator.stats.hits, hydrator.stats.misses) == (1, 2)
+
+    hydrator.invalidate(["1"])
+    await hydrator.hydrate([_match("1")])
+    assert db.queries[-1] == ["1"]
+
+@pytest.mark.asyncio
+async def test_vectors_without_a_row_keep_their_metadata():
+    hydrator = ArticleHydrator(FakeDatabase().get_articles_by_pmids, maxsize=10, ttl=60)
+
+    # Written before metadata was slimmed, and not in the database
+    articles = await hydrator.hydrate([_match("99", title="Legacy vector", abstract="Stored in Pinecone")])
+
+    assert articles == [{"pmid": "99", "title": "Legacy vector", "abstract": "Stored in Pinecone"}]
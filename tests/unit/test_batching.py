@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from src.utils.batching import MicroBatcher
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_call():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch=64)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert results == [i * 2 for i in range(10)]
+    assert calls == [list(range(10))]
+    # A later call starts a new batch
+    assert await batcher.submit(7) == 14
+    assert batcher.batches == 2
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch():
+    sizes = []
+
+    def process(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch=4)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert results == list(range(10))
+    assert sizes == [4, 4, 2]
+
+@pytest.mark.asyncio
+async def test_failed_batch_raises_for_every_caller():
+    def process(items):
+        raise RuntimeError("model unavailable")
+
+    batcher = MicroBatcher(process)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    assert [type(r) for r in results] == [RuntimeError] * 3
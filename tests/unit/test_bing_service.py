@@ -1,34 +1,92 @@
+import asyncio
 import pytest
 from src.services.bing_service import BingGroundingService
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
-def test_bing_service_initialization():
-    with patch('azure.search.documents.SearchClient') as mock_client:
-        service = BingGroundingService()
-        assert service.search_client is not None
+class FakeAsyncResults:
+    def __init__(self, docs):
+        self.docs = docs
 
-def test_search_function():
-    with patch('azure.search.documents.SearchClient') as mock_client:
-        service = BingGroundingService()
-        mock_results = [{"title": "Test Result"}]
-        service.search_client.search.return_value = mock_results
-        
-        results = service.search("test query")
-        assert len(results) == 1
-        assert results[0]["title"] == "Test Result"
-
-def test_create_index():
-    with patch('azure.search.documents.indexes.SearchIndexClient') as mock_index_client:
-        service = BingGroundingService()
-        mock_index_client.list_indexes.return_value = []
-        
-        service.create_index()
-        service.index_client.create_index.assert_called_once()
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
 
-def test_add_documents():
-    with patch('azure.search.documents.SearchClient') as mock_client:
+@pytest.fixture
+def service():
+    with patch('src.services.bing_service.SearchClient'), \
+         patch('src.services.bing_service.SearchIndexClient'):
         service = BingGroundingService()
-        test_documents = [{"id": "1", "content": "Test content"}]
-        
-        service.add_documents(test_documents)
-        service.search_client.upload_documents.assert_called_once_with(test_documents) 
\ No newline at end of file
+    service.search_client.search = AsyncMock(return_value=FakeAsyncResults([{"title": "Test Result"}]))
+    service.search_client.upload_documents = AsyncMock()
+    return service
+
+def test_bing_service_initialization(service):
+    assert service.search_client is not None
+
+@pytest.mark.asyncio
+async def test_search_function(service):
+    results = await service.search("test query")
+    assert len(results) == 1
+    assert results[0]["title"] == "Test Result"
+
+@pytest.mark.asyncio
+async def test_search_results_are_cached(service):
+    await service.search("burnout prevention")
+    service.search_client.search.return_value = FakeAsyncResults([{"title": "Test Result"}])
+    await service.search("Burnout  prevention")
+    await service.search("burnout prevention", top_k=10)
+
+    assert service.search_client.search.await_count == 2
+    stats = service.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_share_one_call(service):
+    async def slow_search(**kwargs):
+        await asyncio.sleep(0.05)
+        return FakeAsyncResults([{"title": "Test Result"}])
+    service.search_client.search = AsyncMock(side_effect=slow_search)
+
+    results = await asyncio.gather(*[service.search("employee engagement") for _ in range(10)])
+
+    assert service.search_client.search.await_count == 1
+    assert all(r == [{"title": "Test Result"}] for r in results)
+    assert service.cache_stats()["coalesced"] == 9
+
+@pytest.mark.asyncio
+async def test_failed_search_is_not_cached(service):
+    service.search_client.search = AsyncMock(side_effect=RuntimeError("unavailable"))
+    with pytest.raises(RuntimeError):
+        await service.search("turnover")
+
+    service.search_client.search = AsyncMock(return_value=FakeAsyncResults([]))
+    assert await service.search("turnover") == []
+    assert service.cache_stats()["backend_errors"] == 1
+
+@pytest.mark.asyncio
+async def test_create_index(service):
+    service.index_client.list_indexes.return_value = []
+    
+    await service.create_index()
+    service.index_client.create_index.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_add_documents(service):
+    test_documents = [{"id": "1", "content": "Test content"}]
+    await service.search("test query")
+    
+    service.search_client.upload_documents = AsyncMock(return_value=[
+        Mock(key="1", succeeded=True, status_code=201, error_message=None)
+    ])
+
+    report = await service.add_documents(test_documents)
+    service.search_client.upload_documents.assert_awaited_once_with(documents=test_documents)
+    assert report.succeeded == 1
+    assert len(service.result_cache) == 0
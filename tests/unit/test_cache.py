@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from src.utils.cache import AsyncResultCache
+
+@pytest.mark.asyncio
+async def test_caller_cancellation_does_not_cancel_shared_load():
+    cache = AsyncResultCache(maxsize=10, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    first = asyncio.create_task(cache.get_or_load("key", loader))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.get_or_load("key", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "value"
+    assert len(calls) == 1
+    assert await cache.get_or_load("key", loader) == "value"
+    assert cache.stats.hits == 1
+
+@pytest.mark.asyncio
+async def test_entries_expire():
+    cache = AsyncResultCache(maxsize=10, ttl=0.01)
+
+    async def loader():
+        return object()
+
+    first = await cache.get_or_load("key", loader)
+    await asyncio.sleep(0.02)
+    assert await cache.get_or_load("key", loader) is not first
+    assert cache.stats.misses == 2
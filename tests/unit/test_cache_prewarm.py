@@ -0,0 +1,68 @@
+import time
+import asyncio
+import pytest
+from src.jobs.cache_prewarm import CachePrewarmer
+
+def _entries(*queries):
+    return lambda: [{"query": query, "count": 1, "last_searched": None} for query in queries]
+
+@pytest.mark.asyncio
+async def test_warms_each_query_once_and_counts_failures():
+    warmed = []
+
+    async def warm(query):
+        if query == "broken":
+            raise RuntimeError("pubmed down")
+        warmed.append(query)
+
+    prewarmer = CachePrewarmer(warm, _entries("burnout", "broken", "turnover", "engagement"),
+                               time_budget=5, rate=0, concurrency=3)
+    report = await prewarmer.run()
+
+    assert sorted(warmed) == ["burnout", "engagement", "turnover"]
+    assert (report["queries"], report["warmed"], report["failed"], report["skipped"]) == (4, 3, 1, 0)
+    assert prewarmer.last_report == report
+
+@pytest.mark.asyncio
+async def test_rate_limit_spaces_out_queries():
+    starts = []
+
+    async def warm(query):
+        starts.append(time.monotonic())
+
+    await CachePrewarmer(warm, _entries("a", "b", "c"), time_budget=5, rate=20, concurrency=3).run()
+
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.04
+
+@pytest.mark.asyncio
+async def test_stops_at_the_time_budget():
+    async def warm(query):
+        await asyncio.sleep(0.5 if query == "slow" else 0)
+
+    report = await CachePrewarmer(warm, _entries("fast", "slow", "never"),
+                                  time_budget=0.1, rate=0, concurrency=1).run()
+
+    assert (report["warmed"], report["timed_out"], report["skipped"]) == (1, 1, 1)
+    assert report["seconds"] < 0.3
+
+@pytest.mark.asyncio
+async def test_failed_query_load_is_an_empty_run():
+    def load():
+        raise ConnectionError("database unavailable")
+
+    report = await CachePrewarmer(lambda query: asyncio.sleep(0), load, time_budget=1, rate=0).run()
+    assert report["queries"] == report["warmed"] == 0
+
+@pytest.mark.asyncio
+async def test_start_runs_once_in_the_background():
+    calls = []
+
+    async def warm(query):
+        calls.append(query)
+
+    prewarmer = CachePrewarmer(warm, _entries("burnout"), time_budget=1, rate=0)
+    task = prewarmer.start()
+    assert prewarmer.start() is task
+    await task
+    assert calls == ["burnout"]
@@ -0,0 +1,70 @@
+import pytest
+from src.utils import conversation_memory
+from src.utils.conversation_memory import ConversationMemory, count_tokens
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # Character estimate, so the tests need no tokenizer download
+    monkeypatch.setattr(conversation_memory, "_encoding", None)
+    monkeypatch.setattr(conversation_memory, "_encoding_loaded", True)
+
+class SessionStore:
+    def __init__(self):
+        self.states = {}
+
+    def load(self, session_id):
+        return self.states.get(session_id)
+
+    def save(self, session_id, state):
+        self.states[session_id] = state
+
+def _memory(store, summarize, session_id="s1", **kwargs):
+    return ConversationMemory(session_id, summarize, store.load, store.save,
+                              max_tokens=kwargs.pop("max_tokens", 300), summary_tokens=100, **kwargs)
+
+@pytest.mark.asyncio
+async def test_window_stays_under_ceiling_as_conversation_grows():
+    store = SessionStore()
+    folds = []
+
+    def summarize(summary, turns):
+        folds.append(len(turns))
+        return (summary + " " + " / ".join(turn["content"][:20] for turn in turns)).strip()
+
+    for i in range(40):
+        memory = _memory(store, summarize)
+        await memory.load()
+        await memory.add_turn(f"question {i} " + "about burnout " * 5, f"answer {i} " + "citing studies " * 10)
+        assert memory.tokens() <= 300
+        assert [m["role"] for m in memory.messages()] == ["user", "assistant"] * (len(memory.turns) // 2)
+
+    # Compaction evicts several turns at a time rather than one per message
+    assert 0 < len(folds) < 20
+    assert memory.messages()[-1]["content"].startswith("answer 39")
+    assert count_tokens(memory.summary) <= 100
+    assert store.states["s1"]["token_count"] == memory.tokens()
+
+@pytest.mark.asyncio
+async def test_failed_summary_keeps_previous_one_and_the_ceiling():
+    store = SessionStore()
+    store.save("s1", {"summary": "Discussed burnout.", "turns": []})
+
+    def summarize(summary, turns):
+        raise RuntimeError("model unavailable")
+
+    memory = _memory(store, summarize)
+    await memory.load()
+    for i in range(10):
+        await memory.add_turn("q " * 40, "a " * 80)
+
+    assert memory.summary == "Discussed burnout."
+    assert memory.tokens() <= 300
+
+@pytest.mark.asyncio
+async def test_oversized_message_is_cut_to_fit():
+    store = SessionStore()
+    memory = _memory(store, lambda summary, turns: summary)
+    await memory.add_turn("short question", "x" * 10_000)
+
+    assert memory.tokens() <= 300
+    assert memory.messages()[1]["content"] == "x" * 400
@@ -1,20 +1,55 @@
 import pytest
 import pandas as pd
 from src.tools.data_analysis_tool import DataAnalysisTool
+from src.utils.dataset_cache import DatasetCache
+from src.utils.memory import cache_registry
 from unittest.mock import Mock, patch
 
-def test_load_dataset():
-    with patch('azure.storage.blob.BlobServiceClient') as mock_blob:
+class FakeBlobStorage:
+    """In-memory stand-in for BlobStorageService"""
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.etags = {name: '"0x1"' for name in blobs}
+        self.downloads = 0
+
+    async def get_etag(self, blob_name):
+        return self.etags[blob_name]
+
+    async def download_to_file(self, blob_name, stream, etag=None):
+        self.downloads += 1
+        return stream.write(self.blobs[blob_name])
+
+@pytest.fixture
+def tool(tmp_path):
+    with patch('src.services.blob_service.BlobServiceClient'):
         tool = DataAnalysisTool()
-        mock_data = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
-        tool.container_client.get_blob_client().download_blob().readall.return_value = mock_data.to_csv()
-        
-        result = tool.load_dataset("test.csv")
-        assert isinstance(result, pd.DataFrame)
-        assert len(result) == 3
-
-def test_generate_graph():
-    tool = DataAnalysisTool()
+    tool.dataset_cache = DatasetCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    mock_data = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+    tool.blob_storage = FakeBlobStorage({"test.csv": mock_data.to_csv(index=False).encode()})
+    return tool
+
+@pytest.mark.asyncio
+async def test_load_dataset(tool):
+    result = await tool.load_dataset("test.csv")
+    assert isinstance(result, pd.DataFrame)
+    assert len(result) == 3
+
+def test_dataset_cache_is_outside_the_rss_budget(tool):
+    # Unlinking cached Arrow files frees disk, not resident memory
+    assert "dataset_cache" not in cache_registry.caches
+
+@pytest.mark.asyncio
+async def test_load_dataset_uses_cache_for_same_etag(tool):
+    first = await tool.load_dataset("test.csv")
+    second = await tool.load_dataset("test.csv")
+    assert tool.blob_storage.downloads == 1
+    pd.testing.assert_frame_equal(first, second)
+    
+    tool.blob_storage.etags["test.csv"] = '"0x2"'
+    await tool.load_dataset("test.csv")
+    assert tool.blob_storage.downloads == 2
+
+def test_generate_graph(tool):
     df = pd.DataFrame({
         'x': [1, 2, 3],
         'y': [4, 5, 6],
@@ -30,8 +65,7 @@ def test_generate_graph():
     )
     assert isinstance(result, dict)
 
-def test_analyze_data():
-    tool = DataAnalysisTool()
+def test_analyze_data(tool):
     df = pd.DataFrame({
         'numeric': [1, 2, 3, 4, 5],
         'categorical': ['A', 'B', 'A', 'B', 'A']
@@ -43,15 +77,21 @@ def test_analyze_data():
     assert 'missing_values' in result
     assert 'data_types' in result
 
-def test_run_method():
-    with patch('azure.storage.blob.BlobServiceClient') as mock_blob:
-        tool = DataAnalysisTool()
-        mock_data = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
-        tool.container_client.get_blob_client().download_blob().readall.return_value = mock_data.to_csv()
-        
-        result = tool.run(
-            blob_name="test.csv",
-            analysis_type="analysis"
-        )
-        assert isinstance(result, dict)
-        assert 'summary' in result 
\ No newline at end of file
+def test_analyze_data_correlates_only_numeric_columns(tool):
+    df = pd.DataFrame({
+        'score': [1.0, 2.0, 3.0, 4.0],
+        'tenure': [2, 4, 6, 9],
+        'department': ['HR', 'Sales', 'HR', 'Sales']
+    })
+
+    result = tool.analyze_data(df)
+    assert set(result['correlation']) == {'score', 'tenure'}
+
+@pytest.mark.asyncio
+async def test_run_method(tool):
+    result = await tool.run(
+        blob_name="test.csv",
+        analysis_type="analysis"
+    )
+    assert isinstance(result, dict)
+    assert 'summary' in result
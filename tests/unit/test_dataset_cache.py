@@ -0,0 +1,70 @@
+import os
+import time
+import pytest
+import pyarrow as pa
+from src.utils.dataset_cache import DatasetCache
+
+@pytest.fixture
+def table():
+    return pa.table({'salary': list(range(1000)), 'department': ['HR', 'IT'] * 500})
+
+def test_put_and_get_round_trip(tmp_path, table):
+    cache = DatasetCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    cache.put("hr.csv", '"0x1"', table)
+
+    cached = cache.get("hr.csv", '"0x1"')
+    assert cached.equals(table)
+
+def test_miss_on_different_etag(tmp_path, table):
+    cache = DatasetCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    cache.put("hr.csv", '"0x1"', table)
+
+    assert cache.get("hr.csv", '"0x2"') is None
+    assert cache.get("other.csv", '"0x1"') is None
+
+def test_evicts_least_recently_used(tmp_path, table):
+    cache = DatasetCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    first = cache.put("a.csv", "1", table)
+    second = cache.put("b.csv", "1", table)
+    entry_size = os.path.getsize(first)
+
+    # Make "a" older than "b", then touch it through a read so "b" becomes the LRU entry
+    os.utime(first, (time.time() - 60, time.time() - 60))
+    os.utime(second, (time.time() - 30, time.time() - 30))
+    cache.get("a.csv", "1")
+
+    cache.max_bytes = entry_size * 2
+    cache.put("c.csv", "1", table)
+
+    assert cache.get("b.csv", "1") is None
+    assert cache.get("a.csv", "1") is not None
+    assert cache.get("c.csv", "1") is not None
+    assert cache.size_bytes() <= cache.max_bytes
+
+def test_clear(tmp_path, table):
+    cache = DatasetCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    cache.put("a.csv", "1", table)
+    assert cache.clear() > 0
+    assert cache.size_bytes() == 0
+
+def test_concurrent_writes_of_one_entry(tmp_path, table):
+    from concurrent.futures import ThreadPoolExecutor
+    cache = DatasetCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: cache.put("hr.csv", '"0x1"', table), range(8)))
+
+    assert cache.get("hr.csv", '"0x1"').equals(table)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_failed_write_leaves_no_temp_file(tmp_path, table, monkeypatch):
+    from src.utils import dataset_cache
+    cache = DatasetCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+
+    def failing_write(table, path, **kwargs):
+        open(path, "wb").write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(dataset_cache.feather, "write_feather", failing_write)
+    with pytest.raises(OSError):
+        cache.put("hr.csv", '"0x1"', table)
+    assert os.listdir(tmp_path) == []
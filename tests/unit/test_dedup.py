@@ -0,0 +1,58 @@
+from src.utils.dedup import Deduplicator, LSHIndex, MinHasher, collapse_duplicates
+
+ABSTRACT = ("We surveyed 1200 nurses across 14 hospitals to examine how workload, supervisor support and "
+            "shift length relate to emotional exhaustion. Supervisor support buffered the effect of workload "
+            "on exhaustion, and long shifts predicted turnover intentions one year later.")
+
+def _article(pmid, title="Burnout and supervisor support among hospital nurses", abstract=ABSTRACT, **fields):
+    return {"pmid": pmid, "title": title, "abstract": abstract, **fields}
+
+def test_signature_similarity_tracks_text_overlap():
+    hasher = MinHasher(num_perm=128)
+    original = hasher.signature(ABSTRACT)
+    reprint = hasher.signature(ABSTRACT + " Reprinted with permission.")
+    unrelated = hasher.signature("Remote work arrangements and team communication in software firms")
+
+    assert hasher.similarity(original, reprint) > 0.85
+    assert hasher.similarity(original, unrelated) < 0.1
+    assert hasher.signature("") is None
+    assert (hasher.decode(hasher.encode(original)) == original).all()
+
+def test_lsh_index_returns_only_matches_above_threshold():
+    hasher = MinHasher(num_perm=128)
+    index = LSHIndex(num_perm=128, bands=16)
+    index.add("1", hasher.signature(ABSTRACT))
+    index.add("2", hasher.signature("Remote work arrangements and team communication in software firms"))
+
+    key, similarity = index.query(hasher.signature(ABSTRACT + " Erratum."), threshold=0.85)
+    assert key == "1" and similarity >= 0.85
+    assert index.query(hasher.signature(ABSTRACT), threshold=0.85, exclude="1") is None
+
+def test_deduplicator_loads_stored_signatures_once():
+    hasher = MinHasher(num_perm=128)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return [("1", hasher.encode(hasher.signature(f"{_article('1')['title']} {ABSTRACT}")))]
+
+    dedup = Deduplicator(load, hasher=hasher, threshold=0.85, bands=16)
+    dedup.ensure_loaded()
+    dedup.ensure_loaded()
+
+    assert loads == [1]
+    assert dedup.find(dedup.signature(_article("2"))) == "1"
+    # Re-ingesting the same PMID is not a duplicate of itself
+    assert dedup.find(dedup.signature(_article("1")), pmid="1") is None
+
+def test_collapse_keeps_first_of_each_duplicate_group():
+    articles = [
+        _article("1"),
+        _article("2", title="Burnout and supervisor support among hospital nurses [Reprint]"),
+        _article("1"),
+        _article("3", title="Psychological safety in agile teams", abstract="Teams with higher safety shipped faster."),
+        _article("4", title="Erratum", abstract="", duplicate_of="3"),
+    ]
+
+    assert [a["pmid"] for a in collapse_duplicates(articles, threshold=0.85)] == ["1", "3"]
+    assert [a["pmid"] for a in collapse_duplicates(articles[1:], exclude=articles[:1], threshold=0.85)] == ["3"]
@@ -0,0 +1,83 @@
+import base64
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from src.services.duckdb_engine import DuckDBQueryEngine
+from src.utils.graph_rendering import render_graph
+
+pytestmark = pytest.mark.skipif(not DuckDBQueryEngine.available(), reason="duckdb not installed")
+
+@pytest.fixture
+def hr_frame():
+    rng = np.random.default_rng(3)
+    n = 20_000
+    salary = rng.normal(60000, 8000, size=n)
+    salary[rng.choice(n, 100, replace=False)] = np.nan
+    return pd.DataFrame({
+        'day': np.arange(n),
+        'tenure': rng.gamma(2.0, 3.0, size=n),
+        'salary': salary,
+        'department': rng.choice(['HR', 'IT', 'Sales'], size=n)
+    })
+
+@pytest.fixture
+def table(hr_frame):
+    return pa.Table.from_pandas(hr_frame, preserve_index=False)
+
+def _decode(encoded):
+    return np.frombuffer(base64.b64decode(encoded['bdata']), dtype={'f4': np.float32, 'f8': np.float64}[encoded['dtype']])
+
+def test_analyze_matches_pandas(hr_frame, table):
+    result = DuckDBQueryEngine(threads=2).analyze_data(table)
+    numeric = hr_frame.select_dtypes('number')
+    expected = numeric.describe()
+
+    assert result['missing_values'] == hr_frame.isnull().sum().to_dict()
+    for col in numeric.columns:
+        for stat, value in expected[col].items():
+            assert result['summary'][col][stat] == pytest.approx(value, rel=1e-9)
+    corr = numeric.corr()
+    for col in corr.columns:
+        for row in corr.index:
+            assert result['correlation'][col][row] == pytest.approx(corr[col][row], abs=1e-9)
+
+def test_bar_matches_pandas_path(hr_frame, table):
+    engine = DuckDBQueryEngine(threads=2)
+    figure = engine.generate_graph(table, "bar", "department", "salary")
+    expected = render_graph(hr_frame, "bar", "department", "salary")
+
+    got = dict(zip(figure['data'][0]['x'], _decode(figure['data'][0]['y'])))
+    want = dict(zip(expected['data'][0]['x'], _decode(expected['data'][0]['y'])))
+    assert got.keys() == want.keys()
+    for key in want:
+        assert got[key] == pytest.approx(want[key])
+
+def test_box_matches_pandas_path(hr_frame, table):
+    engine = DuckDBQueryEngine(threads=2)
+    figure = engine.generate_graph(table, "box", "department", "salary")
+    expected = render_graph(hr_frame, "box", "department", "salary")
+
+    got, want = figure['data'][0], expected['data'][0]
+    order = [got['x'].index(category) for category in want['x']]
+    for stat in ('q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean'):
+        np.testing.assert_allclose(_decode(got[stat])[order], _decode(want[stat]))
+
+def test_histogram_counts_all_rows(table):
+    figure = DuckDBQueryEngine().generate_graph(table, "histogram", "tenure", color_col="department", bins=30)
+    assert sum(_decode(trace['y']).sum() for trace in figure['data']) == table.num_rows
+    assert figure['layout']['meta']['rows'] == table.num_rows
+
+def test_dense_scatter_is_binned_in_sql(table):
+    figure = DuckDBQueryEngine().generate_graph(table, "scatter", "tenure", "salary", max_points=1000, bins=40)
+    trace = figure['data'][0]
+    assert trace['type'] == 'heatmap'
+    assert _decode(trace['z']).sum() == table.num_rows - 100
+
+def test_line_is_bounded(table):
+    figure = DuckDBQueryEngine().generate_graph(table, "line", "day", "salary", max_points=500)
+    assert len(_decode(figure['data'][0]['x'])) <= 500
+
+def test_unknown_column(table):
+    with pytest.raises(ValueError):
+        DuckDBQueryEngine().generate_graph(table, "bar", "missing", "salary")
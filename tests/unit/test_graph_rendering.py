@@ -0,0 +1,121 @@
+import json
+import base64
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.graph_rendering import lttb_indices, render_graph, typed_array
+
+@pytest.fixture
+def large_frame():
+    rng = np.random.default_rng(0)
+    n = 200_000
+    return pd.DataFrame({
+        'day': np.arange(n),
+        'headcount': np.cumsum(rng.normal(size=n)),
+        'salary': rng.normal(60000, 8000, size=n),
+        'department': rng.choice(['HR', 'IT', 'Sales'], size=n)
+    })
+
+def _decode(encoded):
+    dtype = {'f4': np.float32, 'f8': np.float64}[encoded['dtype']]
+    return np.frombuffer(base64.b64decode(encoded['bdata']), dtype=dtype)
+
+def test_typed_array_round_trip():
+    values = np.array([1.5, 2.5, -3.0])
+    encoded = typed_array(values)
+    assert encoded['dtype'] == 'f8'
+    np.testing.assert_array_equal(_decode(encoded), values)
+
+def test_typed_array_keeps_strings_as_lists():
+    assert typed_array(np.array(['HR', 'IT'], dtype=object)) == ['HR', 'IT']
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[500] = 100.0
+    keep = lttb_indices(x, y, 50)
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert 500 in keep
+
+@pytest.mark.parametrize("graph_type,kwargs", [
+    ("line", {"x_col": "day", "y_col": "headcount", "color_col": "department"}),
+    ("scatter", {"x_col": "day", "y_col": "salary"}),
+    ("histogram", {"x_col": "salary", "color_col": "department"}),
+    ("box", {"x_col": "department", "y_col": "salary"}),
+    ("bar", {"x_col": "department", "y_col": "salary"}),
+])
+def test_payload_is_bounded_by_resolution(large_frame, graph_type, kwargs):
+    figure = render_graph(large_frame, graph_type, max_points=2000, bins=100, **kwargs)
+    payload = json.dumps(figure)
+    assert len(payload) < 200_000
+    assert figure['layout']['meta']['rows'] == len(large_frame)
+
+def test_line_uses_webgl(large_frame):
+    figure = render_graph(large_frame, "line", "day", "headcount", max_points=900)
+    trace = figure['data'][0]
+    assert trace['type'] == 'scattergl'
+    assert len(_decode(trace['x'])) == 900
+
+def test_dense_scatter_becomes_density(large_frame):
+    figure = render_graph(large_frame, "scatter", "day", "salary", max_points=1000, bins=50)
+    trace = figure['data'][0]
+    assert trace['type'] == 'heatmap'
+    assert trace['z']['shape'] == '50,50'
+    assert _decode(trace['z']).sum() == len(large_frame)
+
+def test_histogram_counts_all_rows(large_frame):
+    figure = render_graph(large_frame, "histogram", "salary", bins=40)
+    assert _decode(figure['data'][0]['y']).sum() == len(large_frame)
+
+def test_box_quartiles_match_numpy(large_frame):
+    figure = render_graph(large_frame, "box", "department", "salary")
+    trace = figure['data'][0]
+    for i, department in enumerate(trace['x']):
+        values = large_frame.loc[large_frame['department'] == department, 'salary']
+        assert _decode(trace['median'])[i] == pytest.approx(values.median())
+
+def test_unsupported_graph_type(large_frame):
+    with pytest.raises(ValueError):
+        render_graph(large_frame, "pie", "department")
+
+@pytest.fixture
+def dated_frame():
+    rng = np.random.default_rng(1)
+    n = 1000
+    frame = pd.DataFrame({
+        'hired': pd.date_range('2020-01-01', periods=n, freq='D'),
+        'salary': rng.normal(60000, 8000, size=n)
+    })
+    frame.loc[10, 'hired'] = pd.NaT
+    return frame
+
+def test_histogram_ignores_missing_dates(dated_frame):
+    figure = render_graph(dated_frame, "histogram", "hired", bins=20)
+    counts = _decode(figure['data'][0]['y'])
+    assert counts.sum() == len(dated_frame) - 1
+    assert counts.max() < len(dated_frame) / 2
+    assert min(figure['data'][0]['x']) >= '2020'
+
+def test_density_ignores_missing_dates(dated_frame):
+    figure = render_graph(dated_frame, "scatter", "hired", "salary", max_points=100, bins=10)
+    trace = figure['data'][0]
+    assert trace['type'] == 'heatmap'
+    assert _decode(trace['z']).sum() == len(dated_frame) - 1
+    assert min(trace['x']) >= '2020'
+
+def test_line_drops_missing_dates(dated_frame):
+    figure = render_graph(dated_frame, "line", "hired", "salary", max_points=100)
+    x = figure['data'][0]['x']
+    assert len(x) == 100
+    assert 'NaT' not in x
+    assert min(x) >= '2020'
+
+def test_categorical_scatter_samples_across_all_rows(large_frame):
+    figure = render_graph(large_frame, "scatter", "department", "day", max_points=1000)
+    trace = figure['data'][0]
+    assert trace['type'] == 'scattergl'
+    assert trace['meta'] == {'sampled': True}
+    days = _decode(trace['y'])
+    assert len(days) == 1000
+    assert days.min() == 0 and days.max() == len(large_frame) - 1
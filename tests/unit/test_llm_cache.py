@@ -0,0 +1,129 @@
+import threading
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.utils.llm_cache import (
+    LLMCompletionCache, MemoryCompletionBackend, SQLiteCompletionBackend, completion_key
+)
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _messages(text):
+    return [{"role": "user", "content": text}]
+
+def test_key_ignores_whitespace_but_not_model_or_temperature():
+    key = completion_key("claude", 0, _messages("burnout  in\n nurses"))
+    assert key == completion_key("claude", 0, _messages(" burnout in nurses "))
+    assert key != completion_key("claude", 0.7, _messages("burnout in nurses"))
+    assert key != completion_key("gpt", 0, _messages("burnout in nurses"))
+    assert key != completion_key("claude", 0, _messages("burnout in nurses"), max_tokens=10)
+
+def test_deterministic_calls_are_served_from_cache():
+    cache = LLMCompletionCache(MemoryCompletionBackend(maxsize=10, ttl=60))
+    calls = []
+    complete = lambda: calls.append(1) or "answer"
+
+    assert cache.call("chat", "claude", 0, _messages("q"), complete) == "answer"
+    assert cache.call("chat", "claude", 0, _messages("q"), complete) == "answer"
+
+    assert len(calls) == 1
+    summary = cache.summary()["chat"]
+    assert (summary["hits"], summary["misses"]) == (1, 1)
+    assert summary["saved_seconds"] >= 0
+
+def test_sampled_calls_need_opt_in():
+    cache = LLMCompletionCache(MemoryCompletionBackend(maxsize=10, ttl=60))
+    calls = []
+    complete = lambda: calls.append(1) or f"answer {len(calls)}"
+
+    cache.call("chat", "claude", 0.7, _messages("q"), complete)
+    cache.call("chat", "claude", 0.7, _messages("q"), complete)
+    assert len(calls) == 2
+    assert cache.summary()["chat"]["bypassed"] == 2
+
+    cache.call("chat", "claude", 0.7, _messages("q"), complete, opt_in=True)
+    assert cache.call("chat", "claude", 0.7, _messages("q"), complete, opt_in=True) == "answer 3"
+    assert len(calls) == 3
+
+def test_disabled_cache_always_calls_the_model():
+    cache = LLMCompletionCache(None)
+    assert cache.call("chat", "claude", 0, _messages("q"), lambda: "fresh") == "fresh"
+    assert cache.langchain_cache("research", "gpt", 0) is False
+    assert cache.summary() == {}
+
+def test_sqlite_backend_survives_restart_and_expires(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "llm.sqlite3")
+    first = SQLiteCompletionBackend(path, ttl=100, clock=clock)
+    first.put("k", "claude", "cached answer", 2.5)
+    first.close()
+
+    second = SQLiteCompletionBackend(path, ttl=100, clock=clock)
+    assert second.get("k") == ("cached answer", 2.5)
+    clock.now += 101
+    assert second.get("k") is None
+    assert second.purge_expired() == 1
+
+def test_sqlite_backend_purges_expired_rows_at_startup_and_from_put(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "llm.sqlite3")
+    first = SQLiteCompletionBackend(path, ttl=100, clock=clock, purge_interval=50)
+    first.put("old", "claude", "stale", 1.0)
+    first.close()
+    clock.now += 101
+
+    second = SQLiteCompletionBackend(path, ttl=100, clock=clock, purge_interval=50)
+    rows = lambda: second.connection.execute("SELECT key FROM completions").fetchall()
+    assert rows() == []
+
+    second.put("a", "claude", "x", 1.0)
+    clock.now += 101
+    second.put("b", "claude", "y", 1.0)
+    assert rows() == [("b",)]
+
+def test_memory_backend_evicts_to_target():
+    backend = MemoryCompletionBackend(maxsize=100, ttl=60)
+    for i in range(50):
+        backend.put(str(i), "gpt", "x" * 1000, 1.0)
+    backend.evict(backend.size_bytes() // 2)
+    assert len(backend.cache) <= 25
+
+@pytest.mark.asyncio
+async def test_langchain_model_reads_and_writes_the_shared_cache():
+    cache = LLMCompletionCache(MemoryCompletionBackend(maxsize=10, ttl=60))
+    llm = FakeListChatModel(responses=['{"analysis_type": "analysis"}', "second response"],
+                            cache=cache.langchain_cache("data_analysis", "gpt", 0))
+    prompt = [SystemMessage(content="Plan the analysis"), HumanMessage(content="summary  statistics")]
+
+    first = await llm.ainvoke(prompt)
+    second = await llm.ainvoke([SystemMessage(content="Plan the analysis"), HumanMessage(content="summary statistics")])
+
+    assert first.content == second.content == '{"analysis_type": "analysis"}'
+    assert cache.summary()["data_analysis"]["hits"] == 1
+    assert "research_chat_llm_cache_requests_total{site=\"data_analysis\",result=\"hit\"} 1" in cache.render_prometheus()
+
+def test_langchain_cache_is_off_for_sampled_models_unless_opted_in():
+    cache = LLMCompletionCache(MemoryCompletionBackend(maxsize=10, ttl=60))
+    assert cache.langchain_cache("research", "gpt", 0.7) is False
+    assert cache.langchain_cache("research", "gpt", 0.7, opt_in=True) is not False
+
+@pytest.mark.asyncio
+async def test_langchain_sqlite_lookups_run_off_the_event_loop(tmp_path):
+    backend = SQLiteCompletionBackend(str(tmp_path / "llm.sqlite3"), ttl=60)
+    threads = []
+    get, put = backend.get, backend.put
+    backend.get = lambda *args: threads.append(threading.get_ident()) or get(*args)
+    backend.put = lambda *args: threads.append(threading.get_ident()) or put(*args)
+    cache = LLMCompletionCache(backend)
+    llm = FakeListChatModel(responses=["answer"], cache=cache.langchain_cache("research", "gpt", 0))
+
+    await llm.ainvoke([HumanMessage(content="q")])
+    assert (await llm.ainvoke([HumanMessage(content="q")])).content == "answer"
+
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
@@ -0,0 +1,64 @@
+import time
+import asyncio
+import pytest
+from benchmarks.load_test import LoopLagMonitor, RouteStats, run_closed_loop, run_open_loop
+
+@pytest.mark.asyncio
+async def test_closed_loop_keeps_concurrency_and_counts_errors():
+    in_flight, peak = 0, 0
+
+    async def call(i):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+        if i % 5 == 4:
+            raise RuntimeError("backend down")
+        return "500" if i % 5 == 3 else "200"
+
+    stats = await run_closed_loop(call, concurrency=4, duration=10, max_requests=40)
+    report = stats.report(1.0, [])
+
+    assert peak == 4
+    assert report["requests"] == 40
+    assert report["status_codes"] == {"200": 24, "500": 8, "exception:RuntimeError": 8}
+    assert report["error_rate"] == 0.4
+
+@pytest.mark.asyncio
+async def test_open_loop_latency_includes_waiting_for_a_slot():
+    async def call(i):
+        await asyncio.sleep(0.02)
+        return "200"
+
+    stats = await run_open_loop(call, rate=500, duration=0.1, max_in_flight=1)
+
+    assert len(stats.latencies) > 10
+    # Arrivals outpace a single slot, so later requests queue behind earlier ones
+    assert max(stats.queue_waits) > 0.1
+    assert max(stats.latencies) > max(stats.queue_waits)
+
+@pytest.mark.asyncio
+async def test_lag_monitor_sees_blocking_calls():
+    monitor = LoopLagMonitor(interval=0.005)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    assert max(monitor.samples) >= 0.08
+
+@pytest.mark.asyncio
+async def test_lag_monitor_counts_a_loop_that_never_yields():
+    monitor = LoopLagMonitor(interval=0.005)
+    monitor.start()
+    time.sleep(0.05)
+    await monitor.stop()
+
+    assert monitor.samples and monitor.samples[-1] >= 0.04
+
+def test_empty_route_report():
+    report = RouteStats().report(1.0, [])
+    assert report["requests"] == 0
+    assert report["latency"] == {}
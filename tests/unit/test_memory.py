@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import numpy as np
+import pytest
+from cachetools import TTLCache
+from src.utils.memory import CacheRegistry, MemoryMonitor, approximate_size, mapping_size
+
+MB = 1024 * 1024
+
+class FakeCache:
+    def __init__(self, size):
+        self.size = size
+        self.targets = []
+
+    def evict(self, target_bytes):
+        self.targets.append(target_bytes)
+        self.size = min(self.size, target_bytes)
+
+def _monitor(registry, rss):
+    return MemoryMonitor(registry, limit_bytes=1000 * MB, high_watermark=0.8, low_watermark=0.6,
+                         history_size=3, rss=lambda: rss[0])
+
+def test_sheds_lowest_priority_first_down_to_low_watermark():
+    registry = CacheRegistry()
+    search, completions, plans = FakeCache(100 * MB), FakeCache(300 * MB), FakeCache(50 * MB)
+    registry.register("search_results", lambda: search.size, search.evict, priority=10)
+    registry.register("llm_completions", lambda: completions.size, completions.evict, priority=25)
+    registry.register("analysis_plans", lambda: plans.size, plans.evict, priority=30)
+    monitor = _monitor(registry, [900 * MB])
+
+    sample = monitor.check()
+
+    # 900 MB RSS down to 600 MB: all of search results, then 200 MB of LLM completions
+    assert sample["shed"] == {"search_results": 100 * MB, "llm_completions": 200 * MB}
+    assert search.size == 0
+    assert completions.size == 100 * MB
+    assert plans.targets == []
+    assert monitor.shed_events == 1
+
+def test_no_shedding_below_high_watermark_and_bounded_history():
+    registry = CacheRegistry()
+    cache = FakeCache(10 * MB)
+    registry.register("search_results", lambda: cache.size, cache.evict)
+    rss = [500 * MB]
+    monitor = _monitor(registry, rss)
+
+    for value in (500, 700, 790, 600):
+        rss[0] = value * MB
+        monitor.check()
+
+    history = monitor.history()
+    assert [s["rss_bytes"] for s in history] == [700 * MB, 790 * MB, 600 * MB]
+    assert all(s["caches"] == {"search_results": 10 * MB} and not s["shed"] for s in history)
+    assert cache.targets == []
+
+@pytest.mark.asyncio
+async def test_loop_bound_mapping_is_shrunk_on_its_loop():
+    registry = CacheRegistry()
+    plans = TTLCache(maxsize=1000, ttl=60)
+    for i in range(100):
+        plans[("request", i)] = {"graph_type": "bar", "x_col": f"column_{i}"}
+    registry.register_mapping("analysis_plans", plans, priority=30)
+    registry.attach_loop(asyncio.get_running_loop())
+
+    evicted_on = []
+    registry.register("loop_bound", lambda: 1, lambda target: evicted_on.append(threading.get_ident()),
+                      priority=0, thread_safe=False)
+
+    estimate = mapping_size(plans)
+    # Shedding runs on the monitor thread; the evictions are handed to the loop
+    await asyncio.to_thread(registry.shed, estimate // 2 + 1)
+    await asyncio.sleep(0)
+
+    assert 40 <= len(plans) <= 60
+    assert evicted_on == [threading.get_ident()]
+
+def test_approximate_size_uses_buffers():
+    array = np.zeros(1_000_000, dtype=np.float32)
+    assert approximate_size(array) == 4_000_000
+    assert approximate_size({"a": [array, array]}) > 8_000_000
+
+def test_prometheus_gauges():
+    registry = CacheRegistry()
+    cache = FakeCache(5 * MB)
+    registry.register("llm_completions", lambda: cache.size, cache.evict)
+    monitor = _monitor(registry, [950 * MB])
+    monitor.check()
+
+    text = monitor.render_prometheus()
+
+    assert f"research_chat_process_rss_bytes {950 * MB}" in text
+    assert f'research_chat_cache_bytes{{cache="llm_completions"}} {5 * MB}' in text
+    assert f'research_chat_cache_shed_bytes_total{{cache="llm_completions"}} {5 * MB}' in text
@@ -0,0 +1,30 @@
+from datetime import datetime
+from src.db.partitions import Partition, add_months, expired_partitions, parse_bound, plan_partitions
+
+def test_add_months_crosses_year_boundaries():
+    assert add_months(datetime(2024, 11, 1), 3) == datetime(2025, 2, 1)
+    assert add_months(datetime(2024, 2, 1), -14) == datetime(2022, 12, 1)
+
+def test_parse_bound_reads_minvalue_and_timestamps():
+    assert parse_bound("FOR VALUES FROM (MINVALUE) TO ('2024-03-01 00:00:00')") == (None, datetime(2024, 3, 1))
+    assert parse_bound("FOR VALUES FROM ('2024-03-01 00:00:00') TO ('2024-04-01 00:00:00')") == (
+        datetime(2024, 3, 1), datetime(2024, 4, 1))
+
+def test_plan_skips_months_covered_by_legacy_range():
+    legacy = Partition("search_history_legacy", None, datetime(2024, 5, 1))
+    planned = plan_partitions("search_history", [legacy], datetime(2024, 3, 17), months_ahead=3)
+
+    assert [p.name for p in planned] == ["search_history_y2024m05", "search_history_y2024m06"]
+    assert planned[0].start == datetime(2024, 5, 1) and planned[0].end == datetime(2024, 6, 1)
+
+def test_expired_partitions_respect_retention():
+    existing = [
+        Partition("search_history_legacy", None, datetime(2023, 1, 1)),
+        Partition("search_history_y2023m01", datetime(2023, 1, 1), datetime(2023, 2, 1)),
+        Partition("search_history_y2024m06", datetime(2024, 6, 1), datetime(2024, 7, 1)),
+    ]
+    now = datetime(2025, 2, 10)
+
+    assert [p.name for p in expired_partitions(existing, now, 24)] == ["search_history_legacy", "search_history_y2023m01"]
+    assert [p.name for p in expired_partitions(existing, now, 25)] == ["search_history_legacy"]
+    assert expired_partitions(existing, now, 0) == []
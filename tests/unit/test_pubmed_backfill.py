@@ -0,0 +1,101 @@
+import json
+import time
+import asyncio
+import pytest
+from src.jobs.pubmed_backfill import BackfillCheckpoint, PubMedBackfill, RateLimiter
+from tests.unit.pubmed_fakes import FakeDatabase, FakePubMedService, FakeVectorStore
+
+def _backfill(service, db, vectors, checkpoint_path, **kwargs):
+    kwargs.setdefault("concurrency", {"fetch": 2, "parse": 2, "embed": 1, "store": 2, "upsert": 2})
+    return PubMedBackfill(
+        service,
+        store_articles=db.store,
+        vector_store=vectors,
+        checkpoint=BackfillCheckpoint(str(checkpoint_path)),
+        batch_size=kwargs.pop("batch_size", 10),
+        requests_per_second=0,
+        retry_backoff=0,
+        **kwargs
+    )
+
+@pytest.mark.asyncio
+async def test_ingests_every_article_through_all_stages(tmp_path):
+    service, db, vectors = FakePubMedService(95), FakeDatabase(), FakeVectorStore()
+    backfill = _backfill(service, db, vectors, tmp_path / "checkpoint.json")
+
+    report = await backfill.run("engagement")
+
+    assert len(db.rows) == 95
+    assert len(vectors.vectors) == 95
+    assert report["ingested_articles"] == 95
+    assert report["lag_articles"] == 0
+    assert not report["failed_batches"]
+    state = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert state["completed"] == list(range(0, 95, 10))
+    assert state["count"] == 95
+
+@pytest.mark.asyncio
+async def test_resume_refetches_only_unfinished_batches(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    service, db = FakePubMedService(50), FakeDatabase()
+    vectors = FakeVectorStore(fail_first={21})
+
+    first = await _backfill(service, db, vectors, checkpoint_path).run("engagement")
+    assert set(first["failed_batches"]) == {20}
+    assert len(vectors.vectors) == 40
+
+    resumed_service = FakePubMedService(50)
+    second = await _backfill(resumed_service, db, vectors, checkpoint_path).run("engagement")
+
+    assert resumed_service.fetch_calls == [20]
+    # The search stays pinned to the first run's date range
+    assert resumed_service.esearch_calls[0][1] == service.esearch_calls[0][1]
+    assert second["ingested_articles"] == 10
+    assert len(vectors.vectors) == 50
+
+@pytest.mark.asyncio
+async def test_changed_term_starts_a_fresh_checkpoint(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    db, vectors = FakeDatabase(), FakeVectorStore()
+    await _backfill(FakePubMedService(30), db, vectors, checkpoint_path).run("engagement")
+
+    service = FakePubMedService(30)
+    await _backfill(service, db, vectors, checkpoint_path).run("turnover")
+
+    assert sorted(service.fetch_calls) == [0, 10, 20]
+
+@pytest.mark.asyncio
+async def test_bounded_queues_apply_backpressure(tmp_path):
+    service, db = FakePubMedService(400), FakeDatabase()
+    vectors = FakeVectorStore(delay=0.01)
+    backfill = _backfill(service, db, vectors, tmp_path / "checkpoint.json", queue_size=2,
+                         concurrency={"fetch": 4, "parse": 1, "embed": 1, "store": 1, "upsert": 1})
+
+    ahead = []
+    efetch = service.efetch_history
+    def tracked_efetch(*args):
+        ahead.append(len(service.fetch_calls) - backfill.stats["upsert"].batches)
+        return efetch(*args)
+    service.efetch_history = tracked_efetch
+
+    await backfill.run("engagement")
+
+    assert len(vectors.vectors) == 400
+    # Batches between fetch and upsert never exceed queue slots plus busy workers
+    assert max(ahead) <= 4 * 2 + 4 + 1 + 1 + 1 + 1
+
+@pytest.mark.asyncio
+async def test_max_articles_limits_the_last_page(tmp_path):
+    service, db, vectors = FakePubMedService(100), FakeDatabase(), FakeVectorStore()
+
+    report = await _backfill(service, db, vectors, tmp_path / "checkpoint.json").run("engagement", max_articles=25)
+
+    assert report["ingested_articles"] == 25
+    assert sorted(vectors.vectors, key=int)[-1] == "25"
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(rate=50)
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.wait() for _ in range(6)])
+    assert time.monotonic() - start >= 5 / 50 * 0.9
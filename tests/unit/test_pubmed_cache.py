@@ -0,0 +1,84 @@
+import pytest
+from src.services.pubmed_cache import PubMedResponseCache, split_medline
+
+MEDLINE = """PMID- 111
+TI  - Burnout in nurses
+AB  - Abstract one
+      continued
+
+PMID- 222
+TI  - Engagement and turnover
+AU  - Smith J
+"""
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = PubMedResponseCache(str(tmp_path / "pubmed.sqlite3"), search_ttl=60, record_ttl=3600, clock=clock)
+    yield cache
+    cache.close()
+
+def test_split_medline_keys_records_by_pmid():
+    records = split_medline(MEDLINE)
+
+    assert list(records) == ["111", "222"]
+    assert "continued" in records["111"]
+    assert records["222"].startswith("PMID- 222")
+
+def test_search_ids_expire_after_short_ttl(cache, clock):
+    cache.put_search("burnout  AND nurses", 5, ["111", "222"])
+
+    assert cache.get_search("burnout AND nurses", 5) == ["111", "222"]
+    assert cache.get_search("burnout AND nurses", 10) is None
+
+    clock.now += 61
+    assert cache.get_search("burnout AND nurses", 5) is None
+    assert cache.stats()["searches"]["hits"] == 1
+
+def test_records_served_per_pmid(cache, clock):
+    cache.put_records(split_medline(MEDLINE))
+
+    found = cache.get_records(["111", "333", "222"])
+
+    assert set(found) == {"111", "222"}
+    assert cache.stats()["records"]["misses"] == 1
+
+    clock.now += 3601
+    assert cache.get_records(["111"]) == {}
+    assert cache.purge_expired() == 2
+
+def test_failed_write_rolls_back(cache):
+    with pytest.raises(Exception):
+        # The second record cannot be bound, so the batch fails after its first insert
+        cache.put_records({"111": "PMID- 111", "222": object()})
+
+    assert cache.get_records(["111"]) == {}
+    cache.put_records(split_medline(MEDLINE))
+    assert set(cache.get_records(["111", "222"])) == {"111", "222"}
+
+def test_cache_persists_across_instances(tmp_path, clock):
+    path = str(tmp_path / "pubmed.sqlite3")
+    first = PubMedResponseCache(path, search_ttl=60, record_ttl=3600, clock=clock)
+    first.put_search("turnover", 5, ["222"])
+    first.put_records(split_medline(MEDLINE))
+    first.close()
+
+    second = PubMedResponseCache(path, search_ttl=60, record_ttl=3600, clock=clock)
+    assert second.get_search("turnover", 5) == ["222"]
+    assert set(second.get_records(["111", "222"])) == {"111", "222"}
+    second.close()
+
+def test_large_lookups_are_chunked(cache):
+    cache.put_records({str(pmid): f"PMID- {pmid}\n" for pmid in range(1200)})
+
+    assert len(cache.get_records([str(pmid) for pmid in range(1500)])) == 1200
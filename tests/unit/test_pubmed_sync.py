@@ -0,0 +1,119 @@
+import time
+import pytest
+from datetime import datetime
+from src.jobs.pubmed_backfill import PubMedBackfill
+from src.jobs.pubmed_sync import PubMedSync
+from tests.unit.pubmed_fakes import FakeDatabase, FakePubMedService, FakeVectorStore, medline_record
+
+class FakeEntrezCorpus(FakePubMedService):
+    """PubMed stand-in whose articles carry an entry date, searchable by date window"""
+    def __init__(self, entry_dates):
+        super().__init__(0)
+        self.entry_dates = entry_dates
+        self.windows = []
+        self.searches = []
+        self.result = []
+
+    def _select(self, mindate, maxdate):
+        self.windows.append((mindate, maxdate))
+        self.result = sorted(
+            pmid for pmid, entered in self.entry_dates.items()
+            if (mindate is None or entered >= mindate) and entered <= maxdate
+        )
+        return len(self.result), "WEBENV", "3"
+
+    def esearch_history(self, term, mindate=None, maxdate=None, datetype="edat", webenv=None):
+        self.searches.append((term, datetype, webenv))
+        if term.startswith("#"):
+            # Union of the entry- and modification-date searches
+            return len(self.result), "WEBENV", "3"
+        return self._select(mindate, maxdate)
+
+    def efetch_history(self, webenv, query_key, retstart, retmax):
+        self.fetch_calls.append(retstart)
+        return "\n".join(medline_record(pmid) for pmid in self.result[retstart:retstart + retmax])
+
+class FakeWatermarkTable:
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, topic):
+        return self.rows.get(topic)
+
+    def advance(self, topic, query, synced_through, articles):
+        row = self.rows.setdefault(topic, {"topic": topic, "total_articles": 0})
+        row.update(query=query, synced_through=synced_through, last_run_articles=articles)
+        row["total_articles"] += articles
+        return dict(row)
+
+def _sync(corpus, vectors, table):
+    pipeline = PubMedBackfill(corpus, store_articles=FakeDatabase().store, vector_store=vectors,
+                              batch_size=10, requests_per_second=0, retry_backoff=0)
+    return PubMedSync(pipeline, table.get, table.advance)
+
+@pytest.mark.asyncio
+async def test_first_sync_loads_everything_then_only_new_entries():
+    corpus = FakeEntrezCorpus({pmid: "2024/01/10" for pmid in range(1, 26)})
+    vectors, table = FakeVectorStore(), FakeWatermarkTable()
+    sync = _sync(corpus, vectors, table)
+
+    first = await sync.sync_topic("hr_io", "engagement", until=datetime(2024, 1, 15))
+    assert first["ingested_articles"] == 25
+    assert table.rows["hr_io"]["synced_through"] == datetime(2024, 1, 15)
+
+    corpus.entry_dates.update({pmid: "2024/01/20" for pmid in range(26, 31)})
+    second = await sync.sync_topic("hr_io", "engagement", until=datetime(2024, 1, 21))
+
+    assert corpus.windows[-1] == ("2024/01/15", "2024/01/21")
+    assert second["ingested_articles"] == 5
+    assert second["advanced"]
+    assert table.rows["hr_io"]["total_articles"] == 30
+    assert len(vectors.vectors) == 30
+
+@pytest.mark.asyncio
+async def test_failed_batch_keeps_watermark():
+    corpus = FakeEntrezCorpus({pmid: "2024/01/10" for pmid in range(1, 21)})
+    table = FakeWatermarkTable()
+    table.advance("hr_io", "engagement", datetime(2024, 1, 1), 0)
+    sync = _sync(corpus, FakeVectorStore(fail_first={11}), table)
+
+    report = await sync.sync_topic("hr_io", "engagement", until=datetime(2024, 1, 15))
+
+    assert not report["advanced"]
+    assert table.rows["hr_io"]["synced_through"] == datetime(2024, 1, 1)
+
+@pytest.mark.asyncio
+async def test_changed_query_resyncs_from_scratch():
+    corpus = FakeEntrezCorpus({1: "2020/05/01", 2: "2024/01/10"})
+    table = FakeWatermarkTable()
+    table.advance("hr_io", "engagement", datetime(2024, 1, 1), 0)
+    sync = _sync(corpus, FakeVectorStore(), table)
+
+    report = await sync.sync_topic("hr_io", "turnover", until=datetime(2024, 1, 15))
+
+    assert corpus.windows[-1] == (None, "2024/01/15")
+    assert report["ingested_articles"] == 2
+
+@pytest.mark.asyncio
+async def test_incremental_search_takes_a_rate_limit_slot_per_request(monkeypatch):
+    from src.jobs import pubmed_backfill
+    waits = []
+
+    class CountingLimiter(pubmed_backfill.RateLimiter):
+        async def wait(self):
+            waits.append(time.monotonic())
+            await super().wait()
+
+    monkeypatch.setattr(pubmed_backfill, "RateLimiter", CountingLimiter)
+    corpus = FakeEntrezCorpus({pmid: "2024/01/10" for pmid in range(1, 6)})
+    table = FakeWatermarkTable()
+    table.advance("hr_io", "engagement", datetime(2024, 1, 1), 0)
+    sync = _sync(corpus, FakeVectorStore(), table)
+
+    await sync.sync_topic("hr_io", "engagement", until=datetime(2024, 1, 15))
+
+    assert [(term, datetype) for term, datetype, _ in corpus.searches] == [
+        ("engagement", "edat"), ("engagement", "mdat"), ("#3 OR #3", "edat")
+    ]
+    # Three searches and one efetch page
+    assert len(waits) == len(corpus.searches) + len(corpus.fetch_calls) == 4
@@ -0,0 +1,64 @@
+import pytest
+import numpy as np
+from src.utils.quantization import QuantizedVectorStore
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(42)
+    return rng.normal(size=(500, 32)).astype(np.float32)
+
+def _ids(n):
+    return [f"pmid{i}" for i in range(n)]
+
+@pytest.mark.parametrize("dtype,expected_bytes", [("float16", 2), ("int8", 1)])
+def test_memory_per_dimension(vectors, dtype, expected_bytes):
+    store = QuantizedVectorStore(dimension=32, dtype=dtype)
+    store.add(_ids(len(vectors)), vectors)
+    assert store.codes.nbytes == len(vectors) * 32 * expected_bytes
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_search_finds_exact_match(vectors, dtype):
+    store = QuantizedVectorStore(dimension=32, dtype=dtype)
+    store.add(_ids(len(vectors)), vectors)
+
+    results = store.search(vectors[7], top_k=3)
+    assert results[0][0] == "pmid7"
+    assert results[0][1] == pytest.approx(1.0, abs=0.02)
+
+def test_int8_dequantize_error_is_bounded(vectors):
+    store = QuantizedVectorStore(dimension=32, dtype="int8", metric="dotproduct")
+    store.add(_ids(len(vectors)), vectors)
+
+    error = np.abs(store.dequantize(store.codes) - vectors)
+    assert np.all(error <= store.scale / 2 + 1e-6)
+
+def test_rescore_returns_exact_scores(vectors):
+    store = QuantizedVectorStore(dimension=32, dtype="int8", keep_full_precision=True)
+    store.add(_ids(len(vectors)), vectors)
+
+    query = vectors[3] + 0.1
+    exact = vectors @ (query / np.linalg.norm(query))
+    exact /= np.linalg.norm(vectors, axis=1)
+
+    results = store.search(query, top_k=5, rescore=True)
+    assert [i for i, _ in results] == [f"pmid{i}" for i in np.argsort(-exact)[:5]]
+    assert results[0][1] == pytest.approx(exact.max(), abs=1e-5)
+
+def test_rescore_requires_full_precision(vectors):
+    store = QuantizedVectorStore(dimension=32, dtype="int8")
+    store.add(_ids(len(vectors)), vectors)
+    with pytest.raises(ValueError):
+        store.search(vectors[0], rescore=True)
+
+def test_remove(vectors):
+    store = QuantizedVectorStore(dimension=32, dtype="float16")
+    store.add(_ids(len(vectors)), vectors)
+    store.remove(["pmid7"])
+
+    assert len(store) == len(vectors) - 1
+    assert store.search(vectors[7], top_k=1)[0][0] != "pmid7"
+
+def test_dimension_mismatch():
+    store = QuantizedVectorStore(dimension=32)
+    with pytest.raises(ValueError):
+        store.add(["a"], np.zeros((1, 16)))
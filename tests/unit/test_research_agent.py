@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from benchmarks.stand_ins import LatencyProfile, SyntheticCorpus, build_research_agent, stand_ins
+from src.agents import research_agent
+from src.tools.pinecone_tool import PineconeTool
+from src.tools.pubmed_tool import PubMedTool
+
+QUERIES = ["burnout", "engagement", "turnover", "leadership"]
+
+@pytest.fixture
+def env():
+    with stand_ins(LatencyProfile(scale=0), SyntheticCorpus(300, seed=1)) as env:
+        yield env
+
+async def _agent_with_corpus(env, articles=120):
+    agent = build_research_agent(env)
+    service = agent.pinecone_tool.pubmed_service
+    parsed = service.parse_medline_records("\n".join(env.corpus.medline(pmid) for pmid in range(1, articles + 1)))
+    await service.store_pubmed_data(parsed, env.database.session())
+    return agent
+
+@pytest.mark.asyncio
+async def test_agent_uses_the_real_tools_over_one_service(env):
+    agent = await _agent_with_corpus(env)
+
+    assert isinstance(agent.pubmed_tool, PubMedTool)
+    assert isinstance(agent.pinecone_tool, PineconeTool)
+    assert agent.pubmed_tool.service is agent.pinecone_tool.pubmed_service
+
+@pytest.mark.asyncio
+async def test_similarity_search_embeds_and_hydrates(env):
+    agent = await _agent_with_corpus(env)
+
+    matches = await agent.pinecone_tool.similarity_search("burnout", k=3)
+
+    assert len(matches) == 3
+    assert all(match["title"] for match in matches)
+
+@pytest.mark.asyncio
+async def test_batch_vector_searches_share_one_embedding_call(env):
+    agent = await _agent_with_corpus(env)
+    embedder = agent.pinecone_tool.pubmed_service.query_embedder
+    batches = embedder.batches
+
+    result = await agent.process_batch(QUERIES)
+
+    assert result["status"] == "success"
+    succeeded = [r for r in result["results"] if r["status"] == "success"]
+    assert succeeded and all(r["similar_articles"] or r["articles"] for r in succeeded)
+    assert any(r["similar_articles"] for r in succeeded)
+    assert embedder.batches == batches + 1
+
+@pytest.mark.asyncio
+async def test_stream_events_arrive_in_order(env):
+    agent = await _agent_with_corpus(env)
+
+    events = [event async for event in agent.stream_query("burnout", "u1")]
+    names = [event["event"] for event in events]
+
+    assert names[:3] == ["articles", "similar_articles", "grounding"]
+    assert names[-1] == "done"
+    assert set(names[3:-1]) == {"answer"}
+    assert "".join(event["text"] for event in events[3:-1])
+    assert env.database.history[-1]["query"] == "burnout"
+
+@pytest.mark.asyncio
+async def test_stream_without_results_sends_only_an_error(env, monkeypatch):
+    agent = await _agent_with_corpus(env)
+
+    async def no_results(query):
+        return []
+
+    monkeypatch.setattr(agent.pubmed_tool, "run", no_results)
+    events = [event async for event in agent.stream_query("burnout")]
+
+    assert events == [{"event": "error", "status": "error", "message": "No results found"}]
+    assert env.database.history == []
+
+@pytest.mark.asyncio
+async def test_save_finishes_after_the_consumer_goes_away(env, monkeypatch):
+    agent = await _agent_with_corpus(env)
+    release = asyncio.Event()
+    save_search = agent._save_search
+
+    async def slow_save(*args):
+        await release.wait()
+        await save_search(*args)
+
+    monkeypatch.setattr(agent, "_save_search", slow_save)
+    stream = agent.stream_query("burnout", "u1")
+    assert (await stream.__anext__())["event"] == "articles"
+    # Let the producer run until it waits on the save, then disconnect
+    await asyncio.sleep(0.05)
+    await stream.aclose()
+
+    release.set()
+    await asyncio.gather(*research_agent._background_tasks)
+    assert [entry["query"] for entry in env.database.history] == ["burnout"]
+
+@pytest.mark.asyncio
+async def test_warm_query_fills_the_caches_requests_read(env):
+    agent = await _agent_with_corpus(env)
+    grounding = agent.bing_grounding_tool.service
+    similar = agent.pinecone_tool.pubmed_service.similar_cache
+
+    await agent.warm_query("burnout")
+    # What the research route and process_query look up for the same query
+    await grounding.search("burnout")
+    await agent.pinecone_tool.similarity_search("burnout", k=5)
+
+    assert grounding.cache_stats()["hits"] == 1
+    assert similar.stats.hits == 1
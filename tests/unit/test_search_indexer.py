@@ -0,0 +1,96 @@
+import json
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents.aio import SearchClient
+from src.services.search_indexer import BulkSearchIndexer
+
+class SearchEndpointStandIn:
+    """Local HTTP stand-in for the Azure Cognitive Search indexing endpoint"""
+    def __init__(self, flaky_keys=(), rejected_keys=()):
+        self.flaky_keys = set(flaky_keys)
+        self.rejected_keys = set(rejected_keys)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.indexed = {}
+
+    async def index(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            body = await request.json()
+            await asyncio.sleep(0.01)
+            actions = body["value"]
+            self.requests.append([action["id"] for action in actions])
+            results = []
+            for action in actions:
+                key = action["id"]
+                if key in self.rejected_keys:
+                    results.append({"key": key, "status": False, "errorMessage": "invalid document", "statusCode": 400})
+                elif key in self.flaky_keys:
+                    self.flaky_keys.discard(key)
+                    results.append({"key": key, "status": False, "errorMessage": "throttled", "statusCode": 503})
+                else:
+                    self.indexed[key] = action
+                    results.append({"key": key, "status": True, "errorMessage": None, "statusCode": 201})
+            status = 200 if all(r["status"] for r in results) else 207
+            return web.json_response({"value": results}, status=status)
+        finally:
+            self.in_flight -= 1
+
+@pytest_asyncio.fixture
+async def search_endpoint(request):
+    stand_in = SearchEndpointStandIn(**getattr(request, "param", {}))
+    app = web.Application()
+    app.router.add_post("/indexes('research-index')/docs/search.index", stand_in.index)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    client = SearchClient(f"http://127.0.0.1:{port}", "research-index", AzureKeyCredential("test_key"))
+    yield stand_in, client
+    await client.close()
+    await runner.cleanup()
+
+def _documents(n, content_size=10):
+    return [{"id": str(i), "content": "x" * content_size, "title": f"Article {i}"} for i in range(n)]
+
+def test_batches_respect_count_and_size_limits():
+    indexer = BulkSearchIndexer(search_client=None, max_batch_documents=10, max_batch_bytes=2000)
+    batches = list(indexer.batches(_documents(45, content_size=300)))
+
+    assert sum(len(b) for b in batches) == 45
+    assert all(len(b) <= 10 for b in batches)
+    assert all(len(json.dumps(b)) <= 2000 + 100 for b in batches)
+
+@pytest.mark.asyncio
+async def test_uploads_all_documents_with_bounded_parallelism(search_endpoint):
+    stand_in, client = search_endpoint
+    indexer = BulkSearchIndexer(client, max_batch_documents=50, max_concurrency=3)
+
+    report = await indexer.index(_documents(1000))
+
+    assert report.succeeded == 1000
+    assert not report.failed
+    assert len(stand_in.indexed) == 1000
+    assert len(stand_in.requests) == 20
+    assert stand_in.max_in_flight <= 3
+    assert report.documents_per_second > 0
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("search_endpoint", [{"flaky_keys": {"3", "77"}, "rejected_keys": {"12"}}], indirect=True)
+async def test_retries_only_failed_keys(search_endpoint):
+    stand_in, client = search_endpoint
+    indexer = BulkSearchIndexer(client, max_batch_documents=50, retry_backoff=0.01)
+
+    report = await indexer.index(_documents(100))
+
+    assert report.succeeded == 99
+    assert report.failed == {"12": "invalid document"}
+    assert report.retries == 2
+    # Only the throttled keys are re-sent
+    assert sorted(sum(stand_in.requests[2:], [])) == ["3", "77"]
@@ -0,0 +1,43 @@
+import time
+import numpy as np
+from benchmarks.stand_ins import (
+    FakeEmbeddingModel, FakeEntrez, FakePineconeIndex, Latency, LatencyProfile, SyntheticCorpus
+)
+
+def test_corpus_and_search_are_deterministic():
+    first, second = SyntheticCorpus(1000, seed=3), SyntheticCorpus(1000, seed=3)
+    assert first.medline(42) == second.medline(42)
+    assert first.search("burnout", 20) == second.search("  burnout ", 20)
+    assert first.search("burnout", 20) != SyntheticCorpus(1000, seed=4).search("burnout", 20)
+
+def test_latency_is_seeded_and_scaled():
+    delays = [Latency(100, 50, seed=1).seconds() for _ in range(2)]
+    assert delays[0] == delays[1]
+    assert Latency(100, 50, per_item_ms=10, scale=0.5, seed=1).seconds(items=4) == (delays[0] * 1000 + 40) * 0.5 / 1000
+    assert LatencyProfile(scale=0)["llm"].seconds() == 0.0
+
+def test_entrez_history_search_and_fetch():
+    entrez = FakeEntrez(SyntheticCorpus(500), Latency())
+    search = entrez.read(entrez.esearch(db="pubmed", term="engagement", retmax=0, usehistory="y"))
+    page = entrez.efetch(db="pubmed", webenv=search["WebEnv"], query_key=search["QueryKey"],
+                         retstart=0, retmax=10).read()
+    assert int(search["Count"]) == 50
+    assert page.count("PMID- ") == 10
+
+def test_pinecone_index_finds_the_matching_article():
+    model, corpus = FakeEmbeddingModel(), SyntheticCorpus(200)
+    index = FakePineconeIndex()
+    texts = {str(p): corpus.article(p)["title"] for p in range(1, 201)}
+    index.upsert([{"id": pmid, "values": vector, "metadata": {"pmid": pmid}}
+                  for pmid, vector in zip(texts, model.encode(list(texts.values())))])
+
+    result = index.query(model.encode(texts["17"]), top_k=3, include_metadata=True)
+
+    assert result.matches[0].id == "17"
+    assert result.matches[0].metadata == {"pmid": "17"}
+    assert index.query(model.encode(texts["17"]), top_k=3, filter={"pmid": "5"}).matches[0].id == "5"
+
+def test_sleep_injects_delay():
+    start = time.perf_counter()
+    Latency(20).sleep()
+    assert time.perf_counter() - start >= 0.018
@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from src.utils.streaming_stats import QuantileSketch, StreamingStatistics, analyze_batches
+
+@pytest.fixture
+def hr_frame():
+    rng = np.random.default_rng(0)
+    n = 5000
+    tenure = rng.gamma(2.0, 3.0, size=n)
+    salary = 40000 + 2500 * tenure + rng.normal(0, 5000, size=n)
+    salary[rng.choice(n, 200, replace=False)] = np.nan
+    return pd.DataFrame({
+        'tenure': tenure,
+        'salary': salary,
+        'rating': rng.integers(1, 6, size=n),
+        'department': rng.choice(['HR', 'IT', None], size=n)
+    })
+
+def _batches(df, rows):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.schema, table.to_batches(max_chunksize=rows)
+
+def test_matches_pandas_result_shape_and_moments(hr_frame):
+    schema, batches = _batches(hr_frame, rows=700)
+    result = analyze_batches(schema, batches)
+    numeric = hr_frame.select_dtypes('number')
+    expected = numeric.describe()
+
+    assert set(result) == {'summary', 'missing_values', 'data_types', 'correlation'}
+    assert result['missing_values'] == hr_frame.isnull().sum().to_dict()
+    assert result['data_types'] == hr_frame.dtypes.astype(str).to_dict()
+    for col in numeric.columns:
+        assert list(result['summary'][col]) == list(expected[col].index)
+        for stat in ('count', 'mean', 'std', 'min', 'max'):
+            assert result['summary'][col][stat] == pytest.approx(expected[col][stat], rel=1e-9)
+
+def test_correlation_matches_pairwise_complete_pandas(hr_frame):
+    schema, batches = _batches(hr_frame, rows=333)
+    result = analyze_batches(schema, batches)
+    expected = hr_frame.select_dtypes('number').corr()
+
+    for col in expected.columns:
+        for row in expected.index:
+            assert result['correlation'][col][row] == pytest.approx(expected[col][row], abs=1e-9)
+
+def test_quantiles_are_approximately_correct(hr_frame):
+    schema, batches = _batches(hr_frame, rows=500)
+    stats = StreamingStatistics(schema, sketch_k=256)
+    for batch in batches:
+        stats.update(batch)
+    summary = stats.summary()
+    salary = hr_frame['salary'].dropna()
+
+    for q in (0.25, 0.5, 0.75):
+        estimate = summary['salary'][f"{q * 100:g}%"]
+        # Rank error rather than value error: where does the estimate fall in the true distribution?
+        assert (salary <= estimate).mean() == pytest.approx(q, abs=0.03)
+
+def test_sketch_is_exact_before_compaction():
+    sketch = QuantileSketch(k=1000)
+    values = np.arange(101, dtype=float)
+    sketch.update(values)
+    assert sketch.quantiles([0.25, 0.5, 0.75]) == [25.0, 50.0, 75.0]
+
+def test_sketch_memory_is_bounded():
+    sketch = QuantileSketch(k=128, seed=1)
+    for _ in range(50):
+        sketch.update(np.random.default_rng().random(10000))
+    assert sum(level.size for level in sketch.levels) < 128 * len(sketch.levels)
+    assert sketch.count == 500000
@@ -0,0 +1,100 @@
+import json
+import asyncio
+import logging
+import pytest
+from src.utils.tracing import NOOP_SPAN, Tracer
+
+@pytest.fixture
+def tracer():
+    return Tracer(enabled=True, log_requests=True)
+
+def _request_log(caplog):
+    records = [r for r in caplog.records if r.name == "tracing"]
+    assert len(records) == 1
+    return json.loads(records[0].getMessage())
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_await_and_tasks(tracer, caplog):
+    @tracer.traced("pubmed.search", size=len)
+    async def search():
+        await asyncio.sleep(0.01)
+        return [1, 2, 3]
+
+    async def embed(i):
+        with tracer.span("embedding.encode", size=i):
+            await asyncio.sleep(0)
+
+    caplog.set_level(logging.INFO, logger="tracing")
+    with tracer.request("http", type="research"):
+        with tracer.span("research.process_query"):
+            await search()
+            await asyncio.gather(*[embed(i) for i in range(3)])
+
+    line = _request_log(caplog)
+    assert line["trace"] == "http"
+    assert line["type"] == "research"
+    spans = {s["name"]: s for s in line["spans"]}
+    assert spans["pubmed.search"]["parent"] == "research.process_query"
+    assert spans["pubmed.search"]["size"] == 3
+    assert spans["pubmed.search"]["ms"] >= 10
+    assert sum(1 for s in line["spans"] if s["name"] == "embedding.encode") == 3
+    assert tracer.summary()["embedding.encode"]["count"] == 3
+
+def test_sync_decorator_records_errors(tracer):
+    @tracer.traced("postgres.save")
+    def save():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        save()
+
+    assert tracer.summary()["postgres.save"]["count"] == 1
+    assert 'research_chat_stage_errors_total{stage="postgres.save"} 1' in tracer.render_prometheus()
+
+def test_prometheus_histogram_is_cumulative(tracer):
+    for seconds in (0.002, 0.02, 3.0):
+        tracer.durations.observe("llm.anthropic", seconds)
+
+    text = tracer.render_prometheus()
+
+    assert "# TYPE research_chat_stage_duration_seconds histogram" in text
+    assert 'research_chat_stage_duration_seconds_bucket{stage="llm.anthropic",le="0.005"} 1' in text
+    assert 'research_chat_stage_duration_seconds_bucket{stage="llm.anthropic",le="0.025"} 2' in text
+    assert 'research_chat_stage_duration_seconds_bucket{stage="llm.anthropic",le="+Inf"} 3' in text
+    assert 'research_chat_stage_duration_seconds_count{stage="llm.anthropic"} 3' in text
+
+def test_errors_counted_from_threads_and_labels_escaped(tracer):
+    from concurrent.futures import ThreadPoolExecutor
+
+    @tracer.traced('search."bad"\\stage\nname')
+    def fail(_):
+        raise ValueError("boom")
+
+    def call(i):
+        try:
+            fail(i)
+        except ValueError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(call, range(400)))
+
+    text = tracer.render_prometheus()
+    assert 'research_chat_stage_errors_total{stage="search.\\"bad\\"\\\\stage\\nname"} 400' in text
+    assert 'research_chat_stage_duration_seconds_count{stage="search.\\"bad\\"\\\\stage\\nname"} 400' in text
+
+@pytest.mark.asyncio
+async def test_disabled_tracer_is_a_no_op(caplog):
+    tracer = Tracer(enabled=False)
+
+    @tracer.traced("bing.search")
+    async def search():
+        return "ok"
+
+    caplog.set_level(logging.INFO, logger="tracing")
+    with tracer.request("http") as request_span:
+        assert request_span is NOOP_SPAN
+        assert await search() == "ok"
+
+    assert tracer.summary() == {}
+    assert not [r for r in caplog.records if r.name == "tracing"]
@@ -0,0 +1,63 @@
+import numpy as np
+from benchmarks.stand_ins import FakeEmbeddingModel, FakePineconeIndex, Latency
+from src.services.vector_writer import BulkVectorWriter, VectorWriteError
+
+def _vectors(n, start=0, metadata_size=10):
+    model = FakeEmbeddingModel()
+    values = model.encode([f"article {i}" for i in range(start, start + n)])
+    return [{"id": str(i), "values": v.tolist(), "metadata": {"journal": "x" * metadata_size}}
+            for i, v in zip(range(start, start + n), values)]
+
+def _writer(index, **kwargs):
+    return BulkVectorWriter(index, sleep=lambda seconds: None, **kwargs)
+
+def test_chunks_respect_count_and_byte_limits():
+    writer = _writer(FakePineconeIndex(), max_batch_vectors=50, max_batch_bytes=200_000)
+    assert [len(c) for c in writer.chunks(_vectors(120))] == [50, 50, 20]
+
+    large = _vectors(20, metadata_size=30_000)
+    assert all(len(c) <= 5 for c in writer.chunks(large))
+    assert sum(len(c) for c in writer.chunks(large)) == 20
+
+def test_upsert_sends_chunks_in_parallel():
+    index = FakePineconeIndex(latency=Latency(20))
+    report = _writer(index, max_batch_vectors=10, max_concurrency=3).upsert(_vectors(95))
+
+    assert report.succeeded == 95 and not report.failed
+    assert len(index.requests) == 10
+    assert index.max_in_flight == 3
+    assert len(index.store) == 95
+
+def test_failed_chunks_are_retried():
+    index = FakePineconeIndex()
+    index.fail_next(2, status=429)
+    report = _writer(index, max_batch_vectors=10, max_concurrency=1).upsert(_vectors(30))
+
+    assert report.succeeded == 30
+    assert report.retries == 2
+    assert len(index.store) == 30
+
+def test_rejected_chunk_is_reported_not_retried():
+    index = FakePineconeIndex()
+    index.fail_next(1, status=400)
+    report = _writer(index, max_batch_vectors=10, max_concurrency=1).upsert(_vectors(30))
+
+    assert sorted(report.failed, key=int) == [str(i) for i in range(10)]
+    assert (report.succeeded, report.retries) == (20, 0)
+    assert VectorWriteError(report).report is report
+
+def test_namespaces_are_separate_partitions():
+    index = FakePineconeIndex()
+    writer = _writer(index, max_batch_vectors=10)
+    writer.upsert(_vectors(20), namespace="cached")
+    writer.upsert(_vectors(30, start=100), namespace="archive")
+    query = np.array(_vectors(1, start=5)[0]["values"])
+
+    assert index.query(query, top_k=1, namespace="cached").matches[0].id == "5"
+    assert all(int(m.id) >= 100 for m in index.query(query, top_k=5, namespace="archive").matches)
+    assert index.describe_index_stats()["namespaces"] == {"cached": {"vector_count": 20},
+                                                          "archive": {"vector_count": 30}}
+
+    report = writer.delete([str(i) for i in range(20)], namespace="cached")
+    assert report.succeeded == 20
+    assert index.describe_index_stats()["namespaces"]["cached"]["vector_count"] == 0